@@ -0,0 +1,57 @@
+import threading
+
+# Cadência (em ticks) de cada nível de métrica do Processo.
+# None indica que o nível só é coletado para os PIDs inscritos pela interface
+NIVEIS_PADRAO = {
+    "basico": 1,        # /proc/PID/stat, statm e lista de threads
+    "io": 1,            # /proc/PID/io (colunas de leitura/escrita da lista de processos)
+    "memThreads": 5,    # Atribuição de memória por thread
+    "smaps": None,      # Segmentos de memória
+    "fd": None,         # Descritores, sockets, semáforos e dispositivos de E/S
+}
+
+TODOS_NIVEIS = frozenset(NIVEIS_PADRAO)
+
+class AgendadorNiveis():
+    """
+        Decide, a cada tick, quais níveis de métricas devem ser coletados para cada PID.
+        Níveis baratos rodam todo tick, os caros em cadência mais lenta (intercalada pelo
+        PID para não concentrar a carga em um único tick) ou apenas para os PIDs inscritos
+    """
+    def __init__(self, cadencias=None):
+        self._cadencias = dict(NIVEIS_PADRAO)
+        if cadencias:
+            self._cadencias.update(cadencias)
+        self._tick = 0
+        self._inscritos = set()
+        self._lock = threading.Lock()
+
+    def novoTick(self):
+        self._tick += 1
+
+    def inscreve(self, pid):
+        # Passa a coletar todos os níveis do PID em todo tick
+        with self._lock:
+            self._inscritos.add(int(pid))
+
+    def desinscreve(self, pid):
+        with self._lock:
+            self._inscritos.discard(int(pid))
+
+    def getInscritos(self):
+        with self._lock:
+            return set(self._inscritos)
+
+    def niveisPara(self, pid, inscritos=None):
+        """
+            Retorna o conjunto de níveis a coletar para o PID no tick atual
+        """
+        if inscritos is None:
+            inscritos = self.getInscritos()
+        if pid in inscritos:
+            return TODOS_NIVEIS
+        niveis = set()
+        for nivel, cadencia in self._cadencias.items():
+            if cadencia is not None and (self._tick + pid) % cadencia == 0:
+                niveis.add(nivel)
+        return frozenset(niveis)
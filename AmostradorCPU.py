@@ -0,0 +1,35 @@
+CAMPOS_CPU = ['user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal']
+
+class AmostradorCPU():
+    """
+        Motor de taxas de CPU com estado: guarda os contadores de /proc/stat do tick
+        anterior e calcula os percentuais contra a última amostra, com uma única leitura
+        por tick e sem dormir entre leituras. Os percentuais por tarefa são calculados
+        sobre a coluna inteira da TabelaProcessos com o delta total do tick
+    """
+    def __init__(self):
+        self._anteriorSistema = None
+        self._deltaTotal = 0
+
+    def iniciaTick(self, tempos):
+        """
+            Registra os contadores de /proc/stat do tick atual e retorna o percentual
+            de cada campo em relação ao tick anterior (zeros na primeira amostra)
+        """
+        deltas = {}
+        if self._anteriorSistema is not None:
+            for key in CAMPOS_CPU:
+                deltas[key] = max(0, tempos[key] - self._anteriorSistema[key])
+        else:
+            deltas = dict.fromkeys(CAMPOS_CPU, 0)
+        self._anteriorSistema = tempos
+        self._deltaTotal = sum(deltas.values())
+
+        percentages = {}
+        for key in deltas:
+            percentages[key] = (deltas[key] / self._deltaTotal) * 100 if self._deltaTotal else 0.0
+        return percentages
+
+    def getDeltaTotal(self):
+        # Total de jiffies de CPU decorridos entre o tick anterior e o atual
+        return self._deltaTotal
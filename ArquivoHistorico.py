@@ -0,0 +1,253 @@
+import os
+import mmap
+import struct
+import threading
+
+MAGICO = b"DASHHIST"
+VERSAO = 1
+# magico, versao, numero de campos, capacidade (registros), contagem total de registros
+CABECALHO = struct.Struct("<8sIIQQ")
+TAMANHO_NOMES = 512
+INICIO_REGISTROS = mmap.PAGESIZE
+# Fração do anel reservada como folga: posições que podem ter registros ainda não
+# sincronizados e por isso nunca são lidas como retidas
+FRACAO_FOLGA = 64
+
+class ArquivoHistorico():
+    """
+        Série persistente em um arquivo de registros de tamanho fixo (timestamp e os
+        campos, todos double) acessado por mmap. O arquivo tem tamanho fixo: os registros
+        formam um anel de `capacidade` posições e os mais antigos são sobrescritos
+        (política de retenção). Os registros vão para o mmap a cada lote, mas a contagem
+        do cabeçalho só avança em sincroniza(), depois do msync dos registros, então um
+        registro incompleto após uma queda nunca é lido (perde-se no máximo o que veio
+        depois da última sincronia). Com o anel cheio, os registros não sincronizados
+        ocupam as posições dos mais antigos: por isso os retidos são só os últimos
+        `capacidade - folga` registros da contagem, e quem grava sincroniza antes de ter
+        mais que `folga` pendentes. Assim, depois de uma queda ou enquanto outro processo
+        lê, as posições sobrescritas além da contagem ficam fora do que é lido e a ordem
+        dos timestamps se mantém. Os timestamps gravados nunca decrescem (um relógio
+        que volta é limitado ao último timestamp), então a busca por tempo é binária
+        direto no mmap, sem índice separado e sem parsing.
+        Com somenteLeitura, outro processo mapeia o arquivo de quem grava (o coletor
+        externo) sem alterá-lo e relê a contagem do cabeçalho a cada consulta
+    """
+    def __init__(self, caminho, campos, capacidade, somenteLeitura=False):
+        self._caminho = caminho
+        self._campos = list(campos)
+        if capacidade < 2:
+            raise ValueError("Capacidade do histórico deve ser ao menos 2")
+        self._capacidade = capacidade
+        self._folga = max(1, capacidade // FRACAO_FOLGA)
+        self._somenteLeitura = somenteLeitura
+        self._registro = struct.Struct("<" + "d" * (len(self._campos) + 1))
+        self._lock = threading.Lock()
+        self._abre()
+
+    def _tamanhoArquivo(self):
+        return INICIO_REGISTROS + self._capacidade * self._registro.size
+
+    def _abre(self):
+        nomes = ",".join(self._campos).encode()
+        if len(nomes) > TAMANHO_NOMES:
+            raise ValueError("Nomes de campos longos demais para o cabeçalho")
+        existe = os.path.exists(self._caminho)
+        if self._somenteLeitura:
+            if not existe or not self._cabecalhoCompativel(nomes):
+                raise ValueError(f"{self._caminho} ausente ou em outro formato")
+            fd = os.open(self._caminho, os.O_RDONLY)
+            try:
+                self._mm = mmap.mmap(fd, self._tamanhoArquivo(), access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+            self._contagem = self._contagemSincronizada = CABECALHO.unpack_from(self._mm, 0)[4]
+            return
+        if existe and not self._cabecalhoCompativel(nomes):
+            # Formato diferente (outros campos ou capacidade): preserva o arquivo antigo
+            os.replace(self._caminho, self._caminho + ".antigo")
+            existe = False
+        fd = os.open(self._caminho, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if not existe:
+                os.ftruncate(fd, self._tamanhoArquivo())
+            self._mm = mmap.mmap(fd, self._tamanhoArquivo())
+        finally:
+            os.close(fd)
+        if not existe:
+            CABECALHO.pack_into(self._mm, 0, MAGICO, VERSAO, len(self._campos), self._capacidade, 0)
+            self._mm[CABECALHO.size:CABECALHO.size + len(nomes)] = nomes
+            self._mm.flush()
+        self._contagem = CABECALHO.unpack_from(self._mm, 0)[4]
+        self._contagemSincronizada = self._contagem
+        self._ultimoTimestamp = self._timestamp(len(self) - 1) if len(self) else float("-inf")
+
+    def _cabecalhoCompativel(self, nomes):
+        try:
+            with open(self._caminho, "rb") as f:
+                dados = f.read(CABECALHO.size + TAMANHO_NOMES)
+            if os.path.getsize(self._caminho) != self._tamanhoArquivo():
+                return False
+            magico, versao, numCampos, capacidade, _ = CABECALHO.unpack_from(dados, 0)
+        except (OSError, struct.error):
+            return False
+        return (magico == MAGICO and versao == VERSAO and numCampos == len(self._campos)
+                and capacidade == self._capacidade
+                and dados[CABECALHO.size:].rstrip(b"\0") == nomes)
+
+    def getCampos(self):
+        return self._campos
+
+    def __len__(self):
+        return min(self._contagem, self._capacidade - self._folga)
+
+    def _releContagem(self):
+        # Somente leitura: acompanha os registros sincronizados por quem grava
+        if self._somenteLeitura and self._mm is not None:
+            self._contagem = self._contagemSincronizada = CABECALHO.unpack_from(self._mm, 0)[4]
+
+    def adiciona(self, timestamp, valores):
+        self.adicionaLote([(timestamp, valores)])
+
+    def adicionaLote(self, registros):
+        """
+            Grava os registros (timestamp, valores) no mmap, sem msync (ver sincroniza).
+            Um timestamp menor que o último gravado (relógio ajustado para trás) é
+            limitado a ele, mantendo a ordem que a busca binária pressupõe
+        """
+        if self._somenteLeitura:
+            raise ValueError(f"{self._caminho} aberto somente para leitura")
+        if not registros:
+            return
+        with self._lock:
+            if self._mm is None:
+                return
+            for timestamp, valores in registros:
+                if self._contagem - self._contagemSincronizada >= self._folga:
+                    # A folga acabou: o próximo registro sobrescreveria um retido pela
+                    # contagem do cabeçalho
+                    self._sincroniza()
+                self._ultimoTimestamp = max(self._ultimoTimestamp, timestamp)
+                offset = INICIO_REGISTROS + (self._contagem % self._capacidade) * self._registro.size
+                self._registro.pack_into(self._mm, offset, self._ultimoTimestamp, *valores)
+                self._contagem += 1
+
+    def sincroniza(self):
+        """
+            Leva ao disco os registros gravados desde a última sincronia e só então
+            avança a contagem do cabeçalho (um msync para os registros, outro para o
+            cabeçalho). Chamada periodicamente por quem grava e em fecha()
+        """
+        with self._lock:
+            if self._mm is not None and not self._somenteLeitura:
+                self._sincroniza()
+
+    def _sincroniza(self):
+        pendentes = self._contagem - self._contagemSincronizada
+        if not pendentes:
+            return
+        inicio = INICIO_REGISTROS + (self._contagemSincronizada % self._capacidade) * self._registro.size
+        fim = INICIO_REGISTROS + ((self._contagem - 1) % self._capacidade + 1) * self._registro.size
+        if pendentes >= self._capacidade or fim <= inicio:
+            # Os pendentes dão a volta no anel: sincroniza a área de registros inteira
+            inicio, fim = INICIO_REGISTROS, self._tamanhoArquivo()
+        inicio -= inicio % mmap.PAGESIZE
+        self._mm.flush(inicio, fim - inicio)
+        struct.pack_into("<Q", self._mm, CABECALHO.size - 8, self._contagem)
+        self._mm.flush(0, mmap.PAGESIZE)
+        self._contagemSincronizada = self._contagem
+
+    def _offset(self, indice):
+        # Offset do registro de índice lógico `indice` (0 = mais antigo retido)
+        primeiro = self._contagem - len(self)
+        return INICIO_REGISTROS + ((primeiro + indice) % self._capacidade) * self._registro.size
+
+    def _timestamp(self, indice):
+        return struct.unpack_from("<d", self._mm, self._offset(indice))[0]
+
+    def _buscaIndice(self, timestamp):
+        # Primeiro índice lógico com timestamp >= timestamp (busca binária no mmap)
+        inicio, fim = 0, len(self)
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if self._timestamp(meio) < timestamp:
+                inicio = meio + 1
+            else:
+                fim = meio
+        return inicio
+
+    def getUltimoTimestamp(self):
+        with self._lock:
+            self._releContagem()
+            return self._timestamp(len(self) - 1) if len(self) else None
+
+    def registros(self, inicio, fim):
+        """
+            Registros (timestamp, campos...) com inicio <= timestamp <= fim, desempacotados
+            direto das páginas mapeadas
+        """
+        with self._lock:
+            self._releContagem()
+            primeiro = self._buscaIndice(inicio)
+            ultimo = self._buscaIndice(fim)
+            while ultimo < len(self) and self._timestamp(ultimo) <= fim:
+                ultimo += 1
+            resultado = []
+            # O intervalo pode dar a volta no anel: no máximo dois trechos contíguos
+            indice = primeiro
+            while indice < ultimo:
+                offset = self._offset(indice)
+                contiguos = min(ultimo - indice,
+                                (INICIO_REGISTROS + self._capacidade * self._registro.size - offset) // self._registro.size)
+                trecho = memoryview(self._mm)[offset:offset + contiguos * self._registro.size]
+                resultado.extend(self._registro.iter_unpack(trecho))
+                trecho.release()
+                indice += contiguos
+            return resultado
+
+    def consulta(self, inicio, fim, largura):
+        """
+            Mesmo formato de HistoricoSeries.consulta: para cada campo, lista de
+            (coluna, minimo, maximo) com no máximo uma coluna por pixel
+        """
+        colunas = [{} for _ in self._campos]
+        if fim > inicio and largura > 0:
+            escala = largura / (fim - inicio)
+            for registro in self.registros(inicio, fim):
+                coluna = min(largura - 1, int((registro[0] - inicio) * escala))
+                for serie, valor in enumerate(registro[1:]):
+                    atual = colunas[serie].get(coluna)
+                    if atual is None:
+                        colunas[serie][coluna] = [valor, valor]
+                    elif valor < atual[0]:
+                        atual[0] = valor
+                    elif valor > atual[1]:
+                        atual[1] = valor
+        return [[(coluna, minimo, maximo) for coluna, (minimo, maximo) in sorted(serie.items())]
+                for serie in colunas]
+
+    def carregaEm(self, historico, segundos=None, chave=None):
+        """
+            Reenvia os últimos `segundos` do arquivo (todos os retidos se None) para um
+            HistoricoSeries em memória, que monta com eles os rollups das janelas longas.
+            Com chave (campo, valor), só os registros com esse valor no campo, sem ele
+            (ex.: a série de um PID no arquivo de processos)
+        """
+        ultimo = self.getUltimoTimestamp()
+        if ultimo is None:
+            return
+        inicio = float("-inf") if segundos is None else ultimo - segundos
+        registros = self.registros(inicio, ultimo)
+        if chave is None:
+            historico.adicionaLote((registro[0], registro[1:]) for registro in registros)
+            return
+        posicao = self._campos.index(chave[0]) + 1
+        valor = chave[1]
+        historico.adicionaLote((registro[0], registro[1:posicao] + registro[posicao + 1:])
+                               for registro in registros if registro[posicao] == valor)
+
+    def fecha(self):
+        with self._lock:
+            if self._mm is not None and not self._somenteLeitura:
+                self._sincroniza()
+                self._mm.close()
+                self._mm = None
@@ -0,0 +1,199 @@
+from tkinter import ttk
+from SincronizadorArvore import chaveOrdenacao
+
+ALTURA_LINHA_PADRAO = 20
+ALTURA_CABECALHO = 25
+
+class ArvoreVirtual():
+    """
+        Lista virtualizada de processos sobre um ttk.Treeview. O modelo completo (linhas
+        do instantâneo e filhos dos processos expandidos) fica em Python; o Treeview só
+        tem os itens que cabem na área visível, reaproveitados a cada rolagem e
+        atualizados apenas nas células que mudaram. O custo por quadro depende da altura
+        da janela, não do número de tarefas. Clicar em um cabeçalho ordena o modelo
+        pela coluna, sem reinserir itens
+    """
+    def __init__(self, master, colunas, valoresLinha, filhos):
+        """
+            valoresLinha(tarefa, pai): (texto, valores) de uma linha; pai é None para
+            linhas de primeiro nível. filhos(tarefa): linhas exibidas ao expandir
+        """
+        self._valoresLinha = valoresLinha
+        self._filhos = filhos
+        self._colunas = tuple(colunas)
+        self._modeloRecebido = ()
+        self._modelo = ()
+        self._ordenacao = None
+        self._expandidos = set()
+        self._inicio = 0
+        self._visiveis = 1
+        self._slots = []        # iids dos itens materializados, na ordem de exibição
+        self._chavesSlots = []  # chave da linha do modelo exibida em cada slot
+        self._cacheSlots = []   # (texto, valores) já enviados ao Tk em cada slot
+        self._selecionada = None
+
+        self._scrollbar = ttk.Scrollbar(master, orient="vertical", command=self._rola)
+        self._scrollbar.pack(side="right", fill="y")
+        self._tree = ttk.Treeview(master, columns=colunas, selectmode="browse")
+        self._tree.pack(fill="both", expand=True)
+
+        self._tree.bind("<Configure>", self._redimensiona)
+        self._tree.bind("<MouseWheel>", lambda e: self._rola("scroll", -1 if e.delta > 0 else 1, "units"))
+        self._tree.bind("<Button-4>", lambda e: self._rola("scroll", -1, "units"))
+        self._tree.bind("<Button-5>", lambda e: self._rola("scroll", 1, "units"))
+        self._tree.bind("<<TreeviewSelect>>", self._registraSelecao)
+        for coluna in ("#0",) + self._colunas:
+            self._tree.heading(coluna, command=lambda coluna=coluna: self.ordenaPor(coluna))
+
+    def getTreeview(self):
+        return self._tree
+
+    def winfo_exists(self):
+        return self._tree.winfo_exists()
+
+    def atualiza(self, modelo):
+        # Troca o modelo (ex.: processos do último instantâneo) e redesenha a janela visível
+        self._modeloRecebido = modelo
+        self._modelo = self._ordena(modelo)
+        self._desenha()
+
+    def ordenaPor(self, coluna):
+        # Mesmo cabeçalho alterna entre decrescente e crescente
+        if self._ordenacao is not None and self._ordenacao[0] == coluna:
+            self._ordenacao = (coluna, not self._ordenacao[1])
+        else:
+            self._ordenacao = (coluna, True)
+        self._modelo = self._ordena(self._modeloRecebido)
+        self._desenha()
+
+    def _ordena(self, modelo):
+        # Sem ordenação escolhida, mantém a ordem do modelo recebido
+        if self._ordenacao is None:
+            return modelo
+        coluna, reverso = self._ordenacao
+        if coluna == "#0":
+            chave = lambda linha: chaveOrdenacao(linha.id)
+        else:
+            indice = self._colunas.index(coluna)
+            chave = lambda linha: chaveOrdenacao(self._valoresLinha(linha, None)[1][indice])
+        return tuple(sorted(modelo, key=chave, reverse=reverso))
+
+    def chaveDaLinha(self, item):
+        """
+            Chave da linha do modelo exibida em um item do Treeview: pid para processos
+            e (pid, tid) para filhos
+        """
+        try:
+            return self._chavesSlots[self._slots.index(item)]
+        except ValueError:
+            return None
+
+    def alternaExpansao(self, pid):
+        if pid in self._expandidos:
+            self._expandidos.discard(pid)
+        else:
+            self._expandidos.add(pid)
+        self._desenha()
+
+    def isExpandido(self, pid):
+        return pid in self._expandidos
+
+    def _total(self):
+        if not self._expandidos:
+            return len(self._modelo)
+        return len(self._modelo) + sum(len(self._filhos(linha)) for linha in self._modelo
+                                       if linha.id in self._expandidos)
+
+    def _janela(self, inicio, quantidade):
+        # Linhas [inicio, inicio + quantidade) do modelo achatado, como (chave, tarefa, pai)
+        if not self._expandidos:
+            return [(linha.id, linha, None) for linha in self._modelo[inicio:inicio + quantidade]]
+        janela = []
+        posicao = 0
+        for linha in self._modelo:
+            if posicao >= inicio + quantidade:
+                break
+            if posicao >= inicio:
+                janela.append((linha.id, linha, None))
+            posicao += 1
+            if linha.id in self._expandidos:
+                filhos = self._filhos(linha)
+                # Pula os filhos que estão inteiros antes da janela
+                if posicao + len(filhos) <= inicio:
+                    posicao += len(filhos)
+                    continue
+                for filho in filhos:
+                    if posicao >= inicio + quantidade:
+                        break
+                    if posicao >= inicio:
+                        janela.append(((linha.id, filho.id), filho, linha))
+                    posicao += 1
+        return janela
+
+    def _desenha(self):
+        if not self._tree.winfo_exists():
+            return
+        total = self._total()
+        self._inicio = max(0, min(self._inicio, total - self._visiveis))
+        janela = self._janela(self._inicio, self._visiveis)
+
+        # Ajusta o número de itens materializados ao tamanho da janela
+        while len(self._slots) < len(janela):
+            self._slots.append(self._tree.insert("", "end"))
+            self._cacheSlots.append(None)
+        if len(self._slots) > len(janela):
+            self._tree.delete(*self._slots[len(janela):])
+            del self._slots[len(janela):]
+            del self._cacheSlots[len(janela):]
+
+        self._chavesSlots = []
+        slotSelecionado = None
+        for i, (chave, tarefa, pai) in enumerate(janela):
+            self._chavesSlots.append(chave)
+            texto, valores = self._valoresLinha(tarefa, pai)
+            if pai is None and self._filhos(tarefa):
+                texto = ("▾ " if chave in self._expandidos else "▸ ") + texto
+            conteudo = (texto, tuple(valores))
+            # Só envia ao Tk as linhas que mudaram
+            if self._cacheSlots[i] != conteudo:
+                self._tree.item(self._slots[i], text=texto, values=valores)
+                self._cacheSlots[i] = conteudo
+            if chave == self._selecionada:
+                slotSelecionado = self._slots[i]
+
+        # A seleção acompanha a linha do modelo, não o item reaproveitado
+        atual = self._tree.selection()
+        if slotSelecionado is None and atual:
+            self._tree.selection_remove(*atual)
+        elif slotSelecionado is not None and atual != (slotSelecionado,):
+            self._tree.selection_set(slotSelecionado)
+
+        if total:
+            self._scrollbar.set(self._inicio / total, min(1.0, (self._inicio + len(janela)) / total))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _registraSelecao(self, event):
+        selecao = self._tree.selection()
+        chave = self.chaveDaLinha(selecao[0]) if selecao else None
+        if chave is not None:
+            self._selecionada = chave
+
+    def _rola(self, acao, quantidade, unidade=None):
+        total = self._total()
+        if acao == "moveto":
+            self._inicio = int(float(quantidade) * total)
+        elif acao == "scroll":
+            passo = self._visiveis if unidade == "pages" else 1
+            self._inicio += int(quantidade) * passo
+        self._desenha()
+
+    def _redimensiona(self, event):
+        try:
+            altura = int(ttk.Style().lookup("Treeview", "rowheight") or ALTURA_LINHA_PADRAO)
+        except ValueError:
+            altura = ALTURA_LINHA_PADRAO
+        visiveis = max(1, (event.height - ALTURA_CABECALHO) // altura)
+        if visiveis != self._visiveis:
+            self._visiveis = visiveis
+            self._desenha()
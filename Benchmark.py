@@ -0,0 +1,135 @@
+import argparse
+import gc
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from GerenciadorDados import GerenciadorDados, ETAPAS_COLETA
+from FileInfo import FileInfo
+from TabelaSockets import TabelaSockets
+from ProcFalso import geraProcFalso, avancaCPU
+
+ESCALAS_PADRAO = [1000, 10000, 100000]
+
+def mede(funcao, repeticoes):
+    """
+        Executa funcao `repeticoes` vezes medindo o tempo (perf_counter) e mais uma vez
+        com tracemalloc, para o pico e o saldo de memória alocada. O tracemalloc fica
+        fora das execuções cronometradas porque multiplica o custo das alocações
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    funcao()
+    depois, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "tempo_ms": 1000 * sum(tempos) / len(tempos),
+        "tempo_min_ms": 1000 * min(tempos),
+        "pico_kb": (pico - antes) / 1024,
+        "saldo_kb": (depois - antes) / 1024,
+    }
+
+def executaEscala(tarefas, args, raizTemporaria):
+    """
+        Gera um /proc falso com cerca de `tarefas` tarefas e mede cada etapa da coleta
+    """
+    raiz = tempfile.mkdtemp(prefix=f"proc-{tarefas}-", dir=raizTemporaria)
+    resultados = {}
+    try:
+        inicio = time.perf_counter()
+        total = geraProcFalso(raiz, max(1, tarefas // (args.threads + 1)), args.threads, args.mapeamentos,
+                              args.fds, args.sockets)
+        resultados["geracao"] = {"tempo_ms": 1000 * (time.perf_counter() - inicio)}
+
+        # Criação do gerenciador: primeira coleta completa, com todos os objetos novos
+        inicio = time.perf_counter()
+        gerenciador = GerenciadorDados(args.paralelo, args.trabalhadores, prefixoProc=raiz)
+        resultados["primeiraColeta"] = {"tempo_ms": 1000 * (time.perf_counter() - inicio)}
+
+        # Etapas de atualizaDados, na mesma ordem, sobre tarefas já conhecidas; o CPU
+        # falso avança antes de cada medida de cpuInfo para que haja delta a calcular
+        tick = [0]
+        def etapa(nome):
+            def executa():
+                if nome == "cpuInfo":
+                    tick[0] += 1
+                    avancaCPU(raiz, tick[0])
+                gerenciador.executaEtapa(nome)
+            return executa
+        for nome in ETAPAS_COLETA:
+            resultados[nome] = mede(etapa(nome), args.ticks)
+        resultados["tickCompleto"] = mede(gerenciador.atualizaDados, args.ticks)
+
+        # Tick com os níveis detalhados (smaps, fds, sockets) dos PIDs inscritos, pela
+        # mesma API da tela de detalhes (vale também para a coleta em processos do pool)
+        inscritos = list(gerenciador.getProcDict())[:args.inscritos]
+        for pid in inscritos:
+            gerenciador.inscreveDetalhes(pid)
+        resultados["tickInscritos"] = mede(gerenciador.atualizaDados, args.ticks)
+        for pid in inscritos:
+            gerenciador.desinscreveDetalhes(pid)
+
+        def sockets():
+            tabela = TabelaSockets(raiz)
+            tabela.obtem("0")
+        resultados["tabelaSockets"] = mede(sockets, args.ticks)
+
+        fileinfo = FileInfo(raiz)
+        resultados["particoes"] = mede(fileinfo.mostrar_info_particoes, args.ticks)
+        resultados["listaDiretorio"] = mede(lambda: fileinfo.list_dir(raiz), args.ticks)
+
+        resultados["tarefas"] = total
+        resultados["tarefasColetadas"] = gerenciador.getNumProcessos() + gerenciador.getNumThreads()
+        gerenciador.encerra()
+        for processo in gerenciador.getProcDict().values():
+            processo.fechaDiretorio()
+    finally:
+        shutil.rmtree(raiz, ignore_errors=True)
+    return resultados
+
+def imprimeResultados(escala, resultados, saida=sys.stdout):
+    print(f"\n== {escala} tarefas ({resultados['tarefasColetadas']} coletadas de {resultados['tarefas']}) ==",
+          file=saida)
+    print(f"{'etapa':<20}{'tempo (ms)':>14}{'mín (ms)':>12}{'pico (KB)':>14}{'saldo (KB)':>14}", file=saida)
+    for etapa, medida in resultados.items():
+        if not isinstance(medida, dict):
+            continue
+        if "pico_kb" not in medida:
+            print(f"{etapa:<20}{medida['tempo_ms']:>14.1f}", file=saida)
+            continue
+        print(f"{etapa:<20}{medida['tempo_ms']:>14.2f}{medida['tempo_min_ms']:>12.2f}"
+              f"{medida['pico_kb']:>14.1f}{medida['saldo_kb']:>14.1f}", file=saida)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da coleta sobre um /proc gerado por ProcFalso")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS_PADRAO, help="Número de tarefas")
+    parser.add_argument("--ticks", type=int, default=3, help="Repetições cronometradas por etapa")
+    parser.add_argument("--threads", type=int, default=4, help="Threads (task/) por processo")
+    parser.add_argument("--mapeamentos", type=int, default=256, help="Linhas de maps por processo")
+    parser.add_argument("--fds", type=int, default=128, help="Descritores em fd/ por processo")
+    parser.add_argument("--sockets", type=int, default=20000, help="Sockets nas tabelas de /proc/net")
+    parser.add_argument("--inscritos", type=int, default=50, help="PIDs com níveis detalhados")
+    parser.add_argument("--paralelo", choices=["thread", "processo"], default=None, help="Coleta paralela")
+    parser.add_argument("--trabalhadores", type=int, default=None, help="Tamanho do pool da coleta paralela")
+    parser.add_argument("--diretorio", default=None, help="Onde gerar os /proc falsos (padrão: temporário)")
+    parser.add_argument("--json", default=None, help="Grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    todos = {}
+    for escala in args.escalas:
+        todos[escala] = executaEscala(escala, args, args.diretorio)
+        imprimeResultados(escala, todos[escala])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"parametros": vars(args), "resultados": todos}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
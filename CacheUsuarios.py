@@ -0,0 +1,48 @@
+import os
+import pwd
+import time
+import threading
+
+# Intervalo mínimo entre verificações do mtime de /etc/passwd
+INTERVALO_VERIFICACAO_S = 1.0
+
+class CacheUsuarios():
+    """
+        Cache compartilhado UID -> nome de usuário. Cada UID consulta o NSS (pwd.getpwuid,
+        que pode ir ao LDAP) uma única vez; o cache é invalidado quando o mtime de
+        /etc/passwd muda
+    """
+    def __init__(self, arquivo="/etc/passwd"):
+        self._arquivo = arquivo
+        self._nomes = {}
+        self._mtime = None
+        self._ultimaVerificacao = 0
+        self._lock = threading.Lock()
+
+    def _verificaInvalidacao(self):
+        agora = time.monotonic()
+        if agora - self._ultimaVerificacao < INTERVALO_VERIFICACAO_S:
+            return
+        self._ultimaVerificacao = agora
+        try:
+            mtime = os.stat(self._arquivo).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._nomes = {}
+
+    def nome(self, uid):
+        with self._lock:
+            self._verificaInvalidacao()
+            nome = self._nomes.get(uid)
+            if nome is None:
+                try:
+                    nome = pwd.getpwuid(uid).pw_name
+                except KeyError:
+                    # UID sem entrada no passwd: exibe o número
+                    nome = str(uid)
+                self._nomes[uid] = nome
+            return nome
+
+cacheUsuarios = CacheUsuarios()
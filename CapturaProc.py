@@ -0,0 +1,310 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+from Reconciliacao import listaIDs
+
+# Arquivos lidos pela coleta, relativos à raiz do procfs e a cada /proc/PID
+ARQUIVOS_SISTEMA = ["stat", "meminfo", "mounts", "net/tcp", "net/tcp6", "net/udp", "net/udp6", "net/raw",
+                    "net/raw6", "net/unix"]
+ARQUIVOS_PROCESSO = ["stat", "statm", "comm", "cmdline", "status", "io"]
+ARQUIVOS_DETALHES = ["maps", "smaps_rollup"]
+ARQUIVOS_THREAD = ["stat", "statm", "comm"]
+# Primeiro membro de cada tick no arquivo: número e timestamp da captura
+MARCADOR_TICK = ".captura"
+
+def _nomeTick(tick):
+    return f"{tick:06d}"
+
+def _leArquivo(caminho):
+    try:
+        with open(caminho, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+class GravadorProc():
+    """
+        Captura, a cada tick, os arquivos do /proc que a coleta lê (sistema, processos,
+        threads e, com detalhes, maps, smaps_rollup e os links de fd/) em um arquivo tar
+        comprimido, um diretório por tick. Um arquivo igual ao do tick anterior vira um
+        hard link do tar para o membro que tem os dados, então o arquivo cresce só com o
+        que mudou e ainda pode ser extraído com tar comum (a igualdade é decidida por um
+        blake2b de 128 bits do conteúdo). O dono de cada /proc/PID fica no uid do membro
+        do diretório
+    """
+    def __init__(self, destino, prefixo="/proc", detalhes=True):
+        self._prefixo = prefixo
+        self._detalhes = detalhes
+        self._tar = tarfile.open(destino, "w:gz")
+        self._tick = 0
+        # Caminho relativo -> (blake2b do conteúdo, membro com os dados), do tick anterior
+        # e do tick em captura; só os caminhos vistos no tick passam para o próximo
+        self._ultimos = {}
+        self._atuais = {}
+
+    def capturaTick(self):
+        nome = _nomeTick(self._tick)
+        marcador = json.dumps({"tick": self._tick, "timestamp": time.time()}).encode()
+        self._adicionaDados(f"{nome}/{MARCADOR_TICK}", marcador, deduplica=False)
+        for relativo in ARQUIVOS_SISTEMA:
+            self._adicionaArquivo(nome, relativo)
+        for pid in sorted(listaIDs(self._prefixo)):
+            self._capturaTarefa(nome, str(pid), ARQUIVOS_PROCESSO + (ARQUIVOS_DETALHES if self._detalhes else []))
+            # fd/ existe na reprodução mesmo vazio ou sem permissão para listar
+            temFd = self._adicionaDiretorio(nome, f"{pid}/fd")
+            if self._detalhes:
+                self._adicionaLink(nome, f"{pid}/exe")
+                if temFd:
+                    for fd in sorted(listaIDs(f"{self._prefixo}/{pid}/fd")):
+                        self._adicionaLink(nome, f"{pid}/fd/{fd}")
+            for tid in sorted(listaIDs(f"{self._prefixo}/{pid}/task")):
+                self._capturaTarefa(nome, f"{pid}/task/{tid}", ARQUIVOS_THREAD)
+        # Esquece os arquivos de tarefas que terminaram
+        self._ultimos = self._atuais
+        self._atuais = {}
+        self._tick += 1
+
+    def _capturaTarefa(self, nome, relativo, arquivos):
+        if not self._adicionaDiretorio(nome, relativo):
+            return
+        for arquivo in arquivos:
+            self._adicionaArquivo(nome, f"{relativo}/{arquivo}")
+
+    def _adicionaDiretorio(self, nome, relativo):
+        # Membro de diretório com o dono do original; False se ele não existe mais
+        try:
+            st = os.stat(f"{self._prefixo}/{relativo}")
+        except OSError:
+            return False
+        info = tarfile.TarInfo(f"{nome}/{relativo}")
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o555
+        info.uid = st.st_uid
+        info.gid = st.st_gid
+        self._tar.addfile(info)
+        return True
+
+    def _adicionaArquivo(self, nome, relativo):
+        dados = _leArquivo(f"{self._prefixo}/{relativo}")
+        if dados is not None:
+            self._adicionaDados(f"{nome}/{relativo}", dados, relativo)
+
+    def _adicionaDados(self, membro, dados, relativo=None, deduplica=True):
+        info = tarfile.TarInfo(membro)
+        info.mode = 0o444
+        if deduplica:
+            resumo = hashlib.blake2b(dados, digest_size=16).digest()
+            anterior = self._ultimos.get(relativo)
+            if anterior is not None and anterior[0] == resumo:
+                info.type = tarfile.LNKTYPE
+                info.linkname = anterior[1]
+                self._tar.addfile(info)
+                self._atuais[relativo] = anterior
+                return
+            self._atuais[relativo] = (resumo, membro)
+        info.size = len(dados)
+        self._tar.addfile(info, io.BytesIO(dados))
+
+    def _adicionaLink(self, nome, relativo):
+        try:
+            alvo = os.readlink(f"{self._prefixo}/{relativo}")
+        except OSError:
+            return
+        info = tarfile.TarInfo(f"{nome}/{relativo}")
+        info.type = tarfile.SYMTYPE
+        info.linkname = alvo
+        self._tar.addfile(info)
+
+    def getTicks(self):
+        return self._tick
+
+    def fecha(self):
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+class ReproducaoProc():
+    """
+        Reproduz uma captura do GravadorProc em um diretório que faz o papel do /proc:
+        cada avanca() aplica o próximo tick no lugar (arquivos reescritos sem trocar de
+        inode, tarefas encerradas removidas), então os descritores que a coleta mantém
+        abertos leem o conteúdo novo como no procfs. Um GerenciadorDados criado com
+        prefixoProc=getRaiz() coleta a captura com o mesmo código da coleta real
+    """
+    def __init__(self, arquivo, diretorio=None):
+        self._tar = tarfile.open(arquivo, "r:gz")
+        self._raiz = tempfile.mkdtemp(prefix="proc-reproducao-", dir=diretorio)
+        self._membros = iter(self._tar)
+        self._pendente = next(self._membros, None)
+        self._presentes = set()
+        self._info = None
+
+    def getRaiz(self):
+        return self._raiz
+
+    def getTick(self):
+        # Número e timestamp do tick aplicado por último (None antes do primeiro)
+        return self._info
+
+    def avanca(self):
+        """
+            Aplica o próximo tick da captura. Retorna False quando a captura acabou
+        """
+        if self._pendente is None:
+            return False
+        marcador = self._pendente
+        self._info = json.loads(self._tar.extractfile(marcador).read())
+        prefixo = marcador.name.split("/", 1)[0] + "/"
+        presentes = set()
+        self._pendente = next(self._membros, None)
+        while self._pendente is not None and self._pendente.name.startswith(prefixo):
+            membro = self._pendente
+            relativo = membro.name[len(prefixo):]
+            self._aplica(membro, relativo)
+            presentes.add(relativo)
+            self._pendente = next(self._membros, None)
+        self._removeAusentes(presentes)
+        self._presentes = presentes
+        return True
+
+    def _aplica(self, membro, relativo):
+        caminho = os.path.join(self._raiz, relativo)
+        if membro.isdir():
+            os.makedirs(caminho, exist_ok=True)
+            try:
+                os.chown(caminho, membro.uid, membro.gid)
+            except OSError:
+                pass
+        elif membro.issym():
+            try:
+                if os.readlink(caminho) == membro.linkname:
+                    return
+                os.unlink(caminho)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            os.symlink(membro.linkname, caminho)
+        elif membro.islnk():
+            # Conteúdo igual ao do tick anterior, já presente no diretório; se o arquivo
+            # reapareceu, copia os dados do membro original
+            if not os.path.exists(caminho):
+                self._escreve(caminho, self._tar.extractfile(self._tar.getmember(membro.linkname)).read())
+        else:
+            self._escreve(caminho, self._tar.extractfile(membro).read())
+
+    @staticmethod
+    def _escreve(caminho, dados):
+        # Reescreve no mesmo inode: descritores abertos passam a ler o conteúdo novo
+        try:
+            fd = os.open(caminho, os.O_WRONLY | os.O_TRUNC)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            fd = os.open(caminho, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, dados)
+        finally:
+            os.close(fd)
+
+    def _removeAusentes(self, presentes):
+        # Do mais profundo para o mais raso: arquivos antes dos diretórios que os contêm
+        for relativo in sorted(self._presentes - presentes, key=lambda r: r.count("/"), reverse=True):
+            caminho = os.path.join(self._raiz, relativo)
+            try:
+                if os.path.isdir(caminho) and not os.path.islink(caminho):
+                    shutil.rmtree(caminho)
+                else:
+                    os.unlink(caminho)
+            except FileNotFoundError:
+                pass
+
+    def fecha(self):
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+            shutil.rmtree(self._raiz, ignore_errors=True)
+
+def captura(destino, duracao, intervalo, prefixo="/proc", detalhes=True):
+    gravador = GravadorProc(destino, prefixo, detalhes)
+    fim = time.monotonic() + duracao
+    try:
+        while time.monotonic() < fim:
+            inicio = time.monotonic()
+            gravador.capturaTick()
+            time.sleep(max(0.0, intervalo - (time.monotonic() - inicio)))
+    finally:
+        gravador.fecha()
+    return gravador.getTicks()
+
+def reproduz(arquivo, velocidade=1.0, inscritos=(), perfil=None):
+    """
+        Alimenta um GerenciadorDados com a captura, respeitando os intervalos gravados
+        divididos por `velocidade` (0: sem espera). Retorna o tempo de coleta de cada tick
+    """
+    from GerenciadorDados import GerenciadorDados
+    reproducao = ReproducaoProc(arquivo)
+    tempos = []
+    perfilador = None
+    if perfil:
+        import cProfile
+        perfilador = cProfile.Profile()
+    try:
+        if not reproducao.avanca():
+            return tempos
+        gerenciador = GerenciadorDados(prefixoProc=reproducao.getRaiz())
+        for pid in inscritos:
+            gerenciador.inscreveDetalhes(pid)
+        anterior = reproducao.getTick()["timestamp"]
+        while reproducao.avanca():
+            atual = reproducao.getTick()["timestamp"]
+            if velocidade > 0:
+                time.sleep(max(0.0, (atual - anterior) / velocidade))
+            anterior = atual
+            inicio = time.perf_counter()
+            if perfilador is not None:
+                perfilador.runcall(gerenciador.atualizaDados)
+            else:
+                gerenciador.atualizaDados()
+            tempos.append(time.perf_counter() - inicio)
+        gerenciador.encerra()
+        for processo in gerenciador.getProcDict().values():
+            processo.fechaDiretorio()
+    finally:
+        reproducao.fecha()
+        if perfilador is not None:
+            perfilador.dump_stats(perfil)
+    return tempos
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Captura e reprodução do /proc lido pela coleta")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    parserCaptura = subparsers.add_parser("captura", help="Grava os arquivos do /proc em um tar.gz")
+    parserCaptura.add_argument("destino", help="Arquivo .tar.gz de saída")
+    parserCaptura.add_argument("--duracao", type=float, default=60.0, help="Segundos de captura")
+    parserCaptura.add_argument("--intervalo", type=float, default=1.0, help="Segundos entre ticks")
+    parserCaptura.add_argument("--sem-detalhes", action="store_true", help="Não grava maps, smaps_rollup e fd/")
+    parserReproducao = subparsers.add_parser("reproduz", help="Coleta uma captura com GerenciadorDados")
+    parserReproducao.add_argument("arquivo", help="Arquivo gravado por 'captura'")
+    parserReproducao.add_argument("--velocidade", type=float, default=1.0,
+                                  help="Multiplicador da velocidade (0: sem espera entre ticks)")
+    parserReproducao.add_argument("--inscritos", type=int, nargs="*", default=[],
+                                  help="PIDs com níveis detalhados")
+    parserReproducao.add_argument("--perfil", default=None, help="Grava um perfil do cProfile da coleta")
+    args = parser.parse_args(argv)
+
+    if args.comando == "captura":
+        ticks = captura(args.destino, args.duracao, args.intervalo, detalhes=not args.sem_detalhes)
+        print(f"{ticks} ticks gravados em {args.destino} ({os.path.getsize(args.destino) / 1024:.0f} KB)")
+    else:
+        tempos = reproduz(args.arquivo, args.velocidade, args.inscritos, args.perfil)
+        if tempos:
+            print(f"{len(tempos)} ticks: média {1000 * sum(tempos) / len(tempos):.2f} ms, "
+                  f"máximo {1000 * max(tempos):.2f} ms")
+
+if __name__ == "__main__":
+    sys.exit(main())
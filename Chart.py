@@ -1,12 +1,25 @@
 import tkinter as tk
 from tkinter import ttk
+from collections import deque
 from ttkbootstrap import Style
-from PIL import Image, ImageTk, ImageDraw
+
+# Janelas de tempo do zoom (segundos), alternadas com a roda do mouse sobre o gráfico
+JANELAS_S = [60, 600, 3600, 6 * 3600, 24 * 3600, 7 * 24 * 3600]
+
+def formata_janela(segundos):
+    if segundos >= 24 * 3600:
+        return f"{segundos // (24 * 3600)} d"
+    if segundos >= 3600:
+        return f"{segundos // 3600} h"
+    return f"{segundos // 60} min"
 
 class LineChartFrame:
     def __init__(self, parent, chart_name, num_lines=2, labels=None, width=400, height=200):
         """
-            Instancia um frame para conter o gráfico de linhas com N linhas definido em num_lines
+            Instancia um frame para conter o gráfico de linhas com N linhas definido em num_lines.
+            Eixos, grade e rótulos são desenhados uma única vez; cada série é um item de
+            linha persistente do canvas cujas coordenadas são atualizadas a cada tick.
+            Com update_history o gráfico desenha uma janela de um HistoricoSeries
         """
         self.style = Style(theme="cyborg")
         self.root = self.style.master
@@ -15,15 +28,18 @@ class LineChartFrame:
         self.height = height
         self.max_values = 50
         self.max_value = 100
-        
+
         self.left_pad = 40
         self.right_pad = 20
         self.top_pad = 20
         self.bottom_pad = 30
-        
+
         self.num_lines = num_lines
+        self.chart_name = chart_name
+        self.janela_idx = 0
 
-        self.values = [[] for _ in range(num_lines)]
+        # Buffers circulares: o valor mais antigo sai sozinho ao inserir um novo
+        self.values = [deque(maxlen=self.max_values) for _ in range(num_lines)]
         self.colors = [
             '#d5d5d5', '#4fb3ff', '#ff4f81', '#4fff81', '#ffb34f', '#b34fff',
             '#ffd24f', '#4fffff', '#ff4fff', '#7f7fff'
@@ -36,17 +52,38 @@ class LineChartFrame:
 
         self.frame = ttk.Frame(parent, padding="5")
         self.frame.pack()
-        
+
         self.title_label = ttk.Label(self.frame, text=chart_name, font=('Arial', 10))
         self.title_label.pack()
-        
+
         self.chart_canvas = tk.Canvas(self.frame, width=width, height=height, bg='black')
         self.chart_canvas.pack()
+        self.chart_canvas.bind("<MouseWheel>", lambda e: self.zoom(-1 if e.delta > 0 else 1))
+        self.chart_canvas.bind("<Button-4>", lambda e: self.zoom(-1))
+        self.chart_canvas.bind("<Button-5>", lambda e: self.zoom(1))
+        self.zoom(0)
 
         self.legend_frame = ttk.Frame(self.frame)
         self.legend_frame.pack(pady=(5, 0))
         self._draw_legend()
 
+        self.chart_left = self.left_pad
+        self.chart_right = self.width - self.right_pad
+        self.chart_top = self.top_pad
+        self.chart_bottom = self.height - self.bottom_pad
+        chart_width = self.chart_right - self.chart_left
+        # Posição x de cada ponto do buffer, calculada uma vez
+        self.x_positions = [self.chart_left + (i * chart_width // (self.max_values - 1))
+                            for i in range(self.max_values)]
+
+        self._draw_axes()
+        self.line_items = [
+            self.chart_canvas.create_line(0, 0, 0, 0, fill=self.colors[idx], width=2, state='hidden')
+            for idx in range(num_lines)
+        ]
+        self.scale_shown = None
+        self.lines_shown = set()
+
         self.update_chart([0]*num_lines, 100)
 
     def _draw_legend(self):
@@ -59,55 +96,100 @@ class LineChartFrame:
             color_canvas = tk.Canvas(self.legend_frame, width=20, height=15, bg='black', highlightthickness=0)
             color_canvas.create_rectangle(0, 0, 20, 15, fill=self.colors[idx], outline='white')
             color_canvas.pack(side="left", padx=(5, 2))
-            
+
             label_widget = ttk.Label(self.legend_frame, text=label)
             label_widget.pack(side="left", padx=(0, 10))
 
+    def _draw_axes(self):
+        """
+            Desenha eixos, grade e rótulos do eixo y (itens estáticos do canvas)
+        """
+        chart_height = self.chart_bottom - self.chart_top
+        self.chart_canvas.create_line(self.chart_left, self.chart_top, self.chart_left, self.chart_bottom,
+                                      fill='white', width=2)
+        self.chart_canvas.create_line(self.chart_left, self.chart_bottom, self.chart_right, self.chart_bottom,
+                                      fill='white', width=2)
+        self.scale_labels = []
+        for i in range(0, 11):
+            y = self.chart_bottom - (i * chart_height // 10)
+            self.chart_canvas.create_line(self.chart_left, y, self.chart_right, y, fill="#000000")
+            self.scale_labels.append(self.chart_canvas.create_text(5, y - 10, anchor='nw', fill='white', text=""))
+
+    def zoom(self, passo):
+        """
+            Aumenta (passo > 0) ou diminui a janela de tempo exibida por update_history
+        """
+        self.janela_idx = max(0, min(len(JANELAS_S) - 1, self.janela_idx + passo))
+        self.title_label.config(text=f"{self.chart_name} - {formata_janela(JANELAS_S[self.janela_idx])}")
+
+    def update_history(self, historico, max_value):
+        """
+            Desenha a janela de tempo atual do histórico, com no máximo uma coluna
+            (mínimo e máximo) por pixel do eixo x
+        """
+        if not self.chart_canvas.winfo_exists():
+            return
+        fim = historico.getUltimoTimestamp()
+        if fim is None:
+            return
+        janela = JANELAS_S[self.janela_idx]
+        largura = self.chart_right - self.chart_left
+        series = historico.consulta(fim - janela, fim, largura)
+
+        self.max_value = max([max_value, 10] + [maximo for serie in series for _, _, maximo in serie])
+        self._update_scale()
+
+        scale = (self.chart_bottom - self.chart_top) / self.max_value
+        bottom = self.chart_bottom
+        for item, serie in zip(self.line_items, series):
+            coords = []
+            for coluna, minimo, maximo in serie:
+                x = self.chart_left + coluna
+                coords.append(x)
+                coords.append(bottom - minimo * scale)
+                if maximo != minimo:
+                    coords.append(x)
+                    coords.append(bottom - maximo * scale)
+            self._set_line(item, coords)
+
+    def _update_scale(self):
+        # Rótulos do eixo y só mudam junto com a escala
+        if self.max_value != self.scale_shown:
+            for i, label in enumerate(self.scale_labels):
+                self.chart_canvas.itemconfigure(label, text=f"{self.max_value * i // 10}")
+            self.scale_shown = self.max_value
+
+    def _set_line(self, item, coords):
+        # Linhas precisam de ao menos dois pontos
+        if len(coords) < 4:
+            return
+        self.chart_canvas.coords(item, coords)
+        if item not in self.lines_shown:
+            self.chart_canvas.itemconfigure(item, state='normal')
+            self.lines_shown.add(item)
+
     def update_chart(self, current_values, max_value):
         """
-            Atualiza gráfico de linhas com valores passados por parâmetro 
+            Atualiza gráfico de linhas com valores passados por parâmetro
         """
+        if not self.chart_canvas.winfo_exists():
+            return
+
         self.max_value = max([max_value] + current_values + [10])
-        
-        # Insere cada valor no array de valores e remove o último
+
+        # Insere cada valor no buffer circular da sua linha
         for i, val in enumerate(current_values):
-            if len(self.values[i]) >= self.max_values:
-                self.values[i].pop(0)
             self.values[i].append(val)
-        
-        img = Image.new('RGB', (self.width, self.height), 'black')
-        draw = ImageDraw.Draw(img)
-        
-        chart_left = self.left_pad
-        chart_right = self.width - self.right_pad
-        chart_top = self.top_pad
-        chart_bottom = self.height - self.bottom_pad
-        chart_width = chart_right - chart_left
-        chart_height = chart_bottom - chart_top
-        
-        draw.line([(chart_left, chart_top), (chart_left, chart_bottom)], fill='white', width=2)
-        draw.line([(chart_left, chart_bottom), (chart_right, chart_bottom)], fill='white', width=2)
-        
-        for i in range(0, 11):
-            value = self.max_value * i // 10
-            y = chart_bottom - (i * chart_height // 10)
-            draw.line([(chart_left, y), (chart_right, y)], fill="#000000")
-            draw.text((5, y - 10), f"{value}", fill='white')
-        
-        # Insere novos pontos para cada linha
-        for idx, line_values in enumerate(self.values):
+
+        self._update_scale()
+
+        # Atualiza as coordenadas dos itens de linha existentes
+        scale = (self.chart_bottom - self.chart_top) / self.max_value
+        bottom = self.chart_bottom
+        for item, line_values in zip(self.line_items, self.values):
             if len(line_values) > 1:
-                points = []
-                for i, value in enumerate(line_values):
-                    x = chart_left + (i * chart_width // (self.max_values - 1))
-                    y = chart_bottom - (value * chart_height / self.max_value)
-                    points.append((x, y))
-                
-                draw.line(points, fill=self.colors[idx], width=2)
-        
-        self.photo = ImageTk.PhotoImage(img)
-        
-        if not self.chart_canvas.winfo_exists():
-            return
-        
-        self.chart_canvas.create_image(0, 0, anchor='nw', image=self.photo)
+                coords = []
+                for x, value in zip(self.x_positions, line_values):
+                    coords.append(x)
+                    coords.append(bottom - value * scale)
+                self._set_line(item, coords)
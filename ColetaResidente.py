@@ -0,0 +1,199 @@
+import time
+from collections import namedtuple
+from Processo import Processo
+from Tarefa import Tarefa
+from TabelaProcessos import TabelaProcessos, COLUNAS_COLETADAS
+from TabelaSockets import TabelaSockets
+from Reconciliacao import reconciliaIDs
+
+# Resposta de um trabalhador por tick, só com o que mudou desde a resposta anterior:
+# linhas da tabela (chave -> valores de COLUNAS_COLETADAS), chaves que saíram da tabela,
+# resumo dos processos (nome, usuário, threads, E/S) e detalhes dos PIDs com smaps ou fd
+# no tick. completo indica um trabalhador recém-criado: a resposta descreve o shard inteiro
+RespostaShard = namedtuple("RespostaShard", [
+    "completo", "linhas", "linhasRemovidas", "resumos", "detalhes", "tarefas", "tempo"
+])
+
+ResumoProcesso = namedtuple("ResumoProcesso", ["nome", "usuario", "numThreads", "leitura", "escrita", "threads"])
+
+DetalhesProcesso = namedtuple("DetalhesProcesso", ["memSegmentos", "memRollup", "dictIO", "cmdline", "exe"])
+
+class EstadoTrabalhador():
+    """
+        Estado de um processo do pool que vive entre os ticks: os objetos Processo do
+        shard (com descritores, caches de identidade, de fds e de maps), a tabela onde
+        eles escrevem, a tabela de sockets e o que já foi enviado ao processo principal
+    """
+    def __init__(self, prefixo):
+        self.prefixo = prefixo
+        self.tabela = TabelaProcessos()
+        self.tabelaSockets = TabelaSockets(prefixo)
+        self.processos = {}
+        self.linhasEnviadas = {}
+        self.resumosEnviados = {}
+        self.detalhesEnviados = {}
+        self.completo = True
+
+# Estado do trabalhador, criado pelo inicializador do pool (um por processo)
+_estado = None
+
+def iniciaTrabalhador(prefixo):
+    global _estado
+    _estado = EstadoTrabalhador(prefixo)
+
+def coletaShardResidente(pids, niveis):
+    """
+        Executada sempre no mesmo processo do pool para o mesmo shard: reconcilia os
+        processos residentes com os PIDs do shard, atualiza os sobreviventes com os
+        níveis agendados, cria os novos e responde apenas com as diferenças
+    """
+    inicio = time.perf_counter()
+    estado = _estado
+    estado.tabelaSockets.novoTick()
+    eventos = reconciliaIDs(estado.processos.keys(), pids)
+    for pid in eventos.removidos:
+        processo = estado.processos.pop(pid)
+        processo.liberaTabela()
+        processo.fechaDiretorio()
+        estado.resumosEnviados.pop(pid, None)
+        estado.detalhesEnviados.pop(pid, None)
+    for pid in eventos.sobreviventes:
+        estado.processos[pid].atualizaDadosProcesso(niveis[pid], estado.tabelaSockets)
+    for pid in eventos.adicionados:
+        try:
+            estado.processos[pid] = Processo(pid, niveis[pid], estado.tabelaSockets, estado.tabela, estado.prefixo)
+        except OSError:
+            # O processo terminou durante a leitura
+            continue
+
+    linhas = {}
+    enviadas = estado.linhasEnviadas
+    for chave, valores in estado.tabela.linhas(COLUNAS_COLETADAS):
+        if enviadas.get(chave) != valores:
+            linhas[chave] = enviadas[chave] = valores
+    linhasRemovidas = enviadas.keys() - estado.tabela.chaves()
+    for chave in linhasRemovidas:
+        del enviadas[chave]
+
+    resumos = {}
+    detalhes = {}
+    for pid, processo in estado.processos.items():
+        resumo = ResumoProcesso(
+            nome=processo.getNome(),
+            usuario=processo.getUsuario(),
+            numThreads=processo.getNumThreads(),
+            leitura=processo.getReadIO(),
+            escrita=processo.getWriteIO(),
+            threads=tuple((tid, thread.getNome(), thread.getUsuario())
+                          for tid, thread in processo.getThreadDict().items())
+        )
+        if estado.resumosEnviados.get(pid) != resumo:
+            resumos[pid] = estado.resumosEnviados[pid] = resumo
+        # Detalhes só mudam nos ticks em que os níveis detalhados rodaram
+        if pid in niveis and ("smaps" in niveis[pid] or "fd" in niveis[pid]):
+            detalhe = DetalhesProcesso(
+                memSegmentos=dict(processo.getMemSegments()),
+                memRollup=dict(processo.getMemRollup()),
+                dictIO=processo.dictIO,
+                cmdline=processo.getCmdline(),
+                exe=processo.getExe()
+            )
+            if estado.detalhesEnviados.get(pid) != detalhe:
+                detalhes[pid] = estado.detalhesEnviados[pid] = detalhe
+
+    completo = estado.completo
+    estado.completo = False
+    return RespostaShard(completo, linhas, linhasRemovidas, resumos, detalhes, len(estado.processos),
+                         time.perf_counter() - inicio)
+
+class EspelhoTarefa(Tarefa):
+    """
+        Tarefa coletada em um processo do pool, vista no processo principal: a linha fica
+        na tabela principal (atualizada com as linhas recebidas) e o objeto só guarda
+        nome e usuário. Não há descritores de /proc deste lado
+    """
+    __slots__ = ()
+
+    def __init__(self, id, chave, tabela):
+        self._id = id
+        self._prefixo = None
+        self._nome = None
+        self._usuario = None
+        self._tabela = tabela
+        self._chave = chave
+        self._caminho = None
+
+    def fechaDiretorio(self):
+        pass
+
+class EspelhoProcesso(EspelhoTarefa):
+    """
+        Processo coletado em um processo do pool: os getters lidos pelo instantâneo e
+        pela tela de detalhes, alimentados pelas respostas do trabalhador
+    """
+    __slots__ = ("_threads", "_numThreads", "_leitura", "_escrita", "_detalhes")
+
+    def __init__(self, pid, tabela):
+        super().__init__(pid, pid, tabela)
+        self._threads = {}
+        self._numThreads = 0
+        self._leitura = 0.0
+        self._escrita = 0.0
+        self._detalhes = DetalhesProcesso({}, {}, None, None, None)
+
+    def aplicaResumo(self, resumo):
+        self._nome = resumo.nome
+        self._usuario = resumo.usuario
+        self._numThreads = resumo.numThreads
+        self._leitura = resumo.leitura
+        self._escrita = resumo.escrita
+        threads = {}
+        for tid, nome, usuario in resumo.threads:
+            thread = self._threads.get(tid)
+            if thread is None:
+                thread = EspelhoTarefa(tid, (self._id, tid), self._tabela)
+            thread._nome = nome
+            thread._usuario = usuario
+            threads[tid] = thread
+        self._threads = threads
+
+    def aplicaDetalhes(self, detalhes):
+        self._detalhes = detalhes
+
+    def liberaTabela(self):
+        super().liberaTabela()
+        for thread in self._threads.values():
+            thread.liberaTabela()
+
+    def chavesTabela(self):
+        return {self._chave} | {thread.getChave() for thread in self._threads.values()}
+
+    def getThreadDict(self):
+        return self._threads
+
+    def getNumThreads(self):
+        return self._numThreads
+
+    def getCmdline(self):
+        return self._detalhes.cmdline
+
+    def getExe(self):
+        return self._detalhes.exe
+
+    def getMemVirt(self):
+        return self._tabela.valor("memVirt", self._chave)/1024  # Convertendo para MB
+
+    def getMemSegments(self):
+        return self._detalhes.memSegmentos
+
+    def getMemRollup(self):
+        return self._detalhes.memRollup
+
+    def getDictIO(self):
+        return self._detalhes.dictIO
+
+    def getReadIO(self):
+        return self._leitura
+
+    def getWriteIO(self):
+        return self._escrita
@@ -0,0 +1,166 @@
+import argparse
+import atexit
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from GerenciadorDados import GerenciadorDados, abreArquivosHistorico, historicoProcesso
+from HistoricoSeries import HistoricoSeries, SERIES_HISTORICO
+from MemoriaCompartilhada import (EscritorInstantaneos, LeitorInstantaneos, NOME_PADRAO, NUM_SLOTS_PADRAO,
+                                  TAMANHO_SLOT_PADRAO)
+
+ESPERA_SEGMENTO_S = 10.0
+
+def executaColetor(nome=NOME_PADRAO, intervalo=1.0, modoParalelo=None, numTrabalhadores=None, eventosProc=False,
+                   diretorioHistorico=None, tamanhoSlot=TAMANHO_SLOT_PADRAO, pidPai=None):
+    """
+        Laço do coletor em um processo próprio: coleta com GerenciadorDados e publica
+        cada instantâneo no anel de memória compartilhada. Os detalhes coletados são os
+        dos PIDs inscritos pelos leitores no cabeçalho do segmento. Termina com SIGTERM,
+        SIGINT ou quando o processo pidPai deixa de ser o pai
+    """
+    executando = [True]
+
+    def para(signum, frame):
+        executando[0] = False
+    signal.signal(signal.SIGTERM, para)
+    signal.signal(signal.SIGINT, para)
+
+    escritor = EscritorInstantaneos(nome, NUM_SLOTS_PADRAO, tamanhoSlot)
+    gerenciador = GerenciadorDados(modoParalelo, numTrabalhadores, eventosProc, diretorioHistorico)
+    inscritos = set()
+    try:
+        while executando[0] and (pidPai is None or os.getppid() == pidPai):
+            inicio = time.monotonic()
+            pedidos = escritor.getInscritos()
+            for pid in pedidos - inscritos:
+                gerenciador.inscreveDetalhes(pid)
+            for pid in inscritos - pedidos:
+                gerenciador.desinscreveDetalhes(pid)
+            inscritos = pedidos
+            gerenciador.atualizaDados()
+            escritor.publica(gerenciador.getInstantaneo())
+            time.sleep(max(0.0, intervalo - (time.monotonic() - inicio)))
+    finally:
+        gerenciador.encerra()
+        escritor.fecha()
+
+class GerenciadorRemoto():
+    """
+        Substituto do GerenciadorDados para as visões quando a coleta roda em outro
+        processo: atualizaDados só lê o último instantâneo do anel compartilhado, então
+        o parsing de /proc não disputa o GIL com o Tk. Mantém os próprios históricos dos
+        gráficos, alimentados pelos instantâneos lidos. Com iniciaColetor, o processo
+        coletor é criado aqui e encerrado junto
+    """
+    def __init__(self, nome=NOME_PADRAO, iniciaColetor=True, intervalo=1.0, modoParalelo=None,
+                 numTrabalhadores=None, eventosProc=False, diretorioHistorico=None):
+        self._processo = None
+        self._leitor = None
+        self._arquivosHistorico = {}
+        if iniciaColetor:
+            # spawn: o filho não herda as threads nem o estado do Tk. Não é daemon para
+            # poder ter o próprio pool (modoParalelo="processo"); encerra() o termina e o
+            # próprio coletor sai quando este processo deixa de ser o pai
+            contexto = multiprocessing.get_context("spawn")
+            self._processo = contexto.Process(
+                target=executaColetor, name="dashboard-os-coletor",
+                args=(nome, intervalo, modoParalelo, numTrabalhadores, eventosProc, diretorioHistorico,
+                      TAMANHO_SLOT_PADRAO, os.getpid()))
+            self._processo.start()
+            # Antes do join dos filhos no fim do interpretador, que esperaria o coletor
+            atexit.register(self.encerra)
+        self._leitor = self._conecta(nome)
+        self._historicos = {nome: HistoricoSeries(len(campos)) for nome, campos in SERIES_HISTORICO.items()}
+        # Histórico em disco gravado pelo coletor, mapeado só para leitura; já existe
+        # quando o primeiro instantâneo é publicado
+        self._historicosProcessos = {}
+        self._arquivosHistorico = abreArquivosHistorico(diretorioHistorico, True) if diretorioHistorico else {}
+        for nome in self._historicos:
+            if nome in self._arquivosHistorico:
+                self._arquivosHistorico[nome].carregaEm(self._historicos[nome])
+        self._seqHistorico = 0
+        self.atualizaDados()
+
+    def _conecta(self, nome):
+        # Espera o coletor criar o segmento e publicar o primeiro instantâneo
+        limite = time.monotonic() + ESPERA_SEGMENTO_S
+        while True:
+            try:
+                leitor = LeitorInstantaneos(nome)
+                if leitor.getSeq() > 0:
+                    return leitor
+                leitor.fecha()
+            except FileNotFoundError:
+                pass
+            if time.monotonic() > limite or (self._processo is not None and not self._processo.is_alive()):
+                raise RuntimeError(f"Coletor não publicou instantâneos em /dev/shm/{nome}")
+            time.sleep(0.05)
+
+    def atualizaDados(self, total=False):
+        instantaneo = self._leitor.getInstantaneo()
+        if instantaneo.seq == self._seqHistorico:
+            return
+        self._seqHistorico = instantaneo.seq
+        for nome, campos in SERIES_HISTORICO.items():
+            self._historicos[nome].adiciona(instantaneo.timestamp, [getattr(instantaneo, campo) for campo in campos])
+        for pid, historico in list(self._historicosProcessos.items()):
+            proc = instantaneo.getProcesso(pid)
+            if proc is not None:
+                historico.adiciona(instantaneo.timestamp, (proc.cpu, proc.mem, proc.leitura, proc.escrita))
+
+    def getInstantaneo(self):
+        return self._leitor.getInstantaneo()
+
+    def getHistorico(self, nome):
+        return self._historicos[nome]
+
+    def getArquivoHistorico(self, nome):
+        # Série gravada em disco pelo coletor (somente leitura), ou None
+        return self._arquivosHistorico.get(nome)
+
+    def getHistoricoProcesso(self, pid):
+        return self._historicosProcessos.get(int(pid))
+
+    def getPerfil(self):
+        # O perfil da coleta pertence ao processo coletor
+        return None
+
+    def inscreveDetalhes(self, pid):
+        pid = int(pid)
+        if pid not in self._historicosProcessos:
+            self._historicosProcessos[pid] = historicoProcesso(self._arquivosHistorico, pid)
+        if not self._leitor.inscreveDetalhes(pid):
+            print(f"Tabela de inscrições cheia: detalhes do PID {pid} não serão coletados", file=sys.stderr)
+
+    def desinscreveDetalhes(self, pid):
+        self._leitor.desinscreveDetalhes(pid)
+        self._historicosProcessos.pop(int(pid), None)
+
+    def encerra(self):
+        if self._leitor is not None:
+            self._leitor.fecha()
+        for arquivo in self._arquivosHistorico.values():
+            arquivo.fecha()
+        self._arquivosHistorico = {}
+        if self._processo is not None:
+            self._processo.terminate()
+            self._processo.join(timeout=2)
+            self._processo = None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coletor do dashboard-os publicando em memória compartilhada")
+    parser.add_argument("--nome", default=NOME_PADRAO, help="Nome do segmento em /dev/shm")
+    parser.add_argument("--intervalo", type=float, default=1.0, help="Segundos entre coletas")
+    parser.add_argument("--tamanho-slot", type=int, default=TAMANHO_SLOT_PADRAO, help="Bytes por instantâneo")
+    parser.add_argument("--paralelo", choices=["thread", "processo"], default=None, help="Coleta paralela")
+    parser.add_argument("--trabalhadores", type=int, default=None, help="Tamanho do pool da coleta paralela")
+    parser.add_argument("--eventos-proc", action="store_true", help="Usa o proc connector (netlink)")
+    parser.add_argument("--historico", default=None, help="Diretório do histórico em disco")
+    args = parser.parse_args(argv)
+    executaColetor(args.nome, args.intervalo, args.paralelo, args.trabalhadores, args.eventos_proc,
+                   args.historico, args.tamanho_slot)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import os
+import errno
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from StatTarefa import parseStat
+
+# Constantes de <linux/netlink.h>, <linux/connector.h> e <linux/cn_proc.h>
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+NLMSG_DONE = 3
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+
+PROC_EVENT_NONE = 0x00000000               # Confirmação de PROC_CN_MCAST_LISTEN/IGNORE
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+NLMSGHDR = struct.Struct("=IHHII")          # len, type, flags, seq, pid
+CN_MSG = struct.Struct("=IIIIHH")           # idx, val, seq, ack, len, flags
+PROC_EVENT = struct.Struct("=IIQ")          # what, cpu, timestamp_ns
+FORK_EVENT = struct.Struct("=IIII")         # parent_pid, parent_tgid, child_pid, child_tgid
+EXEC_EVENT = struct.Struct("=II")           # process_pid, process_tgid
+EXIT_EVENT = struct.Struct("=IIII")         # process_pid, process_tgid, exit_code, exit_signal
+ACK_EVENT = struct.Struct("=I")             # err
+
+# Quantidade de processos encerrados mantidos para consulta
+MAX_ENCERRADOS = 1000
+# Espera pela confirmação da assinatura: fora do namespace de rede inicial (containers)
+# o kernel aceita o bind mas nunca entrega mensagens do proc connector
+ESPERA_CONFIRMACAO_S = 1.0
+# Relistagem periódica de /proc, contra eventos perdidos sem ENOBUFS
+INTERVALO_RESYNC_S = 60.0
+
+class ConectorProc():
+    """
+        Mantém o conjunto de PIDs vivos a partir dos eventos fork/exec/exit do proc
+        connector (netlink), sem listar /proc a cada tick. Processos que terminam entre
+        duas coletas têm a contabilidade final (nome, utime, stime, código de saída)
+        registrada: os tempos vêm do stat do zumbi quando ele ainda existe e, se o pai já
+        o recolheu, da última amostra da coleta (ultimaAmostra(pid) -> (nome, utime,
+        stime) ou None, fornecida pelo GerenciadorDados). Sem privilégio (CAP_NET_ADMIN) o conector fica inativo e o
+        GerenciadorDados volta a listar /proc
+    """
+    def __init__(self, prefixo="/proc", ultimaAmostra=None):
+        self._prefixo = prefixo
+        self._ultimaAmostra = ultimaAmostra
+        self._sock = None
+        self._thread = None
+        self._rodando = False
+        self._ativo = False
+        self._lock = threading.Lock()
+        self._pids = set()
+        self._nomes = {}
+        self._encerrados = deque(maxlen=MAX_ENCERRADOS)
+        self._precisaResync = True
+        self._ultimoResync = 0.0
+        # Eventos (adicionado?, pid) recebidos enquanto um resync lista /proc, reaplicados
+        # sobre a listagem; None fora de um resync
+        self._eventosResync = None
+        # Confirmação recebida (ack sem erro ou qualquer evento): None enquanto não chega
+        self._confirmado = None
+
+    def inicia(self):
+        """
+            Assina os eventos do proc connector e espera a confirmação do kernel (o ack
+            da assinatura ou o primeiro evento); retorna False se não houver privilégio,
+            suporte no kernel ou se nada chegar (namespace sem proc connector)
+        """
+        try:
+            self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+            self._sock.bind((0, CN_IDX_PROC))
+            self._enviaOperacao(PROC_CN_MCAST_LISTEN)
+            self._esperaConfirmacao()
+            self._sock.settimeout(1.0)
+        except (OSError, AttributeError) as e:
+            print(f"Proc connector indisponível ({e}), usando listagem de /proc")
+            self._fechaSocket()
+            return False
+        self._ativo = True
+        self._rodando = True
+        # A listagem inicial é feita depois da assinatura para não perder eventos
+        self._resync()
+        self._thread = threading.Thread(target=self._loopEventos, daemon=True)
+        self._thread.start()
+        return True
+
+    def _enviaOperacao(self, operacao):
+        payload = struct.pack("=I", operacao)
+        cn = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0)
+        tamanho = NLMSGHDR.size + len(cn) + len(payload)
+        nl = NLMSGHDR.pack(tamanho, NLMSG_DONE, 0, 0, os.getpid())
+        self._sock.send(nl + cn + payload)
+
+    def _esperaConfirmacao(self):
+        limite = time.monotonic() + ESPERA_CONFIRMACAO_S
+        while self._confirmado is None:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise OSError(errno.ETIMEDOUT, "sem resposta à assinatura")
+            self._sock.settimeout(restante)
+            try:
+                dados = self._sock.recv(65536)
+            except socket.timeout:
+                continue
+            self._trataDatagrama(dados)
+        if not self._confirmado:
+            raise OSError(errno.EPERM, "assinatura recusada pelo kernel")
+
+    def _resync(self):
+        # Relista /proc (início, perda de eventos por estouro do buffer do socket ou a
+        # relistagem periódica). A listagem roda fora do lock: forks e saídas recebidos
+        # enquanto ela corre são registrados e reaplicados sobre o resultado
+        with self._lock:
+            self._eventosResync = []
+        try:
+            pids = {int(name) for name in os.listdir(self._prefixo) if name.isdigit()}
+        except OSError:
+            with self._lock:
+                self._eventosResync = None
+            return
+        with self._lock:
+            for adicionado, pid in self._eventosResync:
+                if adicionado:
+                    pids.add(pid)
+                else:
+                    pids.discard(pid)
+            self._eventosResync = None
+            self._pids = pids
+            # Nomes de processos que sumiram sem evento de saída (eventos perdidos)
+            for pid in list(self._nomes):
+                if pid not in pids:
+                    self._nomes.pop(pid, None)
+            self._precisaResync = False
+            self._ultimoResync = time.monotonic()
+
+    def _adicionaPid(self, pid):
+        with self._lock:
+            self._pids.add(pid)
+            if self._eventosResync is not None:
+                self._eventosResync.append((True, pid))
+
+    def _removePid(self, pid):
+        # Chamada com o lock já adquirido
+        self._pids.discard(pid)
+        if self._eventosResync is not None:
+            self._eventosResync.append((False, pid))
+
+    def _loopEventos(self):
+        while self._rodando:
+            try:
+                dados = self._sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    self._precisaResync = True
+                    continue
+                break
+            self._trataDatagrama(dados)
+
+    def _trataDatagrama(self, dados):
+        offset = 0
+        while offset + NLMSGHDR.size <= len(dados):
+            tamanho = NLMSGHDR.unpack_from(dados, offset)[0]
+            if tamanho < NLMSGHDR.size or offset + tamanho > len(dados):
+                # Cabeçalho inválido ou mensagem cortada: o resto do datagrama é descartado
+                break
+            inicioEvento = offset + NLMSGHDR.size + CN_MSG.size
+            if inicioEvento + PROC_EVENT.size <= offset + tamanho:
+                what, _, timestamp = PROC_EVENT.unpack_from(dados, inicioEvento)
+                try:
+                    self._trataEvento(what, dados[:offset + tamanho], inicioEvento + PROC_EVENT.size)
+                except struct.error:
+                    # Dados do evento menores que o tipo informado
+                    pass
+            offset += (tamanho + 3) & ~3  # NLMSG_ALIGN
+
+    def _trataEvento(self, what, dados, offset):
+        if what == PROC_EVENT_NONE:
+            if self._confirmado is None:
+                self._confirmado = ACK_EVENT.unpack_from(dados, offset)[0] == 0
+            return
+        # Um evento também mostra que as mensagens estão chegando
+        if self._confirmado is None:
+            self._confirmado = True
+        if what == PROC_EVENT_FORK:
+            _, _, child_pid, child_tgid = FORK_EVENT.unpack_from(dados, offset)
+            if child_pid == child_tgid:
+                # Novo processo (forks de threads aparecem em /proc/PID/task)
+                self._adicionaPid(child_tgid)
+                self._registraNome(child_tgid)
+        elif what == PROC_EVENT_EXEC:
+            _, tgid = EXEC_EVENT.unpack_from(dados, offset)
+            self._registraNome(tgid)
+        elif what == PROC_EVENT_EXIT:
+            pid, tgid, exit_code, _ = EXIT_EVENT.unpack_from(dados, offset)
+            if pid == tgid:
+                self._registraEncerramento(tgid, exit_code)
+
+    def _registraNome(self, pid):
+        try:
+            with open(f"{self._prefixo}/{pid}/comm") as f:
+                self._nomes[pid] = f.read().strip()
+        except OSError:
+            pass
+
+    def _registraEncerramento(self, pid, exit_code):
+        # Ponto de partida: a última amostra da coleta; o stat do zumbi, se o pai ainda
+        # não o recolheu, traz os tempos finais e a substitui
+        amostra = self._ultimaAmostra(pid) if self._ultimaAmostra is not None else None
+        nome, utime, stime = amostra if amostra is not None else (None, None, None)
+        origem = "amostra" if amostra is not None else None
+        try:
+            with open(f"{self._prefixo}/{pid}/stat") as f:
+                stat = parseStat(f.read())
+            utime, stime, origem = stat.utime, stat.stime, "stat"
+        except (OSError, ValueError, IndexError):
+            pass
+        with self._lock:
+            self._removePid(pid)
+            self._encerrados.append({
+                "pid": pid,
+                "nome": self._nomes.pop(pid, None) or nome,
+                "utime": utime,
+                "stime": stime,
+                "origem": origem,
+                "exit_code": exit_code >> 8,
+                "sinal": exit_code & 0x7f,
+                "timestamp": time.time()
+            })
+
+    def getPids(self):
+        """
+            Conjunto atual de PIDs vivos, no mesmo formato de Reconciliacao.listaIDs
+        """
+        if self._precisaResync or time.monotonic() - self._ultimoResync >= INTERVALO_RESYNC_S:
+            self._resync()
+        with self._lock:
+            return set(self._pids)
+
+    def getEncerrados(self):
+        with self._lock:
+            return list(self._encerrados)
+
+    def isAtivo(self):
+        return self._ativo
+
+    def _fechaSocket(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def encerra(self):
+        if not self._ativo:
+            return
+        self._rodando = False
+        try:
+            self._enviaOperacao(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._fechaSocket()
+        self._ativo = False
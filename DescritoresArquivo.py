@@ -0,0 +1,113 @@
+import os
+import stat
+
+TIPOS_INODE = {
+    stat.S_IFREG: "regular",
+    stat.S_IFDIR: "directory",
+    stat.S_IFCHR: "char_device",
+    stat.S_IFBLK: "block_device",
+    stat.S_IFIFO: "fifo",
+    stat.S_IFSOCK: "socket",
+    stat.S_IFLNK: "symlink"
+}
+
+def classificaDescritor(target):
+    """
+        Classifica um fd pelo alvo do link em /proc/PID/fd:
+        socket, pipe, anon_inode, semaforo (POSIX), dispositivo ou arquivo
+    """
+    if target.startswith("socket:"):
+        return "socket"
+    if target.startswith("pipe:"):
+        return "pipe"
+    if target.startswith("anon_inode:"):
+        return "anon_inode"
+    if target.startswith("/dev/shm/sem."):
+        return "semaforo"
+    if target.startswith("/dev/") and not target.startswith("/dev/shm/"):
+        return "dispositivo"
+    return "arquivo"
+
+class EntradaDescritor(dict):
+    """
+        Entrada de um fd. Os campos que dependem de stat (permissions, inode_type,
+        owner_uid e mode) só são calculados no primeiro acesso
+    """
+    CAMPOS_STAT = ("permissions", "inode_type", "owner_uid", "mode")
+
+    def __init__(self, fd_path, **campos):
+        super().__init__(**campos)
+        self._fd_path = fd_path
+
+    def __missing__(self, key):
+        if key not in self.CAMPOS_STAT:
+            raise KeyError(key)
+        self._preencheStat()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _preencheStat(self):
+        try:
+            st = os.stat(self._fd_path)
+            self.update({
+                "permissions": stat.filemode(st.st_mode),
+                "inode_type": TIPOS_INODE.get(stat.S_IFMT(st.st_mode), "unknown"),
+                "owner_uid": st.st_uid,
+                "mode": st.st_mode
+            })
+        except OSError:
+            self.update({"permissions": "?", "inode_type": "unknown", "owner_uid": None, "mode": 0})
+
+class VarreduraDescritores():
+    """
+        Varredura única de /proc/PID/fd por processo (scandir + readlink), com as entradas
+        em cache pela chave (fd, alvo): fds inalterados entre ticks reaproveitam a entrada
+        e não são classificados nem consultados por stat novamente
+    """
+    def __init__(self):
+        self._cache = {}
+
+    def varre(self, fd_dir):
+        cache = {}
+        entradas = []
+        negados = 0
+        try:
+            with os.scandir(fd_dir) as it:
+                for dirent in it:
+                    try:
+                        target = os.readlink(dirent.path)
+                    except FileNotFoundError:
+                        # O descritor foi fechado durante a varredura
+                        continue
+                    except PermissionError:
+                        negados += 1
+                        continue
+                    except OSError as e:
+                        print(f"FD {dirent.name}: erro ao ler ({e})")
+                        continue
+                    chave = (dirent.name, target)
+                    entrada = self._cache.get(chave)
+                    if entrada is None:
+                        entrada = EntradaDescritor(
+                            dirent.path,
+                            fd=dirent.name,
+                            type=classificaDescritor(target),
+                            target=target,
+                            real_path=target if target.startswith("/") else os.path.join(fd_dir, target)
+                        )
+                    cache[chave] = entrada
+                    entradas.append(entrada)
+        except FileNotFoundError:
+            print(f"Diretório {fd_dir} não encontrado.")
+        except PermissionError:
+            negados += 1
+        if negados:
+            print(f"{fd_dir}: [acesso negado]")
+        self._cache = cache
+        entradas.sort(key=lambda entrada: int(entrada["fd"]))
+        return entradas
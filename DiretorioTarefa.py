@@ -0,0 +1,227 @@
+import os
+import errno
+import resource
+import threading
+from PerfilColeta import perfilAtual
+
+TAMANHO_LEITURA = 4096
+
+# Erros que indicam que a tarefa dos descritores mantidos já terminou
+ERROS_TAREFA_ENCERRADA = (errno.ESRCH, errno.ENOENT)
+# Sem descritores livres (no processo ou no sistema): lê pelo caminho
+ERROS_SEM_DESCRITORES = (errno.EMFILE, errno.ENFILE)
+
+# Descritores deixados livres para o resto do programa (listagens, meminfo, sockets,
+# Tk): acima do limite menos a reserva, as tarefas leem pelo caminho sem manter nada aberto
+RESERVA_DESCRITORES = 1024
+
+_mantidos = 0
+_limiteMantidos = None
+_lockMantidos = threading.Lock()
+
+def _reservaDescritor():
+    global _mantidos, _limiteMantidos
+    with _lockMantidos:
+        if _limiteMantidos is None:
+            flexivel = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+            if flexivel == resource.RLIM_INFINITY:
+                flexivel = os.sysconf("SC_OPEN_MAX")
+            _limiteMantidos = max(0, flexivel - RESERVA_DESCRITORES)
+        if _mantidos >= _limiteMantidos:
+            return False
+        _mantidos += 1
+        return True
+
+def _liberaDescritor():
+    global _mantidos
+    with _lockMantidos:
+        _mantidos -= 1
+
+def _reduzOrcamento():
+    # EMFILE dentro do orçamento: o resto do programa usa mais que a reserva, então
+    # nenhum descritor novo é mantido até o limite ser recalculado
+    global _limiteMantidos
+    with _lockMantidos:
+        _limiteMantidos = _mantidos
+
+def _fechaMantido(fd):
+    try:
+        os.close(fd)
+    except OSError:
+        pass
+    _liberaDescritor()
+
+def elevaLimiteDescritores():
+    """
+        Eleva o limite flexível de descritores abertos ao limite rígido, já que cada
+        tarefa mantém alguns descritores de /proc abertos
+    """
+    global _limiteMantidos
+    try:
+        flexivel, rigido = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if rigido == resource.RLIM_INFINITY or flexivel < rigido:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (rigido, rigido))
+    except (ValueError, OSError):
+        pass
+    # O orçamento de descritores mantidos é recalculado com o novo limite
+    with _lockMantidos:
+        _limiteMantidos = None
+
+def _leDescritor(fd):
+    # pread a partir do offset 0: o procfs regera o conteúdo a cada leitura
+    partes = []
+    offset = 0
+    while True:
+        parte = os.pread(fd, TAMANHO_LEITURA, offset)
+        partes.append(parte)
+        if len(parte) < TAMANHO_LEITURA:
+            perfilAtual().conta("preads", len(partes))
+            return b"".join(partes)
+        offset += len(parte)
+
+# Handles persistentes de /proc/PID (ou /proc/PID/task/TID): um descritor O_PATH do
+# diretório e descritores de stat e statm mantidos abertos e relidos com pread, sem montar
+# o caminho e abrir o arquivo a cada tick. Os descritores ficam em colunas da
+# TabelaProcessos (-1: fechado), sem objeto por tarefa: as funções abaixo recebem a
+# tabela, a chave da linha e o caminho. Como os descritores apontam para a tarefa
+# original, um PID reutilizado é detectado ao reabrir pelo caminho (leStat) e comparar o
+# starttime (ver Tarefa). Esgotado o orçamento de descritores mantidos (limite de
+# RLIMIT_NOFILE menos a reserva), a tarefa passa a ler pelo caminho a cada tick
+COLUNA_DIRETORIO = "fdDir"
+# Arquivos relidos a cada tick pelo descritor mantido aberto (arquivo -> coluna)
+COLUNAS_DESCRITORES = {"stat": "fdStat", "statm": "fdStatm"}
+
+def _garanteDiretorio(tabela, chave, caminho):
+    # -1 se não há orçamento (ou descritor livre) para manter o diretório aberto
+    dirfd = tabela.descritor(COLUNA_DIRETORIO, chave)
+    if dirfd < 0:
+        if not _reservaDescritor():
+            return -1
+        try:
+            dirfd = os.open(caminho, os.O_PATH | os.O_DIRECTORY | os.O_CLOEXEC)
+        except OSError as e:
+            _liberaDescritor()
+            if e.errno in ERROS_SEM_DESCRITORES:
+                _reduzOrcamento()
+                return -1
+            raise
+        tabela.define(COLUNA_DIRETORIO, chave, dirfd)
+    return dirfd
+
+def _abreArquivo(tabela, chave, caminho, nome):
+    dirfd = _garanteDiretorio(tabela, chave, caminho)
+    if dirfd < 0:
+        return os.open(f"{caminho}/{nome}", os.O_RDONLY | os.O_CLOEXEC)
+    return os.open(nome, os.O_RDONLY | os.O_CLOEXEC, dir_fd=dirfd)
+
+def _leTransitorio(tabela, chave, caminho, nome):
+    try:
+        fd = _abreArquivo(tabela, chave, caminho, nome)
+    except OSError as e:
+        if e.errno not in ERROS_SEM_DESCRITORES:
+            raise
+        return _lePorCaminho(tabela, chave, caminho, nome)
+    try:
+        return _leDescritor(fd)
+    finally:
+        os.close(fd)
+
+def le(tabela, chave, caminho, nome):
+    """
+        Lê um arquivo da tarefa. stat e statm usam o descritor mantido aberto; os
+        demais são abertos relativos ao descritor do diretório
+    """
+    coluna = COLUNAS_DESCRITORES.get(nome)
+    if coluna is None:
+        return _leTransitorio(tabela, chave, caminho, nome)
+    fd = tabela.descritor(coluna, chave)
+    if fd < 0:
+        if not _reservaDescritor():
+            return _leTransitorio(tabela, chave, caminho, nome)
+        try:
+            fd = _abreArquivo(tabela, chave, caminho, nome)
+        except OSError as e:
+            _liberaDescritor()
+            if e.errno not in ERROS_SEM_DESCRITORES:
+                raise
+            return _lePorCaminho(tabela, chave, caminho, nome)
+        tabela.define(coluna, chave, fd)
+    return _leDescritor(fd)
+
+def _lePorCaminho(tabela, chave, caminho, nome):
+    # Sem descritores livres: devolve os descritores mantidos pela tarefa, para que
+    # a leitura tenha um livre, e deixa de manter novos (ver _reduzOrcamento)
+    fecha(tabela, chave)
+    _reduzOrcamento()
+    with open(f"{caminho}/{nome}", "rb") as f:
+        return f.read()
+
+def _temDescritores(tabela, chave):
+    return any(tabela.descritor(coluna, chave) >= 0
+               for coluna in (COLUNA_DIRETORIO, *COLUNAS_DESCRITORES.values()))
+
+def leStat(tabela, chave, caminho):
+    """
+        Retorna o conteúdo de stat. Se os descritores mantidos pertencem a uma tarefa
+        que já terminou, reabre pelo caminho uma vez: o PID pode ter sido reutilizado
+    """
+    try:
+        return le(tabela, chave, caminho, "stat").decode(errors="replace")
+    except OSError as e:
+        if e.errno not in ERROS_TAREFA_ENCERRADA or not _temDescritores(tabela, chave):
+            raise
+    fecha(tabela, chave)
+    return le(tabela, chave, caminho, "stat").decode(errors="replace")
+
+def leTexto(tabela, chave, caminho, nome):
+    """
+        comm ou cmdline (argumentos separados por espaço). Retorna None se o arquivo
+        não pode ser lido
+    """
+    try:
+        dados = le(tabela, chave, caminho, nome)
+    except OSError:
+        return None
+    return dados.decode(errors="replace").replace("\0", " ").strip()
+
+def leLink(tabela, chave, caminho, nome):
+    # Alvo de um link da tarefa (ex.: exe), ou None
+    try:
+        dirfd = _garanteDiretorio(tabela, chave, caminho)
+        return os.readlink(nome, dir_fd=dirfd) if dirfd >= 0 else os.readlink(f"{caminho}/{nome}")
+    except OSError:
+        return None
+
+def uidReal(tabela, chave, caminho):
+    """
+        UID real da tarefa (primeiro campo da linha Uid: de status), lido uma vez por
+        identidade (coluna "uid"). O dono do diretório não serve: é o UID efetivo, e o
+        kernel o troca por root em tarefas não "dumpable" (setuid, PR_SET_DUMPABLE).
+        None se status não pode ser lido
+    """
+    uid = tabela.valor("uid", chave)
+    if uid >= 0:
+        return uid
+    try:
+        dados = le(tabela, chave, caminho, "status")
+    except OSError:
+        return None
+    for linha in dados.split(b"\n"):
+        if linha.startswith(b"Uid:"):
+            uid = int(linha.split()[1])
+            tabela.define("uid", chave, uid)
+            return uid
+    return None
+
+def fecha(tabela, chave):
+    # Fecha os descritores mantidos da tarefa (nada a fazer se a linha já saiu da tabela)
+    for coluna in (*COLUNAS_DESCRITORES.values(), COLUNA_DIRETORIO):
+        fd = tabela.descritor(coluna, chave)
+        if fd >= 0:
+            tabela.define(coluna, chave, -1)
+            _fechaMantido(fd)
+
+def fechaTabela(tabela):
+    # Fecha os descritores mantidos de todas as tarefas da tabela
+    for chave in list(tabela.chaves()):
+        fecha(tabela, chave)
@@ -17,6 +17,8 @@ class Statvfs(Structure):
         ('f_fsid', c_ulong),
         ('f_flag', c_ulong),
         ('f_namemax', c_ulong),
+        # Reservado na struct statvfs da glibc; sem ele statvfs escreve além do buffer
+        ('__f_spare', ctypes.c_int * 6),
     ]
 
 libc.statvfs.argtypes = [c_char_p, ctypes.POINTER(Statvfs)]
@@ -56,7 +58,8 @@ DTYPES = {
 }
 
 class FileInfo():
-    def __init__(self):
+    def __init__(self, prefixoProc="/proc"):
+        self._prefixoProc = prefixoProc
         self.particoes = None
         self.folder_content = None
         self._curr_folder = "/"
@@ -72,7 +75,7 @@ class FileInfo():
             seen_mounts = set()
             
             try:
-                with open('/proc/mounts', 'r') as f:
+                with open(f'{self._prefixoProc}/mounts', 'r') as f:
                     mounts = f.readlines()
             except FileNotFoundError:
                 print("Não foi possível acessar /proc/mounts.")
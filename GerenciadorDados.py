@@ -1,12 +1,119 @@
 from Processo import Processo
+from AmostradorCPU import AmostradorCPU, CAMPOS_CPU
+from Reconciliacao import listaIDs, reconciliaIDs
+from AgendadorNiveis import AgendadorNiveis
+from TabelaSockets import TabelaSockets
+from TabelaProcessos import TabelaProcessos
+from ConectorProc import ConectorProc
+from DiretorioTarefa import elevaLimiteDescritores, fechaTabela
+from Instantaneo import DetalhesInstantaneo, CAMPOS_SISTEMA, INSTANTANEO_VAZIO, montaInstantaneo
+from HistoricoSeries import HistoricoSeries, SERIES_HISTORICO
+from ArquivoHistorico import ArquivoHistorico
+from PerfilColeta import PerfilColeta, perfilAtual
+from ColetaResidente import iniciaTrabalhador, coletaShardResidente, EspelhoProcesso
 import os
-import time
 import sys
+import time
 import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 user_uid = os.getuid()
 
+# Historico em disco: registros por arquivo (retencao) e intervalo entre as sincronias
+# dos arquivos com o disco (msync), feitas fora da thread da coleta
+CAPACIDADE_HISTORICO_DISCO = 24 * 3600
+INTERVALO_SINCRONIA_HISTORICO_S = 30
+# Historico por processo: os de maior uso de CPU em cada tick, mais os inscritos, em um
+# unico arquivo (o PID e um dos campos); ao inscrever um PID, a ultima hora dele e
+# recarregada do disco para o grafico de detalhes
+TOP_PROCESSOS_HISTORICO = 10
+CAMPOS_PROCESSO_HISTORICO = ["pid", "cpu", "mem", "leitura", "escrita"]
+AQUECIMENTO_HISTORICO_PROCESSO_S = 3600
+# Etapas de um tick de atualizaDados, na ordem em que rodam (ver executaEtapa)
+ETAPAS_COLETA = ("procDict", "memInfo", "cpuInfo", "instantaneo")
+
+def abreArquivosHistorico(diretorio, somenteLeitura=False):
+    """
+        Arquivos do historico em disco de cada serie dos graficos e dos processos
+        (nome -> ArquivoHistorico); com somenteLeitura, os de um coletor em outro
+        processo. Vazio se indisponivel
+    """
+    try:
+        if not somenteLeitura:
+            os.makedirs(diretorio, exist_ok=True)
+        arquivos = {nome: ArquivoHistorico(os.path.join(diretorio, f"{nome}.hist"), campos,
+                                           CAPACIDADE_HISTORICO_DISCO, somenteLeitura)
+                    for nome, campos in SERIES_HISTORICO.items()}
+        arquivos["processos"] = ArquivoHistorico(os.path.join(diretorio, "processos.hist"),
+                                                 CAMPOS_PROCESSO_HISTORICO,
+                                                 CAPACIDADE_HISTORICO_DISCO * TOP_PROCESSOS_HISTORICO,
+                                                 somenteLeitura)
+        return arquivos
+    except (OSError, ValueError) as e:
+        print(f"Histórico em disco indisponível ({e})", file=sys.stderr)
+        return {}
+
+def historicoProcesso(arquivos, pid):
+    """
+        HistoricoSeries (cpu, mem, leitura e escrita) de um PID, comecando com a ultima
+        hora dele no arquivo de processos, se houver
+    """
+    historico = HistoricoSeries(len(CAMPOS_PROCESSO_HISTORICO) - 1)
+    arquivo = arquivos.get("processos")
+    if arquivo is not None:
+        arquivo.carregaEm(historico, AQUECIMENTO_HISTORICO_PROCESSO_S, ("pid", pid))
+    return historico
+
+def _coletaShard(processos, novos, niveis, tabelaSockets=None, tabela=None, prefixo="/proc", perfil=None):
+    """
+        Atualiza os processos existentes e cria os processos novos de um shard com os
+        níveis de métricas agendados para cada PID, a tabela de sockets do tick e a
+        TabelaProcessos onde os novos processos são inseridos (uma tabela própria por
+        processo se None), retornando os processos coletados e o tempo gasto no shard.
+        prefixo é a raiz do procfs e perfil o PerfilColeta do GerenciadorDados (None não mede)
+    """
+    inicio = time.perf_counter()
+    if perfil is not None:
+        perfil.marcaThread()
+    perfil = perfilAtual()
+    resultado = {}
+    for pid, processo in processos:
+        inicioPid = time.perf_counter()
+        processo.atualizaDadosProcesso(niveis[pid], tabelaSockets)
+        perfil.registraPid(pid, time.perf_counter() - inicioPid)
+        resultado[pid] = processo
+    for pid in novos:
+        inicioPid = time.perf_counter()
+        try:
+            resultado[pid] = Processo(pid, niveis[pid], tabelaSockets, tabela, prefixo)
+        except OSError:
+            # O processo terminou durante a leitura
+            continue
+        perfil.registraPid(pid, time.perf_counter() - inicioPid)
+    return resultado, time.perf_counter() - inicio
+
 class GerenciadorDados():
-    def __init__(self):
+    def __init__(self, modoParalelo=None, numTrabalhadores=None, eventosProc=False, diretorioHistorico=None,
+                 prefixoProc="/proc"):
+        """
+            modoParalelo: None (coleta serial), "thread" ou "processo" para distribuir os
+            PIDs em shards entre um pool de numTrabalhadores (padrao: numero de CPUs)
+            eventosProc: mantem a lista de processos pelos eventos do proc connector
+            (netlink) em vez de listar /proc a cada tick, se houver privilegio
+            diretorioHistorico: grava o historico das metricas em arquivos mapeados em
+            memoria nesse diretorio (None desativa)
+            prefixoProc: raiz do procfs lida pela coleta (ex.: uma arvore gerada por
+            ProcFalso); o proc connector so e usado com o /proc real
+        """
+        self._prefixoProc = prefixoProc
+        self._modoParalelo = modoParalelo
+        self._numTrabalhadores = numTrabalhadores or os.cpu_count() or 1
+        self._executor = None
+        # Modo "processo": um pool de um processo por shard, para que cada PID seja
+        # sempre coletado pelo mesmo trabalhador (ver ColetaResidente)
+        self._trabalhadores = []
+        self._temposShards = []
         self._processos = {}
         self._memTotal = None
         self._memLivre = None
@@ -26,44 +133,310 @@ class GerenciadorDados():
         self._cpuIrq = None
         self._cpuSoftIrq = None
         self._numProcessos = None
-        self._numThreads = None
+        self._numThreads = 0
+        self._eventosProcessos = None
+        self._amostrador = AmostradorCPU()
+        self._agendador = AgendadorNiveis()
+        self._tabelaSockets = TabelaSockets(prefixoProc)
+        self._tabela = TabelaProcessos()
+        # Cada tarefa mantem descritores de /proc abertos entre os ticks
+        elevaLimiteDescritores()
+        self._conector = None
+        if eventosProc and prefixoProc == "/proc":
+            conector = ConectorProc(ultimaAmostra=self._ultimaAmostra)
+            if conector.inicia():
+                self._conector = conector
+        # Ultimo instantaneo completo publicado para as visoes (ver _publicaInstantaneo)
+        self._seq = 0
+        self._instantaneo = INSTANTANEO_VAZIO
+        self._historicos = {nome: HistoricoSeries(len(campos)) for nome, campos in SERIES_HISTORICO.items()}
+        # Series dos PIDs inscritos (ver historicoProcesso)
+        self._historicosProcessos = {}
+        self._arquivosHistorico = self._abreHistoricoDisco(diretorioHistorico) if diretorioHistorico else {}
+        self._fimSincronia = threading.Event()
+        self._sincronizador = None
+        if self._arquivosHistorico:
+            self._sincronizador = threading.Thread(target=self._sincronizaHistorico, daemon=True)
+            self._sincronizador.start()
         self._dictlock = threading.Lock()
+        # Perfil da coleta desta instancia (ver PerfilColeta)
+        self._perfil = PerfilColeta()
         self.atualizaDados(True)
 
     def atualizaDados(self, total=False):
-        with self._dictlock:
-            self._atualizaProcDict()
-        self._atualizaMemInfo(total=total)
-        self._atualizaCPUInfo()
+        # Cada etapa entra no perfil do tick (ver PerfilColeta)
+        self._perfil.iniciaTick()
+        for etapa in ETAPAS_COLETA:
+            self.executaEtapa(etapa, total)
+        self._perfil.finalizaTick(self._seq)
+
+    def executaEtapa(self, etapa, total=False):
+        """
+            Executa uma única etapa do tick (um nome de ETAPAS_COLETA), com o mesmo lock e
+            a mesma medida no perfil de atualizaDados. Usada pelos benchmarks para medir
+            as etapas isoladamente
+        """
+        if etapa == "procDict":
+            # As subetapas (listagem, coleta) são medidas dentro de _atualizaProcDict
+            with self._dictlock:
+                self._atualizaProcDict()
+            return
+        inicio = self._perfil.inicio()
+        if etapa == "memInfo":
+            self._atualizaMemInfo(total=total)
+        elif etapa == "cpuInfo":
+            self._atualizaCPUInfo()
+        elif etapa == "instantaneo":
+            self._publicaInstantaneo()
+        else:
+            raise ValueError(f"Etapa desconhecida: {etapa}")
+        self._perfil.fim(etapa, inicio)
+
+    def _publicaInstantaneo(self):
+        # Monta o proximo instantaneo enquanto as visoes leem o anterior e o publica com
+        # uma unica troca de referencia (atomica): nenhuma visao precisa de lock nem ve
+        # um tick pela metade
+        detalhes = {}
+        for pid in self._agendador.getInscritos():
+            processo = self._processos.get(pid)
+            if processo is not None:
+                detalhes[pid] = DetalhesInstantaneo(
+                    numThreads=processo.getNumThreads(),
+                    memVirt=processo.getMemVirt(),
+                    memSegmentos=dict(processo.getMemSegments()),
+                    memRollup=dict(processo.getMemRollup()),
+                    dictIO=processo.getDictIO()
+                )
+        sistema = {campo: getattr(self, "_" + campo) for campo in CAMPOS_SISTEMA}
+        self._seq += 1
+        self._instantaneo = montaInstantaneo(self._seq, time.time(), self.getProcessosOrdenados("cpu"),
+                                             detalhes, sistema)
+        timestamp = self._instantaneo.timestamp
+        for nome, campos in SERIES_HISTORICO.items():
+            valores = [sistema[campo] for campo in campos]
+            self._historicos[nome].adiciona(timestamp, valores)
+            if nome in self._arquivosHistorico:
+                self._arquivosHistorico[nome].adiciona(timestamp, valores)
+        historicosProcessos = list(self._historicosProcessos.items())
+        for pid, historico in historicosProcessos:
+            proc = self._instantaneo.getProcesso(pid)
+            if proc is not None:
+                historico.adiciona(timestamp, (proc.cpu, proc.mem, proc.leitura, proc.escrita))
+        if "processos" in self._arquivosHistorico:
+            gravados = list(self._instantaneo.processos[:TOP_PROCESSOS_HISTORICO])
+            topo = {proc.id for proc in gravados}
+            gravados += [self._instantaneo.getProcesso(pid) for pid, _ in historicosProcessos if pid not in topo]
+            self._arquivosHistorico["processos"].adicionaLote([
+                (timestamp, (proc.id, proc.cpu, proc.mem, proc.leitura, proc.escrita))
+                for proc in gravados if proc is not None
+            ])
+
+    def _abreHistoricoDisco(self, diretorio):
+        # Um arquivo por serie dos graficos; os graficos em memoria comecam com tudo o
+        # que o disco retem, entao as janelas longas (24 h, 7 dias) usam os rollups do disco
+        arquivos = abreArquivosHistorico(diretorio)
+        for nome in self._historicos:
+            if nome in arquivos:
+                arquivos[nome].carregaEm(self._historicos[nome])
+        return arquivos
+
+    def _sincronizaHistorico(self):
+        # Thread de sincronia: o msync dos arquivos de historico nao bloqueia os ticks
+        while not self._fimSincronia.wait(INTERVALO_SINCRONIA_HISTORICO_S):
+            for arquivo in list(self._arquivosHistorico.values()):
+                arquivo.sincroniza()
 
     def _atualizaProcDict(self):
-        try:
-            pid_list = [name for name in os.listdir(f"/proc/") if name.isdigit()]
-        except Exception as e:
-            print(f"Error reading task directory: {e}")
-            pid_list = []
+        # Reconcilia a tabela de processos com a listagem de /proc (ou com os PIDs vivos
+        # segundo o proc connector) por diferenca de conjuntos
+        inicio = self._perfil.inicio()
+        listados = self._conector.getPids() if self._conector is not None else listaIDs(self._prefixoProc)
+        eventos = reconciliaIDs(self._processos.keys(), listados)
+        self._perfil.fim("listagem", inicio)
         # Deletar processos que nao estao mais ativos
-        for existing_pid in list(self._processos.keys()):
-            if existing_pid not in map(int, pid_list):
-                del self._processos[existing_pid]
-        # Atualizar processos ativos
-        for pid in pid_list:
-            if os.path.exists(f"/proc/{pid}"):
-                if int(pid) not in self._processos:
-                    self._processos[int(pid)] = Processo(pid)
-                else:
-                    self._processos[int(pid)].atualizaDadosProcesso()
-            elif int(pid) in self._processos:
-                del self._processos[int(pid)]
+        for pid in eventos.removidos:
+            processo = self._processos.pop(pid)
+            self._numThreads -= processo.getNumThreads()
+            processo.liberaTabela()
+            processo.fechaDiretorio()
+        # Atualizar processos ativos e criar processos novos
+        threadsAntes = {pid: self._processos[pid].getNumThreads() for pid in eventos.sobreviventes}
+        inicio = self._perfil.inicio()
+        coletados = self._coletaProcessos(eventos.sobreviventes, eventos.adicionados)
+        self._perfil.fim("coleta", inicio)
+        for pid, processo in coletados.items():
+            self._processos[pid] = processo
+            self._numThreads += processo.getNumThreads() - threadsAntes.get(pid, 0)
+        self._eventosProcessos = eventos
         self._numProcessos = len(self._processos)
 
+    def _coletaProcessos(self, sobreviventes, adicionados):
+        self._agendador.novoTick()
+        self._tabelaSockets.novoTick()
+        inscritos = self._agendador.getInscritos()
+        niveis = {pid: self._agendador.niveisPara(pid, inscritos) for pid in sobreviventes | adicionados}
+
+        # Coleta serial: um unico shard executado na thread atual
+        if self._modoParalelo is None:
+            resultado, tempo = _coletaShard([(pid, self._processos[pid]) for pid in sobreviventes], adicionados, niveis,
+                                            self._tabelaSockets, self._tabela, self._prefixoProc, self._perfil)
+            self._temposShards = [{"shard": 0, "tarefas": len(resultado), "tempo_s": tempo}]
+            return resultado
+
+        if self._modoParalelo == "processo":
+            return self._coletaResidente(sobreviventes | adicionados, niveis)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._numTrabalhadores)
+
+        # Distribui os PIDs intercalados entre os shards para equilibrar a carga
+        sobreviventes = sorted(sobreviventes)
+        adicionados = sorted(adicionados)
+        futuros = []
+        for i in range(self._numTrabalhadores):
+            futuros.append(self._executor.submit(_coletaShard,
+                                                 [(pid, self._processos[pid]) for pid in sobreviventes[i::self._numTrabalhadores]],
+                                                 adicionados[i::self._numTrabalhadores], niveis,
+                                                 self._tabelaSockets, self._tabela, self._prefixoProc, self._perfil))
+
+        resultado = {}
+        self._temposShards = []
+        for i, futuro in enumerate(futuros):
+            shard, tempo = futuro.result()
+            resultado.update(shard)
+            self._temposShards.append({"shard": i, "tarefas": len(shard), "tempo_s": tempo})
+        return resultado
+
+    def _criaTrabalhador(self):
+        # forkserver evita copiar as threads do Tk para os processos do pool
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("forkserver"),
+                                   initializer=iniciaTrabalhador, initargs=(self._prefixoProc,))
+
+    def _coletaResidente(self, pids, niveis):
+        """
+            Coleta em processos do pool com os objetos Processo residentes: o shard de um
+            PID é fixo (pid % numTrabalhadores), então descritores e caches continuam no
+            mesmo trabalhador entre os ticks. Cada trabalhador responde só com as linhas
+            da tabela e os resumos que mudaram, aplicados aqui na tabela principal e nos
+            EspelhoProcesso; o cálculo de CPU continua sobre a tabela principal, como na
+            coleta serial
+        """
+        n = self._numTrabalhadores
+        if not self._trabalhadores:
+            self._trabalhadores = [self._criaTrabalhador() for _ in range(n)]
+        shards = [set() for _ in range(n)]
+        for pid in pids:
+            shards[pid % n].add(pid)
+        futuros = [self._submeteShard(i, shards[i], niveis) for i in range(n)]
+
+        resultado = {}
+        self._temposShards = []
+        for i, futuro in enumerate(futuros):
+            try:
+                resposta = futuro.result()
+            except BrokenProcessPool:
+                # Trabalhador morto durante o tick: um novo recoleta o shard do zero
+                resposta = self._submeteShard(i, shards[i], niveis, recria=True).result()
+            resultado.update(self._aplicaResposta(i, resposta))
+            self._temposShards.append({"shard": i, "tarefas": resposta.tarefas, "tempo_s": resposta.tempo})
+        return resultado
+
+    def _submeteShard(self, shard, pids, niveis, recria=False):
+        # Um trabalhador morto (o pool já sabe que quebrou) é trocado por um novo, que
+        # responde com o shard completo
+        if not recria:
+            try:
+                return self._trabalhadores[shard].submit(coletaShardResidente, pids,
+                                                         {pid: niveis[pid] for pid in pids})
+            except BrokenProcessPool:
+                pass
+        self._trabalhadores[shard].shutdown(wait=False, cancel_futures=True)
+        self._trabalhadores[shard] = self._criaTrabalhador()
+        return self._trabalhadores[shard].submit(coletaShardResidente, pids, {pid: niveis[pid] for pid in pids})
+
+    def _aplicaResposta(self, shard, resposta):
+        # Linhas primeiro (as threads novas dos resumos ja tem linha), depois os resumos
+        # e detalhes, e por fim as linhas que sairam
+        for chave, valores in resposta.linhas.items():
+            self._tabela.escreveLinha(chave, valores)
+        n = self._numTrabalhadores
+        processos = {pid: processo for pid, processo in self._processos.items() if pid % n == shard}
+        if resposta.completo:
+            # Trabalhador novo: o que ele nao mandou nao existe mais (removido como em
+            # _atualizaProcDict, inclusive da contagem de threads)
+            for pid in list(processos):
+                if pid not in resposta.resumos:
+                    processo = processos.pop(pid)
+                    self._numThreads -= processo.getNumThreads()
+                    processo.liberaTabela()
+                    self._processos.pop(pid)
+            for processo in processos.values():
+                for chave in processo.chavesTabela() - resposta.linhas.keys():
+                    self._tabela.remove(chave)
+        for pid, resumo in resposta.resumos.items():
+            processo = processos.get(pid)
+            if processo is None:
+                processo = processos[pid] = EspelhoProcesso(pid, self._tabela)
+            processo.aplicaResumo(resumo)
+        for pid, detalhes in resposta.detalhes.items():
+            if pid in processos:
+                processos[pid].aplicaDetalhes(detalhes)
+        for chave in resposta.linhasRemovidas:
+            self._tabela.remove(chave)
+        # Processos que terminaram durante a criacao no trabalhador nao tem resumo
+        return {pid: processo for pid, processo in processos.items() if pid in self._tabela}
+
+    def _ultimaAmostra(self, pid):
+        # Chamada pela thread do proc connector quando um processo termina: nome e
+        # tempos de CPU da ultima coleta (a linha so sai da tabela no proximo tick)
+        processo = self._processos.get(pid)
+        if processo is None:
+            return None
+        try:
+            return processo.getNome(), self._tabela.valor("utime", pid), self._tabela.valor("stime", pid)
+        except (KeyError, IndexError):
+            # Linha removida ou movida pela coleta no meio da leitura
+            return None
+
+    def inscreveDetalhes(self, pid):
+        # Passa a coletar as metricas detalhadas (smaps, fds, sockets) do PID em todo tick
+        # e a manter a serie historica dele (getHistoricoProcesso)
+        pid = int(pid)
+        if pid not in self._historicosProcessos:
+            self._historicosProcessos[pid] = historicoProcesso(self._arquivosHistorico, pid)
+        self._agendador.inscreve(pid)
+
+    def desinscreveDetalhes(self, pid):
+        self._agendador.desinscreve(pid)
+        self._historicosProcessos.pop(int(pid), None)
+
+    def encerra(self):
+        # Finaliza o proc connector e o pool de trabalhadores da coleta paralela e fecha
+        # os descritores de /proc mantidos pelas tarefas (ficam nas colunas da tabela)
+        if self._conector is not None:
+            self._conector.encerra()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for trabalhador in self._trabalhadores:
+            trabalhador.shutdown(wait=False, cancel_futures=True)
+        self._trabalhadores = []
+        self._fimSincronia.set()
+        if self._sincronizador is not None:
+            self._sincronizador.join()
+            self._sincronizador = None
+        for arquivo in self._arquivosHistorico.values():
+            arquivo.fecha()
+        self._arquivosHistorico = {}
+        fechaTabela(self._tabela)
+
     def _atualizaMemInfo(self, total=False):
         # Utiliza informacoes do /proc/meminfo
         # Memoria Fisica: campos MemTotal, MemFree, Buffers, Cached e SReclaimable
         # Memoria Virtual: campos CommitLimit, Committed_AS e VmallocUsed
         meminfo = {}
         try:
-            with open('/proc/meminfo', 'r') as f:
+            with open(f'{self._prefixoProc}/meminfo', 'r') as f:
                 for line in f:
                     key = line.split(':')[0]
                     val = line.split(':')[1].strip().split()[0]
@@ -81,7 +454,7 @@ class GerenciadorDados():
         
         # Calculo de memoria virtual
         try:
-            with open('/proc/meminfo', 'r') as f:
+            with open(f'{self._prefixoProc}/meminfo', 'r') as f:
                 meminfo = {line.split(':')[0]: line.split(':')[1].strip() 
                         for line in f.readlines()}
             
@@ -94,65 +467,28 @@ class GerenciadorDados():
         self._memVirtualLivre = self._memVirtualTotal - self._memVirtualUso
 
     def _atualizaCPUInfo(self):
-        # Captura a variacao do uso de CPU em 1s acessando /proc/stat 
-        # pelos campos user, nice, system, idle, iowait, irq, softirq para CPU geral
+        # Captura o uso de CPU acessando /proc/stat pelos campos user, nice, system, idle,
+        # iowait, irq, softirq e steal para CPU geral
         # Captura o uso de CPU dos processos e threads acessando /proc/[pid]/stat
         # pelo uso de CPU em modo de usuario e sistema (utime e stime)
-        # Calcula o delta de uso de CPU em 1s para cada processo e thread
+        # Os percentuais sao calculados contra a amostra do tick anterior, guardada no
+        # AmostradorCPU; o intervalo entre amostras e definido apenas pelo agendador
 
         def ler_cpu_tempos():
-            with open('/proc/stat', 'r') as f:
+            with open(f'{self._prefixoProc}/stat', 'r') as f:
                 for line in f:
                     if line.startswith('cpu '):  # Note the space to exclude per-core lines like 'cpu0'
                         parts = line.strip().split()
-                        # Extract the first 8 fields: user, nice, system, idle, iowait, irq, softirq
+                        # Extract the first 8 fields: user, nice, system, idle, iowait, irq, softirq, steal
                         values = list(map(int, parts[1:9]))
-                        keys = ['user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal']
-                        return dict(zip(keys, values))
-        
-        def ler_procs_cpu():
-            cpus_p = {}
-            cpus_t_per_p = {}
-            for pid, processo in self._processos.items():
-                cpus_t = {}
-                cpu_time = processo._capturaCPUUso()  # Captura o uso de CPU do processo
-                if cpu_time is not None:
-                    cpus_p[pid] = cpu_time
-                for tid, thread in processo.getThreadDict().items():
-                    cpu_time = thread._capturaCPUUso()  # Captura o uso de CPU do processo
-                    if cpu_time is not None:
-                        cpus_t[tid] = cpu_time
-                cpus_t_per_p[pid] = cpus_t
-            return cpus_p, cpus_t_per_p
-
-        t1 = ler_cpu_tempos()
-        p1, tr1 = ler_procs_cpu()
-        time.sleep(2)                           # Sleep for 1 second
-        t2 = ler_cpu_tempos()
-        p2, tr2 = ler_procs_cpu()
-
-        deltas = {}
-        total_delta = 0
-        for key in t1:
-            deltas[key] = t2[key] - t1[key]     # Tempo de CPU por tipo de uso em 1s
-            total_delta += deltas[key]          # Total de tempo de CPU usado em 1s
-
-        for pid in p1:
-            if pid in p2:
-                delta = p2[pid] - p1[pid]
-                cpu_percent = (delta / total_delta) * 100
-                self._processos[pid].atualizaCPU(cpu_percent)
-                for tid in tr1[pid]:
-                    if tid in tr2[pid] and tid in tr1[pid]:
-                        delta = tr2[pid][tid] - tr1[pid][tid]
-                        cpu_percent = (delta / total_delta) * 100
-                        threads = self._processos[pid].getThreadDict()
-                        threads[int(tid)].atualizaCPU(cpu_percent)
-
-        percentages = {}
-        for key in deltas:
-            percentages[key] = (deltas[key] / total_delta) * 100 if total_delta else 0.0
-        cpuTotal = sum(percentages.values())  # Total de tempo de CPU usado em 1s
+                        return dict(zip(CAMPOS_CPU, values))
+
+        percentages = self._amostrador.iniciaTick(ler_cpu_tempos())
+
+        # Percentual de CPU de todos os processos e threads de uma vez, sobre as colunas da tabela
+        self._tabela.atualizaCPU(self._amostrador.getDeltaTotal())
+
+        cpuTotal = sum(percentages.values())  # Total de tempo de CPU usado no intervalo
         
         self._cpuSistema = percentages['system']
         self._cpuUsuario = percentages['user']
@@ -160,8 +496,13 @@ class GerenciadorDados():
         self._cpuWait = percentages['iowait']
         self._cpuIrq = percentages['irq']
         self._cpuSoftIrq = percentages['softirq']
-        self._cpuOcioso = (percentages['idle'] + self._cpuWait) / cpuTotal * 100
-        self._cpuUso = (cpuTotal - self._cpuOcioso) / cpuTotal * 100
+        if cpuTotal:
+            self._cpuOcioso = (percentages['idle'] + self._cpuWait) / cpuTotal * 100
+            self._cpuUso = (cpuTotal - self._cpuOcioso) / cpuTotal * 100
+        else:
+            # Primeira amostra: ainda nao ha tick anterior para comparar
+            self._cpuOcioso = 0.0
+            self._cpuUso = 0.0
 
     def getMemTotal(self):
         return self._memTotal
@@ -214,14 +555,49 @@ class GerenciadorDados():
     def getCpuSoftIrq(self):
         return self._cpuSoftIrq
     
+    def getInstantaneo(self):
+        # Leitura sem bloqueio do ultimo tick completo
+        return self._instantaneo
+
+    def getHistorico(self, nome):
+        # HistoricoSeries de um grafico ("cpu", "mem" ou "memV")
+        return self._historicos[nome]
+
+    def getArquivoHistorico(self, nome):
+        # Serie gravada em disco ("cpu", "mem", "memV" ou "processos"), ou None
+        return self._arquivosHistorico.get(nome)
+
+    def getHistoricoProcesso(self, pid):
+        # HistoricoSeries (cpu, mem, leitura, escrita) de um PID inscrito, ou None
+        return self._historicosProcessos.get(int(pid))
+
     def getProcDict(self):
         return self._processos
     
+    def getProcessosOrdenados(self, coluna="cpu", reverso=True):
+        # Processos ordenados por uma coluna da TabelaProcessos
+        return [self._processos[pid] for pid in self._tabela.ordena(coluna, reverso, apenasProcessos=True)
+                if pid in self._processos]
+
     def getNumProcessos(self):
         return self._numProcessos
     
     def getNumThreads(self):
-        num_threads = 0
-        for processo in self._processos.values():
-            num_threads += processo.getNumThreads()
-        return num_threads
+        return self._numThreads
+
+    def getEventosProcessos(self):
+        return self._eventosProcessos
+
+    def getTabelaSockets(self):
+        return self._tabelaSockets
+
+    def getProcessosEncerrados(self):
+        # Contabilidade final dos processos encerrados (apenas com o proc connector ativo)
+        return self._conector.getEncerrados() if self._conector is not None else []
+
+    def getTemposShards(self):
+        return self._temposShards
+
+    def getPerfil(self):
+        # PerfilColeta com os ticks recentes (etapas, chamadas e PIDs mais lentos)
+        return self._perfil
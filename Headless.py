@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from GerenciadorDados import GerenciadorDados
+from FileInfo import FileInfo
+from Instantaneo import CAMPOS_SISTEMA
+from PerfilColeta import perfilComoDict
+
+# Métricas de sistema exportadas no formato do Prometheus: (nome, ajuda, {rótulo: campo})
+METRICAS_SISTEMA = [
+    ("dashboard_cpu_percent", "Uso de CPU por modo (%)", "modo", {
+        "uso": "cpuUso", "ocioso": "cpuOcioso", "sistema": "cpuSistema", "usuario": "cpuUsuario",
+        "nice": "cpuNice", "wait": "cpuWait", "irq": "cpuIrq", "softirq": "cpuSoftIrq"}),
+    ("dashboard_memoria_mb", "Memória física (MB)", "tipo", {
+        "total": "memTotal", "livre": "memLivre", "uso": "memUso", "buffer": "memBuffer", "cache": "memCache"}),
+    ("dashboard_memoria_virtual_mb", "Memória virtual (MB)", "tipo", {
+        "limite": "memVirtualTotal", "livre": "memVirtualLivre", "requerida": "memVirtualUso",
+        "kernel": "memVirtualKernelUso"}),
+]
+
+# Resposta do endpoint antes da primeira coleta: o servidor já aceita conexões, mas ainda
+# não há métricas (um corpo vazio com 200 seria lido como "nenhuma série")
+RESPOSTA_SEM_COLETA = (b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\nContent-Length: 0\r\n"
+                       b"Connection: close\r\n\r\n")
+
+def _escapaRotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def serializaJSON(instantaneo, particoes, topProcessos, perfil=None, estadosTcp=None, portasEscuta=None):
+    """
+        Uma linha JSON com as métricas de sistema, os topProcessos de maior uso de CPU,
+        as partições, os sockets (estados TCP e portas em escuta, com os donos dentre os
+        processos exportados) e o perfil da coleta do tick
+    """
+    registro = {"seq": instantaneo.seq, "timestamp": instantaneo.timestamp}
+    for campo in CAMPOS_SISTEMA:
+        registro[campo] = getattr(instantaneo, campo)
+    registro["processos"] = [
+        {"pid": p.id, "nome": p.nome, "usuario": p.usuario, "cpu": p.cpu, "mem": p.mem,
+         "estado": p.estado, "leitura": p.leitura, "escrita": p.escrita, "threads": len(p.threads)}
+        for p in instantaneo.processos[:topProcessos]
+    ]
+    registro["particoes"] = particoes
+    registro["estadosTcp"] = dict(estadosTcp or {})
+    registro["portasEscuta"] = [
+        {"proto": proto, "porta": porta, "pids": sorted(pids)}
+        for (proto, porta), pids in sorted((portasEscuta or {}).items())
+    ]
+    registro["perfil"] = perfilComoDict(perfil)
+    return json.dumps(registro, ensure_ascii=False) + "\n"
+
+def serializaPrometheus(instantaneo, particoes, topProcessos, perfil=None, estadosTcp=None):
+    """
+        Texto no formato de exposição do Prometheus (versão 0.0.4)
+    """
+    linhas = []
+    for nome, ajuda, rotulo, campos in METRICAS_SISTEMA:
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} gauge")
+        for valorRotulo, campo in campos.items():
+            linhas.append(f'{nome}{{{rotulo}="{valorRotulo}"}} {getattr(instantaneo, campo) or 0}')
+    linhas.append("# HELP dashboard_processos Número de processos")
+    linhas.append("# TYPE dashboard_processos gauge")
+    linhas.append(f"dashboard_processos {instantaneo.numProcessos or 0}")
+    linhas.append("# HELP dashboard_threads Número de threads")
+    linhas.append("# TYPE dashboard_threads gauge")
+    linhas.append(f"dashboard_threads {instantaneo.numThreads or 0}")
+
+    processos = instantaneo.processos[:topProcessos]
+    for nome, ajuda, atributo in (("dashboard_processo_cpu_percent", "Uso de CPU do processo (%)", "cpu"),
+                                  ("dashboard_processo_memoria_mb", "Memória do processo (MB)", "mem"),
+                                  ("dashboard_processo_leitura_mb", "Leitura de disco do processo (MB)", "leitura"),
+                                  ("dashboard_processo_escrita_mb", "Escrita de disco do processo (MB)", "escrita")):
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} gauge")
+        for p in processos:
+            linhas.append(f'{nome}{{pid="{p.id}",nome="{_escapaRotulo(p.nome)}"}} {getattr(p, atributo) or 0}')
+
+    linhas.append("# HELP dashboard_particao_uso_percent Uso da partição (%)")
+    linhas.append("# TYPE dashboard_particao_uso_percent gauge")
+    for c in particoes:
+        linhas.append(f'dashboard_particao_uso_percent{{dispositivo="{_escapaRotulo(c["disp"])}",'
+                      f'ponto="{_escapaRotulo(c["mountp"])}"}} {c["uso_pct"]}')
+    linhas.append("# HELP dashboard_sockets_tcp Sockets TCP (IPv4 e IPv6) por estado")
+    linhas.append("# TYPE dashboard_sockets_tcp gauge")
+    for estado, quantidade in sorted((estadosTcp or {}).items()):
+        linhas.append(f'dashboard_sockets_tcp{{estado="{estado}"}} {quantidade}')
+    linhas.append("# HELP dashboard_coleta_seq Sequência do último instantâneo coletado")
+    linhas.append("# TYPE dashboard_coleta_seq counter")
+    linhas.append(f"dashboard_coleta_seq {instantaneo.seq}")
+    if perfil is not None:
+        linhas.extend(_linhasPerfil(perfil))
+    return "\n".join(linhas) + "\n"
+
+def _linhasPerfil(perfil):
+    # Perfil do último tick da coleta (PerfilColeta)
+    linhas = ["# HELP dashboard_coleta_duracao_segundos Duração do último tick da coleta",
+              "# TYPE dashboard_coleta_duracao_segundos gauge",
+              f"dashboard_coleta_duracao_segundos {perfil.duracao}",
+              "# HELP dashboard_coleta_cpu_segundos Tempo de CPU da thread da coleta no último tick",
+              "# TYPE dashboard_coleta_cpu_segundos gauge",
+              f"dashboard_coleta_cpu_segundos {perfil.cpu}",
+              "# HELP dashboard_coleta_etapa_segundos Tempo de parede por etapa no último tick",
+              "# TYPE dashboard_coleta_etapa_segundos gauge"]
+    linhas.extend(f'dashboard_coleta_etapa_segundos{{etapa="{etapa}"}} {tempo.parede}'
+                  for etapa, tempo in perfil.etapas.items())
+    linhas.append("# HELP dashboard_coleta_etapa_cpu_segundos Tempo de CPU por etapa no último tick")
+    linhas.append("# TYPE dashboard_coleta_etapa_cpu_segundos gauge")
+    linhas.extend(f'dashboard_coleta_etapa_cpu_segundos{{etapa="{etapa}"}} {tempo.cpu}'
+                  for etapa, tempo in perfil.etapas.items())
+    linhas.append("# HELP dashboard_coleta_chamadas Chamadas de E/S da coleta no último tick")
+    linhas.append("# TYPE dashboard_coleta_chamadas gauge")
+    linhas.extend(f'dashboard_coleta_chamadas{{tipo="{tipo}"}} {quantidade}'
+                  for tipo, quantidade in perfil.chamadas.items())
+    # Posição no ranking como rótulo (cardinalidade fixa); os PIDs só vão para o JSON
+    linhas.append("# HELP dashboard_coleta_pid_lento_segundos Tempo de coleta dos PIDs mais lentos do último "
+                  "tick, por posição")
+    linhas.append("# TYPE dashboard_coleta_pid_lento_segundos gauge")
+    linhas.extend(f'dashboard_coleta_pid_lento_segundos{{rank="{posicao}"}} {duracao}'
+                  for posicao, (pid, duracao) in enumerate(perfil.pidsLentos, 1))
+    return linhas
+
+class ColetorHeadless():
+    """
+        Coleta sem interface gráfica: atualiza GerenciadorDados e FileInfo em intervalos
+        fixos, escreve cada instantâneo como uma linha JSON e mantém a resposta do
+        endpoint do Prometheus já serializada, então um scrape nunca lê /proc
+    """
+    def __init__(self, args):
+        self._args = args
+        self._gerenciador = GerenciadorDados(args.paralelo, args.trabalhadores, args.eventos_proc, args.historico)
+        self._fileinfo = FileInfo()
+        self._respostaMetricas = RESPOSTA_SEM_COLETA
+        self._saida = None
+
+    async def executa(self):
+        loop = asyncio.get_running_loop()
+        servidor = None
+        if self._args.porta:
+            servidor = await asyncio.start_server(self._atendeCliente, self._args.endereco, self._args.porta)
+        if self._args.saida == "-":
+            self._saida = sys.stdout
+        elif self._args.saida:
+            self._saida = open(self._args.saida, "a", encoding="utf-8")
+        try:
+            tick = 0
+            while not self._args.ticks or tick < self._args.ticks:
+                inicio = time.monotonic()
+                # A leitura de /proc roda fora do loop de eventos para não travar o servidor
+                await loop.run_in_executor(None, self._coleta)
+                tick += 1
+                await asyncio.sleep(max(0.0, self._args.intervalo - (time.monotonic() - inicio)))
+        finally:
+            if servidor is not None:
+                servidor.close()
+                await servidor.wait_closed()
+            if self._saida is not None and self._saida is not sys.stdout:
+                self._saida.close()
+            self._gerenciador.encerra()
+
+    def _coleta(self):
+        self._gerenciador.atualizaDados()
+        self._fileinfo.mostrar_info_particoes()
+        instantaneo = self._gerenciador.getInstantaneo()
+        perfil = self._gerenciador.getPerfil().getUltimo()
+        particoes = list(self._fileinfo.particoes)
+        tabelaSockets = self._gerenciador.getTabelaSockets()
+        estadosTcp = tabelaSockets.histogramaEstados()
+        corpo = serializaPrometheus(instantaneo, particoes, self._args.processos, perfil, estadosTcp).encode()
+        # Resposta HTTP completa montada uma vez por tick e trocada por referência
+        self._respostaMetricas = (
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            + f"Content-Length: {len(corpo)}\r\n".encode()
+            + b"Connection: close\r\n\r\n" + corpo
+        )
+        if self._saida is not None:
+            # Donos das portas só entre os processos exportados (não varre os fds de todos)
+            portas = tabelaSockets.portasEscuta([p.id for p in instantaneo.processos[:self._args.processos]])
+            self._saida.write(serializaJSON(instantaneo, particoes, self._args.processos, perfil,
+                                            estadosTcp, portas))
+            self._saida.flush()
+
+    async def _atendeCliente(self, reader, writer):
+        try:
+            requisicao = await reader.readline()
+            # Descarta os cabeçalhos da requisição
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            partes = requisicao.split()
+            if len(partes) >= 2 and partes[0] == b"GET" and partes[1].split(b"?")[0] == b"/metrics":
+                writer.write(self._respostaMetricas)
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coleta do dashboard-os sem interface gráfica")
+    parser.add_argument("--intervalo", type=float, default=1.0, help="Segundos entre coletas")
+    parser.add_argument("--ticks", type=int, default=0, help="Número de coletas (0: sem limite)")
+    parser.add_argument("--saida", default="-", help="Arquivo das linhas JSON ('-' para stdout, '' desativa)")
+    parser.add_argument("--processos", type=int, default=20, help="Processos de maior uso de CPU exportados")
+    parser.add_argument("--porta", type=int, default=0, help="Porta do endpoint /metrics do Prometheus (0 desativa)")
+    parser.add_argument("--endereco", default="0.0.0.0", help="Endereço do endpoint /metrics")
+    parser.add_argument("--paralelo", choices=["thread", "processo"], default=None, help="Coleta paralela")
+    parser.add_argument("--trabalhadores", type=int, default=None, help="Tamanho do pool da coleta paralela")
+    parser.add_argument("--eventos-proc", action="store_true", help="Usa o proc connector (netlink)")
+    parser.add_argument("--historico", default=None, help="Diretório do histórico em disco")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(ColetorHeadless(args).executa())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import threading
+from collections import deque, namedtuple
+
+# Níveis de resolução: (nome, duração do balde em segundos, capacidade em pontos).
+# O nível "bruto" guarda um ponto por tick; os demais, um rollup min/média/máx por balde
+NivelHistorico = namedtuple("NivelHistorico", ["nome", "passo_s", "capacidade"])
+
+NIVEIS_PADRAO = (
+    NivelHistorico("bruto", 0, 3600),       # ~1 h de ticks de 1 s
+    NivelHistorico("10s", 10, 8640),        # 24 h
+    NivelHistorico("1min", 60, 10080),      # 7 dias
+    NivelHistorico("10min", 600, 4320),     # 30 dias
+)
+
+# Séries históricas de cada gráfico (campos do Instantaneo, na ordem das linhas)
+SERIES_HISTORICO = {
+    "cpu": ["cpuUso", "cpuOcioso", "cpuSistema", "cpuUsuario", "cpuNice", "cpuWait", "cpuIrq", "cpuSoftIrq"],
+    "mem": ["memLivre", "memUso", "memBuffer", "memCache"],
+    "memV": ["memVirtualTotal", "memVirtualKernelUso", "memVirtualUso"],
+}
+
+# Ponto de um nível: início do balde (ou instante do tick) e mínimo, média e máximo por série
+PontoHistorico = namedtuple("PontoHistorico", ["timestamp", "minimos", "medias", "maximos"])
+
+class _Balde():
+    # Rollup em andamento de um nível agregado
+    __slots__ = ("inicio", "contagem", "somas", "minimos", "maximos")
+
+    def __init__(self, inicio, valores):
+        self.inicio = inicio
+        self.contagem = 1
+        self.somas = list(valores)
+        self.minimos = list(valores)
+        self.maximos = list(valores)
+
+    def adiciona(self, valores):
+        self.contagem += 1
+        for i, valor in enumerate(valores):
+            self.somas[i] += valor
+            if valor < self.minimos[i]:
+                self.minimos[i] = valor
+            if valor > self.maximos[i]:
+                self.maximos[i] = valor
+
+    def fecha(self):
+        return PontoHistorico(self.inicio, tuple(self.minimos),
+                              tuple(soma / self.contagem for soma in self.somas), tuple(self.maximos))
+
+class HistoricoSeries():
+    """
+        Séries temporais de tamanho fixo em várias resoluções: ticks brutos e rollups
+        (mínimo, média e máximo) de 10 s, 1 min e 10 min, cada nível em um buffer
+        circular. A memória depende só das capacidades dos níveis, não do uptime.
+        consulta() escolhe o nível que cobre a janela pedida e a reduz a no máximo uma
+        coluna (mínimo e máximo) por pixel
+    """
+    def __init__(self, numSeries, niveis=NIVEIS_PADRAO):
+        self._numSeries = numSeries
+        self._niveis = niveis
+        self._pontos = {nivel.nome: deque(maxlen=nivel.capacidade) for nivel in niveis}
+        self._baldes = {nivel.nome: None for nivel in niveis if nivel.passo_s}
+        self._ultimo = None
+        # A coleta escreve e a interface consulta em threads diferentes
+        self._lock = threading.Lock()
+
+    def adiciona(self, timestamp, valores):
+        with self._lock:
+            self._adiciona(timestamp, tuple(valores))
+
+    def adicionaLote(self, registros):
+        # Vários (timestamp, valores) em ordem, com um único lock (recarga do disco)
+        with self._lock:
+            for timestamp, valores in registros:
+                self._adiciona(timestamp, tuple(valores))
+
+    def _adiciona(self, timestamp, valores):
+        self._ultimo = timestamp
+        for nivel in self._niveis:
+            if not nivel.passo_s:
+                self._pontos[nivel.nome].append(PontoHistorico(timestamp, valores, valores, valores))
+                continue
+            inicio = timestamp - timestamp % nivel.passo_s
+            balde = self._baldes[nivel.nome]
+            if balde is not None and balde.inicio == inicio:
+                balde.adiciona(valores)
+                continue
+            # Novo balde: o anterior está completo
+            if balde is not None:
+                self._pontos[nivel.nome].append(balde.fecha())
+            self._baldes[nivel.nome] = _Balde(inicio, valores)
+
+    def getUltimoTimestamp(self):
+        return self._ultimo
+
+    def getNiveis(self):
+        return self._niveis
+
+    def getPontos(self, nome):
+        # Pontos fechados do nível (o balde em andamento fica de fora)
+        return self._pontos[nome]
+
+    def _pontosNivel(self, nivel):
+        pontos = self._pontos[nivel.nome]
+        balde = self._baldes.get(nivel.nome)
+        return pontos, balde.fecha() if balde is not None else None
+
+    def _escolheNivel(self, inicio, fim, largura):
+        # Entre os níveis que cobrem o início da janela, o mais grosso cujo passo ainda
+        # cabe em um pixel; sem cobertura, o nível com o ponto mais antigo
+        duracaoPixel = (fim - inicio) / max(1, largura)
+        cobrem = [nivel for nivel in self._niveis
+                  if self._pontos[nivel.nome] and self._pontos[nivel.nome][0].timestamp <= inicio]
+        if cobrem:
+            cabem = [nivel for nivel in cobrem if nivel.passo_s <= duracaoPixel]
+            return cabem[-1] if cabem else cobrem[0]
+        com_pontos = [nivel for nivel in self._niveis if self._pontos[nivel.nome]]
+        if not com_pontos:
+            return self._niveis[0]
+        return min(com_pontos, key=lambda nivel: self._pontos[nivel.nome][0].timestamp)
+
+    def consulta(self, inicio, fim, largura):
+        """
+            Pontos da janela [inicio, fim] reduzidos a colunas de pixel por mínimo/máximo:
+            retorna, para cada série, uma lista de (coluna, minimo, maximo) com coluna em
+            [0, largura)
+        """
+        if fim <= inicio or largura <= 0:
+            return [[] for _ in range(self._numSeries)]
+        with self._lock:
+            return self._consulta(inicio, fim, int(largura))
+
+    def _consulta(self, inicio, fim, largura):
+        colunas = [{} for _ in range(self._numSeries)]
+        nivel = self._escolheNivel(inicio, fim, largura)
+        pontos, aberto = self._pontosNivel(nivel)
+        escala = largura / (fim - inicio)
+
+        def acumula(ponto):
+            coluna = min(largura - 1, int((ponto.timestamp - inicio) * escala))
+            for serie, (minimo, maximo) in enumerate(zip(ponto.minimos, ponto.maximos)):
+                atual = colunas[serie].get(coluna)
+                if atual is None:
+                    colunas[serie][coluna] = [minimo, maximo]
+                else:
+                    if minimo < atual[0]:
+                        atual[0] = minimo
+                    if maximo > atual[1]:
+                        atual[1] = maximo
+
+        # Percorre do mais novo para o mais antigo e para ao sair da janela
+        janela = []
+        for ponto in reversed(pontos):
+            if ponto.timestamp < inicio:
+                break
+            if ponto.timestamp <= fim:
+                janela.append(ponto)
+        for ponto in reversed(janela):
+            acumula(ponto)
+        if aberto is not None and inicio <= aberto.timestamp <= fim:
+            acumula(aberto)
+
+        return [[(coluna, minimo, maximo) for coluna, (minimo, maximo) in sorted(serie.items())]
+                for serie in colunas]
@@ -0,0 +1,72 @@
+from collections import namedtuple
+from types import MappingProxyType
+
+# Linha de um processo ou thread no instantâneo (threads têm leitura/escrita None)
+TarefaInstantaneo = namedtuple("TarefaInstantaneo", [
+    "id", "nome", "usuario", "cpu", "mem", "estado", "prioB", "prioD", "leitura", "escrita", "threads"
+])
+
+# Métricas detalhadas, montadas apenas para os PIDs inscritos (tela de detalhes)
+DetalhesInstantaneo = namedtuple("DetalhesInstantaneo", [
+    "numThreads", "memVirt", "memSegmentos", "memRollup", "dictIO"
+])
+
+CAMPOS_SISTEMA = [
+    "cpuUso", "cpuOcioso", "cpuSistema", "cpuUsuario", "cpuNice", "cpuWait", "cpuIrq", "cpuSoftIrq",
+    "memTotal", "memLivre", "memUso", "memBuffer", "memCache",
+    "memVirtualTotal", "memVirtualLivre", "memVirtualUso", "memVirtualKernelUso",
+    "numProcessos", "numThreads"
+]
+
+class Instantaneo(namedtuple("Instantaneo", ["seq", "timestamp", "processos", "porPid", "detalhes"] + CAMPOS_SISTEMA)):
+    """
+        Estado completo de um tick da coleta, imutável depois de publicado.
+        processos: tupla de TarefaInstantaneo ordenada por CPU; porPid e detalhes são
+        mapeamentos somente leitura por PID. seq cresce a cada publicação, então uma
+        visão que já desenhou o mesmo seq pode pular o trabalho
+    """
+    __slots__ = ()
+
+    def getProcesso(self, pid):
+        return self.porPid.get(pid)
+
+    def getDetalhes(self, pid):
+        return self.detalhes.get(pid)
+
+def tarefaInstantaneo(tarefa, leitura=None, escrita=None, threads=()):
+    return TarefaInstantaneo(
+        id=tarefa.getID(),
+        nome=tarefa.getNome(),
+        usuario=tarefa.getUsuario(),
+        cpu=tarefa.getCPU(),
+        mem=tarefa.getMem(),
+        estado=tarefa.getEstado(),
+        prioB=tarefa.getPrioB(),
+        prioD=tarefa.getPrioD(),
+        leitura=leitura,
+        escrita=escrita,
+        threads=threads
+    )
+
+def montaInstantaneo(seq, timestamp, processos, detalhes, sistema):
+    """
+        processos: objetos Processo já ordenados; detalhes: PID -> DetalhesInstantaneo;
+        sistema: valores de CAMPOS_SISTEMA
+    """
+    linhas = tuple(
+        tarefaInstantaneo(
+            processo, processo.getReadIO(), processo.getWriteIO(),
+            tuple(tarefaInstantaneo(thread) for thread in processo.getThreadDict().values())
+        )
+        for processo in processos
+    )
+    return Instantaneo(
+        seq=seq,
+        timestamp=timestamp,
+        processos=linhas,
+        porPid=MappingProxyType({linha.id: linha for linha in linhas}),
+        detalhes=MappingProxyType(detalhes),
+        **sistema
+    )
+
+INSTANTANEO_VAZIO = montaInstantaneo(0, 0.0, [], {}, dict.fromkeys(CAMPOS_SISTEMA, 0))
@@ -3,13 +3,25 @@ from ttkbootstrap import Style
 from ttkbootstrap.widgets import Meter, LabelFrame
 from tkinter import ttk
 from Chart import LineChartFrame
+from ArvoreVirtual import ArvoreVirtual
+from SincronizadorArvore import SincronizadorArvore
 from GerenciadorDados import GerenciadorDados
+from ColetorExterno import GerenciadorRemoto
+from PerfilInterface import PerfilQuadros, SobreposicaoPerfil
 import threading
 import time
 from FileInfo import FileInfo
 
 UI_UPDATE_TIME_MS = 1000
-DATA_UPDATE_TIME_S = 0.5
+DATA_UPDATE_TIME_S = 1.0
+COLETA_PARALELA = None      # None (serial), "thread" ou "processo"
+NUM_TRABALHADORES = None    # Tamanho do pool da coleta paralela (padrao: numero de CPUs)
+EVENTOS_PROC = False        # Opcional: usa o proc connector (netlink) para descobrir processos (requer privilegio)
+DIRETORIO_HISTORICO = None  # Opcional: grava o historico em disco nesse diretorio (ex.: ~/.dashboard-os/historico)
+COLETOR_EXTERNO = False     # Coleta em outro processo, publicada em memoria compartilhada (ColetorExterno)
+PERFIL_INTERFACE = False    # Mede os callbacks desde o inicio; senao so a partir do primeiro F12 (PerfilInterface)
+ORCAMENTO_QUADRO_MS = 16.0  # Callbacks mais longos que isso sao marcados como lentos
+TECLA_PERFIL = "<F12>"      # Mostra/esconde o quadro com o perfil da interface
 
 class Interface:
     def __init__(self):
@@ -25,10 +37,25 @@ class Interface:
         self.cur_screen = ""
         self.proc_info_pid = None
 
+        # Perfil dos callbacks da interface: com PERFIL_INTERFACE, instalado antes de
+        # qualquer root.after; sem ele, nada e trocado ate o primeiro F12
+        self.perfil_ui = PerfilQuadros(self.root, ORCAMENTO_QUADRO_MS)
+        self.sobreposicao = None
+        if PERFIL_INTERFACE:
+            self.perfil_ui.instala()
+        self.root.bind(TECLA_PERFIL, self.alterna_perfil)
+
         # Limpar janela e encerrar Thread
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        self.gerenciador = GerenciadorDados()
+        if COLETOR_EXTERNO:
+            # O thread de atualizacao passa a apenas ler o anel compartilhado
+            self.gerenciador = GerenciadorRemoto(intervalo=DATA_UPDATE_TIME_S, modoParalelo=COLETA_PARALELA,
+                                                 numTrabalhadores=NUM_TRABALHADORES, eventosProc=EVENTOS_PROC,
+                                                 diretorioHistorico=DIRETORIO_HISTORICO)
+        else:
+            self.gerenciador = GerenciadorDados(COLETA_PARALELA, NUM_TRABALHADORES, EVENTOS_PROC,
+                                                DIRETORIO_HISTORICO)
         self.fileinfo = FileInfo()
         
         self.atualiza_thread_running = True
@@ -45,85 +72,51 @@ class Interface:
 
     def process_update(self):
         
-        if not self.process_tree.winfo_exists() or self.cur_screen != "process":
+        if not self.process_view.winfo_exists() or self.cur_screen != "process":
             return 
-        
-        existing_items = set(self.process_tree.get_children())
-        process_ids = set()
-        
-        with self.gerenciador._dictlock:
-            proc_dict = dict(sorted(self.gerenciador.getProcDict().items(), key=lambda item: item[1].getCPU(), reverse=True))
-
-        for pid, process in proc_dict.items():
-            proc_id = str(pid)
-            process_ids.add(proc_id)
-            if proc_id in existing_items:
-                self.process_tree.item(
-                    proc_id, text=proc_id, 
-                    values=(process.getNome(), process.getUsuario(), process.getCPU(), process.getMem(), 
-                            process.getEstado(), process.getPrioB(), process.getPrioD(), process.getReadIO(),
-                            process.getWriteIO(), ">>")
-                )
-            else:
-                self.process_tree.insert(
-                    "", "end", iid=proc_id, text=proc_id, 
-                    values=(process.getNome(), process.getUsuario(), process.getCPU(), process.getMem(), 
-                            process.getEstado(), process.getPrioB(), process.getPrioD(),  process.getReadIO(),
-                            process.getWriteIO(), ">>")
-                )
-
-            thread_ids = set()
-            for tid, thread in process.getThreadDict().items():
-                tid = str(tid) + " (TID)" 
-                thread_ids.add(tid)
-                try:
-                    self.process_tree.insert(
-                        proc_id, "end", iid=tid,
-                        text=f"{tid}",
-                        values=(thread.getNome(), thread.getUsuario(), thread.getCPU(), thread.getMem(), 
-                                thread.getEstado(), thread.getPrioB(), thread.getPrioD(), "")
-                    )
-                except Exception as e:
-                    self.process_tree.item(
-                        tid,
-                        text=f"{tid}",
-                        values=(thread.getNome(), thread.getUsuario(), thread.getCPU(), thread.getMem(), 
-                                thread.getEstado(), thread.getPrioB(), thread.getPrioD(), "")
-                    )
-                    
-            for child in self.process_tree.get_children(proc_id):
-                if child not in thread_ids:
-                    self.process_tree.delete(child)
-
-        for item in existing_items:
-            if item not in process_ids:
-                self.process_tree.delete(item)
-
-        self.root.update()
+
+        # Ultimo instantaneo publicado pela coleta, lido sem lock; nada muda se o seq e o mesmo
+        instantaneo = self.gerenciador.getInstantaneo()
+        if instantaneo.seq != self._seq_processos:
+            self._seq_processos = instantaneo.seq
+            # Apenas as linhas visiveis sao materializadas no Treeview
+            self.process_view.atualiza(instantaneo.processos)
+
         self.root.after(UI_UPDATE_TIME_MS, self.process_update)
 
+    def process_row(self, tarefa, pai):
+        """
+            Texto e valores de uma linha da arvore de processos (pai e o processo
+            quando a linha e uma thread)
+        """
+        if pai is None:
+            return str(tarefa.id), (tarefa.nome, tarefa.usuario, tarefa.cpu, tarefa.mem, 
+                                    tarefa.estado, tarefa.prioB, tarefa.prioD, tarefa.leitura,
+                                    tarefa.escrita, ">>")
+        return f"{tarefa.id} (TID)", (tarefa.nome, tarefa.usuario, tarefa.cpu, tarefa.mem, 
+                                      tarefa.estado, tarefa.prioB, tarefa.prioD, "", "", "")
+
     def process_draw(self):
         """
             Cria árvore de processos/threads e botão para voltar a tela de recursos.
             Registra ultima coluna como botão de ação para ver detalhes de um processo
         """
         self.cur_screen = "process"
+        self._seq_processos = None
         process_button = ttk.Button(self.root, text="Ver Recursos", command=self.redraw_resources)
         process_button.pack(pady=10)
 
         self.frames["prc"].pack(fill="both", expand=True, padx=10, pady=5)
 
-        tree_scrollbar = ttk.Scrollbar(self.frames["prc"], orient="vertical")
-        tree_scrollbar.pack(side="right", fill="y")
-
-        self.process_tree = ttk.Treeview(self.frames["prc"], yscrollcommand=tree_scrollbar.set)
-        tree_scrollbar.config(command=self.process_tree.yview)
-        
-        self.process_tree = ttk.Treeview(self.frames["prc"])
+        # Lista virtualizada: o Treeview so contem as linhas visiveis (processos e as
+        # threads dos processos expandidos)
+        self.process_view = ArvoreVirtual(
+            self.frames["prc"], ("name", "user", "cpu", "memory", "state", "prioB", "prioD", "leitura", "escrita", "action"),
+            self.process_row, lambda process: process.threads)
+        self.process_tree = self.process_view.getTreeview()
         
         self.process_tree.bind('<ButtonRelease-1>', self.on_treeview_click)
 
-        self.process_tree["columns"] = ("name", "user", "cpu", "memory", "state", "prioB", "prioD", "leitura", "escrita", "action")
         self.process_tree.heading("#0", text="PID")
         self.process_tree.heading("name", text="Nome")
         self.process_tree.heading("user", text="Usuário")
@@ -146,7 +139,6 @@ class Interface:
         self.process_tree.column("leitura", width=100, anchor="center")
         self.process_tree.column("escrita", width=100, anchor="center")
         self.process_tree.column("action", width=80, anchor="center")
-        self.process_tree.pack(fill="both", expand=True)
 
         self.process_update()
 
@@ -157,60 +149,49 @@ class Interface:
         """
         if self.cur_screen != "resources":
             return
+
+        instantaneo = self.gerenciador.getInstantaneo()
+        if instantaneo.seq == self._seq_recursos:
+            self.root.after(UI_UPDATE_TIME_MS, self.resources_update)
+            return
+        self._seq_recursos = instantaneo.seq
         
         # Atualiza valor nos medidores
-        self.meters["cpu"].configure(amounttotal=100, amountused=self.gerenciador.getCpuUso())
-        self.meters["mem"].configure(amounttotal=self.gerenciador.getMemTotal(), amountused=self.gerenciador.getMemUso())
-        self.meters["memV"].configure(amounttotal=self.gerenciador.getMemVirtualTotal(), amountused=self.gerenciador.getMemVirtualUso())
-
-        self.cpu_chart_frame.update_chart(
-            [self.gerenciador.getCpuUso(),
-            self.gerenciador.getCpuOcioso(),
-            self.gerenciador.getCpuSistema(),
-            self.gerenciador.getCpuUsuario(),
-            self.gerenciador.getCpuNice(),
-            self.gerenciador.getCpuWait(),
-            self.gerenciador.getCpuIrq(),
-            self.gerenciador.getCpuSoftIrq()], 100)
-        
-        self.mem_chart_frame.update_chart([
-            self.gerenciador.getMemLivre(),
-            self.gerenciador.getMemUso(),
-            self.gerenciador.getMemBuffer(),
-            self.gerenciador.getMemCache()], self.gerenciador.getMemTotal())
-        
-        self.memV_chart_frame.update_chart([
-                self.gerenciador.getMemVirtualTotal(),
-                self.gerenciador.getMemVirtualKernelUso(),
-                self.gerenciador.getMemVirtualUso()
-            ], self.gerenciador.getMemVirtualUso())
+        self.meters["cpu"].configure(amounttotal=100, amountused=instantaneo.cpuUso)
+        self.meters["mem"].configure(amounttotal=instantaneo.memTotal, amountused=instantaneo.memUso)
+        self.meters["memV"].configure(amounttotal=instantaneo.memVirtualTotal, amountused=instantaneo.memVirtualUso)
+
+        # Graficos desenhados a partir do historico multi-resolucao (zoom com a roda do mouse)
+        self.cpu_chart_frame.update_history(self.gerenciador.getHistorico("cpu"), 100)
+        self.mem_chart_frame.update_history(self.gerenciador.getHistorico("mem"), instantaneo.memTotal)
+        self.memV_chart_frame.update_history(self.gerenciador.getHistorico("memV"), instantaneo.memVirtualUso)
 
         # Info de número de threads e processos
-        self.process_info.config(text=f"Num. Processos: {self.gerenciador.getNumProcessos()}")
-        self.threads_info.config(text=f"Num. Threads: {self.gerenciador.getNumThreads()}")
+        self.process_info.config(text=f"Num. Processos: {instantaneo.numProcessos}")
+        self.threads_info.config(text=f"Num. Threads: {instantaneo.numThreads}")
         
         # Info de detalhes de CPU
-        self.cpu_info["Uso"].config(text=f"Uso: {self.gerenciador.getCpuUso():.2f} %")
-        self.cpu_info["Ociosas"].config(text=f"Ociosas: {self.gerenciador.getCpuOcioso():.2f} %")
-        self.cpu_info["Sist."].config(text=f"Sist.: {self.gerenciador.getCpuSistema():.2f} %")
-        self.cpu_info["Usuario"].config(text=f"Usuario: {self.gerenciador.getCpuUsuario():.2f} %")
-        self.cpu_info["Nice"].config(text=f"Nice: {self.gerenciador.getCpuNice():.2f} %")
-        self.cpu_info["Wait"].config(text=f"Wait: {self.gerenciador.getCpuWait():.2f} %")
-        self.cpu_info["Irq"].config(text=f"Irq: {self.gerenciador.getCpuIrq():.2f} %")
-        self.cpu_info["Soft Irq"].config(text=f"Soft Irq: {self.gerenciador.getCpuSoftIrq():.2f} %")
+        self.cpu_info["Uso"].config(text=f"Uso: {instantaneo.cpuUso:.2f} %")
+        self.cpu_info["Ociosas"].config(text=f"Ociosas: {instantaneo.cpuOcioso:.2f} %")
+        self.cpu_info["Sist."].config(text=f"Sist.: {instantaneo.cpuSistema:.2f} %")
+        self.cpu_info["Usuario"].config(text=f"Usuario: {instantaneo.cpuUsuario:.2f} %")
+        self.cpu_info["Nice"].config(text=f"Nice: {instantaneo.cpuNice:.2f} %")
+        self.cpu_info["Wait"].config(text=f"Wait: {instantaneo.cpuWait:.2f} %")
+        self.cpu_info["Irq"].config(text=f"Irq: {instantaneo.cpuIrq:.2f} %")
+        self.cpu_info["Soft Irq"].config(text=f"Soft Irq: {instantaneo.cpuSoftIrq:.2f} %")
         
         # Info de detalhes de RAM
-        self.mem_info["Livre"].config(text=f"Livre: {self.gerenciador.getMemLivre():.2f} MB")
-        self.mem_info["Uso"].config(text=f"Uso: {self.gerenciador.getMemUso():.2f} MB")
-        self.mem_info["Buffer"].config(text=f"Buffer: {self.gerenciador.getMemBuffer():.2f} MB")
-        self.mem_info["Cache"].config(text=f"Cache: {self.gerenciador.getMemCache():.2f} MB")
+        self.mem_info["Livre"].config(text=f"Livre: {instantaneo.memLivre:.2f} MB")
+        self.mem_info["Uso"].config(text=f"Uso: {instantaneo.memUso:.2f} MB")
+        self.mem_info["Buffer"].config(text=f"Buffer: {instantaneo.memBuffer:.2f} MB")
+        self.mem_info["Cache"].config(text=f"Cache: {instantaneo.memCache:.2f} MB")
         
         # Info de detalhes de VRAM
-        self.memv_info["Limite"].config(text=f"Limite: {self.gerenciador.getMemVirtualTotal():.2f} MB")
-        self.memv_info["Kernel Uso"].config(text=f"Kernel Uso: {self.gerenciador.getMemVirtualKernelUso():.2f} MB")
-        self.memv_info["Requerida"].config(text=f"Requerida: {self.gerenciador.getMemVirtualUso():.2f} MB")
-        
-        self.root.update()
+        self.memv_info["Limite"].config(text=f"Limite: {instantaneo.memVirtualTotal:.2f} MB")
+        self.memv_info["Kernel Uso"].config(text=f"Kernel Uso: {instantaneo.memVirtualKernelUso:.2f} MB")
+        self.memv_info["Requerida"].config(text=f"Requerida: {instantaneo.memVirtualUso:.2f} MB")
+
+        # O mainloop redesenha quando fica ocioso; so o proximo tick e agendado
         self.root.after(UI_UPDATE_TIME_MS, self.resources_update)
 
     def resources_draw(self):
@@ -218,6 +199,7 @@ class Interface:
             Insere frames de medidores/gráficos na janela root para a tela de recursos
         """
         self.cur_screen = "resources"
+        self._seq_recursos = None
                 
         top_button_frame = ttk.Frame(self.root)
         top_button_frame.pack(side="top", pady=10)
@@ -225,9 +207,11 @@ class Interface:
         mountinfobutton = ttk.Button(top_button_frame, text="Ver Partições", command=self.redraw_mountinfo)
         filetree_button = ttk.Button(top_button_frame, text="Navegar nos diretórios", command=self.redraw_filetree)
         process_button = ttk.Button(top_button_frame, text="Ver Processos", command=self.redraw_processes)
+        debug_button = ttk.Button(top_button_frame, text="Perfil da Coleta", command=self.redraw_debug)
         mountinfobutton.pack(side="left", padx=10, pady=10)
         filetree_button.pack(side="left", padx=10, pady=10)
         process_button.pack(side="left", padx=10, pady=10)
+        debug_button.pack(side="left", padx=10, pady=10)
 
         self.frames["cpu"].pack(fill="x", padx=10)
         self.meters["cpu"].pack(side="left", padx=10)
@@ -241,9 +225,9 @@ class Interface:
         self.cpu_proc_frame = ttk.Frame(self.frames["cpu"])
         self.cpu_proc_frame.pack(side="right", padx=10)
         
-        self.process_info = ttk.Label(self.cpu_proc_frame, text=f"Processes: {self.gerenciador.getNumProcessos()}")
+        self.process_info = ttk.Label(self.cpu_proc_frame, text=f"Processes: {self.gerenciador.getInstantaneo().numProcessos}")
         self.process_info.pack(anchor='w')
-        self.threads_info = ttk.Label(self.cpu_proc_frame, text=f"Threads: {self.gerenciador.getNumThreads()}")
+        self.threads_info = ttk.Label(self.cpu_proc_frame, text=f"Threads: {self.gerenciador.getInstantaneo().numThreads}")
         self.threads_info.pack(anchor='w')
         
         self.mem_info_frame = ttk.Frame(self.frames["mem"])
@@ -317,7 +301,14 @@ class Interface:
         """
         Limpa tela root e reinicializa frames
         """
+        # Saindo da tela de detalhes: o processo deixa de precisar das metricas detalhadas
+        if self.cur_screen == "proc_info" and self.proc_info_pid is not None:
+            self.gerenciador.desinscreveDetalhes(int(self.proc_info_pid))
+
         for widget in self.root.winfo_children():
+            # O quadro do perfil sobrevive à troca de telas
+            if self.sobreposicao is not None and widget is self.sobreposicao.getWidget():
+                continue
             widget.destroy()
 
         self.frames = {
@@ -328,6 +319,7 @@ class Interface:
             "mount": LabelFrame(self.root, text="Partições", padding=20),
             "prc": LabelFrame(self.root, text="Processos", padding=20),
             "prc_info": LabelFrame(self.root, text="Detalhes de Processo", padding=20),
+            "debug": LabelFrame(self.root, text="Perfil da Coleta", padding=20),
         }
 
         self.meters = {
@@ -346,8 +338,20 @@ class Interface:
         self.atualiza_thread_running = False
         if self.atualiza_thread.is_alive():
             self.atualiza_thread.join(timeout=1)
+        self.gerenciador.encerra()
         self.root.destroy()
-    
+
+    def alterna_perfil(self, event=None):
+        """
+            Mostra/esconde o quadro do perfil da interface; o primeiro acionamento
+            instala o perfil (os callbacks passam a ser medidos a partir dele)
+        """
+        if not self.perfil_ui.isInstalado():
+            self.perfil_ui.instala()
+        if self.sobreposicao is None:
+            self.sobreposicao = SobreposicaoPerfil(self.root, self.perfil_ui)
+        self.sobreposicao.alterna()
+
     def atualiza_thread_func(self):
         """
             Função para atualizar dados do gerenciador periódicamente
@@ -364,25 +368,30 @@ class Interface:
             Callback para click em um elemento da árvore de processos
         """
         region = self.process_tree.identify_region(event.x, event.y)
-        
-        if region == "cell":
+        item = self.process_tree.identify_row(event.y)
+        # Os itens do Treeview sao reaproveitados na rolagem: a linha e identificada
+        # pela chave do modelo (pid, ou (pid, tid) para threads)
+        chave = self.process_view.chaveDaLinha(item) if item else None
+        if chave is None or isinstance(chave, tuple):
+            return
+
+        if region == "tree":
+            # Coluna do PID expande/recolhe as threads do processo
+            self.process_view.alternaExpansao(chave)
+        elif region == "cell":
             column = self.process_tree.identify_column(event.x)
-            item = self.process_tree.identify_row(event.y)
-            
-            if item:
-                col_name = self.process_tree.heading(column)["text"]
-                text = self.process_tree.item(item, 'text')
-                
-                if not "(TID)" in text:
-                    if col_name == "Detalhes":
-                        self.proc_info_pid = text
-                        self.redraw_proc_info()
+            col_name = self.process_tree.heading(column)["text"]
+            if col_name == "Detalhes":
+                self.proc_info_pid = str(chave)
+                self.redraw_proc_info()
 
     def draw_proc_info(self):
         """
             Insere frame de informações do processo selecionado na tela de processos
         """
         self.cur_screen = "proc_info"
+        self._seq_proc_info = None
+        self.gerenciador.inscreveDetalhes(int(self.proc_info_pid))
         process_button = ttk.Button(self.root, text="Ver Processos", command=self.redraw_processes)
         process_button.pack(pady=10)
 
@@ -392,7 +401,7 @@ class Interface:
             "id", "nome", "usuario", "cpuUso", "memUso", 
             "numThreads", "memVirtualUso", 
             "estado", "prioB", "prioD",
-            "memSegments", "leitura", "escrita"
+            "memRollup", "memSegments", "leitura", "escrita"
         ]
         
         self.proc_info = {}
@@ -410,6 +419,7 @@ class Interface:
         self.proc_info["prioB"] = ttk.Label(self.frames["prc_info"])
         self.proc_info["prioD"] = ttk.Label(self.frames["prc_info"])
         
+        self.proc_info["memRollup"] = ttk.Label(self.frames["prc_info"])
         self.proc_info["memSegments"] = ttk.Label(self.frames["prc_info"])
 
         self.proc_info["leitura"] = ttk.Label(self.frames["prc_info"])
@@ -434,6 +444,10 @@ class Interface:
             self.proc_info[key] = ttk.Label(left_panel)
             self.proc_info[key].pack(anchor="w")
 
+        # Historico do processo (a ultima hora vem do disco, se houver historico gravado)
+        self.proc_chart_frame = LineChartFrame(left_panel, "Histórico do Processo", 4,
+                                               ["CPU (%)", "RAM (MB)", "Leitura (MB)", "Escrita (MB)"])
+
         def create_tree(title, height=5):
             """
             Helper function to create a treeview with a scrollbar
@@ -498,6 +512,12 @@ class Interface:
         self.io_devices_tree.column("#0", width=50, anchor="center")
         self.io_devices_tree.column("path", width=200, anchor="w")
 
+        # Cada arvore de detalhes e sincronizada por diferenca com o ultimo envio
+        self.io_sync = SincronizadorArvore(self.io_tree)
+        self.socket_sync = SincronizadorArvore(self.socket_tree)
+        self.semaphore_sync = SincronizadorArvore(self.semaphore_tree)
+        self.io_devices_sync = SincronizadorArvore(self.io_devices_tree)
+
         self.process_update()
         self.proc_info_update()
             
@@ -507,100 +527,72 @@ class Interface:
         """
         if self.cur_screen != "proc_info":
             return 
-        
-        proc = self.gerenciador.getProcDict()[int(self.proc_info_pid)]
+
+        # Linha do processo e metricas detalhadas do ultimo instantaneo (os detalhes
+        # aparecem a partir do primeiro tick depois da inscricao)
+        instantaneo = self.gerenciador.getInstantaneo()
+        proc = instantaneo.getProcesso(int(self.proc_info_pid))
+        detalhes = instantaneo.getDetalhes(int(self.proc_info_pid))
+        if proc is None or detalhes is None or instantaneo.seq == self._seq_proc_info:
+            self.root.after(UI_UPDATE_TIME_MS, self.proc_info_update)
+            return
+        self._seq_proc_info = instantaneo.seq
         
         mem_seg_text = ""
-        for seg_key, seg_val in proc.getMemSegments().items():
+        for seg_key, seg_val in detalhes.memSegmentos.items():
             mem_seg_text += f"        {seg_key}\n                Num. Pag.: {seg_val['pages']}\n                Tamanho: {seg_val['size_kb']} KB\n"
         
-        self.proc_info["id"].config(text=f"PID: {proc.getID()}")
-        self.proc_info["nome"].config(text=f"Nome: {proc.getNome()}")
-        self.proc_info["usuario"].config(text=f"Usuário: {proc.getUsuario()}")
-        self.proc_info["cpuUso"].config(text=f"Uso de CPU: {proc.getCPU():.2f}%")
-        self.proc_info["memUso"].config(text=f"Uso de RAM: {proc.getMem():.2f} MB")
+        self.proc_info["id"].config(text=f"PID: {proc.id}")
+        self.proc_info["nome"].config(text=f"Nome: {proc.nome}")
+        self.proc_info["usuario"].config(text=f"Usuário: {proc.usuario}")
+        self.proc_info["cpuUso"].config(text=f"Uso de CPU: {proc.cpu:.2f}%")
+        self.proc_info["memUso"].config(text=f"Uso de RAM: {proc.mem:.2f} MB")
         
-        self.proc_info["numThreads"].config(text=f"Threads: {proc.getNumThreads()}")
-        self.proc_info["memVirtualUso"].config(text=f"VRAM: {proc.getMemVirt():.2f} MB")
+        self.proc_info["numThreads"].config(text=f"Threads: {detalhes.numThreads}")
+        self.proc_info["memVirtualUso"].config(text=f"VRAM: {detalhes.memVirt:.2f} MB")
         
-        self.proc_info["estado"].config(text=f"Estado: {proc.getEstado()}")
-        self.proc_info["prioB"].config(text=f"Prioridade Base: {proc.getPrioB()}")
-        self.proc_info["prioD"].config(text=f"Prioridade Dinâmica: {proc.getPrioD()}")
+        self.proc_info["estado"].config(text=f"Estado: {proc.estado}")
+        self.proc_info["prioB"].config(text=f"Prioridade Base: {proc.prioB}")
+        self.proc_info["prioD"].config(text=f"Prioridade Dinâmica: {proc.prioD}")
         
+        rollup = detalhes.memRollup
+        self.proc_info["memRollup"].config(
+            text=f"Rss: {rollup.get('Rss', 0)} KB   Pss: {rollup.get('Pss', 0)} KB   Swap: {rollup.get('Swap', 0)} KB")
         self.proc_info["memSegments"].config(text=f"Segmentos de Memória:\n{mem_seg_text}")
 
-        self.proc_info["leitura"].config(text=f"Leitura de Disco: {proc.getReadIO():.2f} MB")
-        self.proc_info["escrita"].config(text=f"Escrita de Disco: {proc.getWriteIO():.2f} MB")
+        self.proc_info["leitura"].config(text=f"Leitura de Disco: {proc.leitura:.2f} MB")
+        self.proc_info["escrita"].config(text=f"Escrita de Disco: {proc.escrita:.2f} MB")
+
+        historico = self.gerenciador.getHistoricoProcesso(int(self.proc_info_pid))
+        if historico is not None:
+            self.proc_chart_frame.update_history(historico, 100)
 
-        existing_items = set(self.io_tree.get_children())
-        dictIO = proc.getDictIO()
+        dictIO = detalhes.dictIO
 
         # IO Tree
-        for file in dictIO.get("file_descriptors", []):
-            fd = file.get("fd", "")
-            tipo = file.get("type", "Arquivo")
-            path = file.get("real_path", "")
-            if fd in existing_items:
-                self.io_tree.item(
-                    fd, text=fd, 
-                    values=(tipo, path)
-                )
-            else:
-                self.io_tree.insert(
-                    "", "end", iid=fd, text=fd, 
-                    values=(tipo, path)
-                )
+        self.io_sync.sincroniza(
+            (file.get("fd", ""), file.get("fd", ""), (file.get("type", "Arquivo"), file.get("real_path", "")))
+            for file in dictIO.get("file_descriptors", []))
 
         # Socket Tree
+        socket_rows = []
         for socket in dictIO.get("sockets", []):
             fd = socket.get("fd", "")
             socket_info = socket.get("info", {})
-            tipo = socket_info.get("proto", "UNIX")
-            local = socket_info.get("local", "")
-            remoto = socket_info.get("remote", "")
-            estado = socket_info.get("state", "")
-            if fd in existing_items:
-                self.socket_tree.item(
-                    fd, text=fd, 
-                    values=(tipo, local, remoto, estado)
-                )
-            else:
-                self.socket_tree.insert(
-                    "", "end", iid=fd, text=fd, 
-                    values=(tipo, local, remoto, estado)
-                )
+            socket_rows.append((fd, fd, (socket_info.get("proto", "UNIX"), socket_info.get("local", ""),
+                                         socket_info.get("remote", ""), socket_info.get("state", ""))))
+        self.socket_sync.sincroniza(socket_rows)
 
         # Semaphore Tree
-        for sem in dictIO.get("posix_semaphores", []):
-            sem_name = sem.get("name", "")
-            owner_uid = sem.get("owner_uid", "")
-            state = sem.get("state", "")
-            permissions = sem.get("permissions", "")
-            if sem_name in existing_items:
-                self.semaphore_tree.item(
-                    sem_name, text=sem_name, 
-                    values=(owner_uid, state, permissions)
-                )
-            else:
-                self.semaphore_tree.insert(
-                    "", "end", iid=sem_name, text=sem_name, 
-                    values=(owner_uid, state, permissions)
-                )
+        self.semaphore_sync.sincroniza(
+            (sem.get("name", ""), sem.get("name", ""),
+             (sem.get("owner_uid", ""), sem.get("state", ""), sem.get("permissions", "")))
+            for sem in dictIO.get("posix_semaphores", []))
 
         # IO Devices Tree
-        for device in dictIO.get("io_devices", []):
-            fd = device.get("fd", "")
-            device_path = device.get("device_path", "")
-            if fd in existing_items:
-                self.io_devices_tree.item(
-                    fd, text=fd, 
-                    values=(device_path,)
-                )
-            else:
-                self.io_devices_tree.insert(
-                    "", "end", iid=fd, text=fd, 
-                    values=(device_path,)
-                )
+        self.io_devices_sync.sincroniza(
+            (device.get("fd", ""), device.get("fd", ""), (device.get("device_path", ""),))
+            for device in dictIO.get("io_devices", []))
 
         self.root.after(UI_UPDATE_TIME_MS, self.proc_info_update)
 
@@ -643,6 +635,7 @@ class Interface:
         self.file_tree.column("inode", width=60)
         self.file_tree.column("type", width=100)
         self.file_tree.pack(fill="both", expand=True)
+        self.file_sync = SincronizadorArvore(self.file_tree)
 
         self.filetree_update()
         
@@ -652,21 +645,10 @@ class Interface:
         
         child = self.fileinfo.folder_content
 
-        for fullpath, c in child.items():
-            if fullpath in set(self.file_tree.get_children()):
-                self.file_tree.item(
-                    fullpath, text=fullpath, 
-                    values=(c["fname"], c["size"], c["inode"], c["tipo"]),
-                    tags=[c["fullpath"], c["tipo"]]
-                )
-            else:
-                self.file_tree.insert(
-                    "", "end", iid=fullpath, text=fullpath, 
-                    values=(c["fname"], c["size"], c["inode"], c["tipo"]),
-                    tags=[c["fullpath"], c["tipo"]]
-                )
-                    
-        self.root.update()
+        self.file_sync.sincroniza(
+            (fullpath, fullpath, (c["fname"], c["size"], c["inode"], c["tipo"]), (c["fullpath"], c["tipo"]))
+            for fullpath, c in list(child.items()))
+
         self.root.after(UI_UPDATE_TIME_MS, self.filetree_update)
         
     def onfiletree_click(self, event):
@@ -718,6 +700,7 @@ class Interface:
         self.file_tree.column("disp")
         self.file_tree.column("usopct")
         self.file_tree.pack(fill="both", expand=True)
+        self.file_sync = SincronizadorArvore(self.file_tree)
 
         self.mountinfo_update()
 
@@ -727,21 +710,74 @@ class Interface:
         
         particoes = self.fileinfo.particoes
 
-        for c in particoes:
-            if c["disp"] in set(self.file_tree.get_children()):
-                self.file_tree.item(
-                    c["disp"], text=c["disp"], 
-                    values=(c["mountp"], c["total"], c["usado"], c["dispo"], c["uso_pct"])
-                )
-            else:
-                self.file_tree.insert(
-                    "", "end", iid=c["disp"], text=c["disp"], 
-                    values=(c["mountp"], c["total"], c["usado"], c["dispo"], c["uso_pct"])
-                )
-                    
-        self.root.update()
+        self.file_sync.sincroniza(
+            (c["disp"], c["disp"], (c["mountp"], c["total"], c["usado"], c["dispo"], c["uso_pct"]))
+            for c in particoes)
+
         self.root.after(UI_UPDATE_TIME_MS, self.mountinfo_update)
 
+    def redraw_debug(self):
+        self.clear_widgets()
+        self.debug_draw()
+
+    def debug_draw(self):
+        """
+            Tela de depuração com o perfil do último tick da coleta: tempo por etapa,
+            chamadas de E/S e os PIDs mais lentos de coletar
+        """
+        self.cur_screen = "debug"
+        self._seq_debug = None
+        process_button = ttk.Button(self.root, text="Voltar", command=self.redraw_resources)
+        process_button.pack(pady=10)
+
+        self.frames["debug"].pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.debug_info = ttk.Label(self.frames["debug"], text="Aguardando um tick da coleta")
+        self.debug_info.pack(anchor='w', pady=5)
+        self.debug_calls = ttk.Label(self.frames["debug"], text="")
+        self.debug_calls.pack(anchor='w', pady=5)
+
+        self.debug_tree = ttk.Treeview(self.frames["debug"], height=12)
+        self.debug_tree["columns"] = ("parede", "cpu", "execucoes")
+        self.debug_tree.heading("#0", text="Etapa")
+        self.debug_tree.heading("parede", text="Parede (ms)")
+        self.debug_tree.heading("cpu", text="CPU (ms)")
+        self.debug_tree.heading("execucoes", text="Execuções")
+        self.debug_tree.pack(fill="x", pady=5)
+        self.debug_sync = SincronizadorArvore(self.debug_tree)
+
+        self.debug_pid_tree = ttk.Treeview(self.frames["debug"], height=10)
+        self.debug_pid_tree["columns"] = ("duracao",)
+        self.debug_pid_tree.heading("#0", text="PID mais lento")
+        self.debug_pid_tree.heading("duracao", text="Coleta (ms)")
+        self.debug_pid_tree.pack(fill="both", expand=True, pady=5)
+        self.debug_pid_sync = SincronizadorArvore(self.debug_pid_tree)
+
+        self.debug_update()
+
+    def debug_update(self):
+        if not self.debug_tree.winfo_exists() or self.cur_screen != "debug":
+            return
+
+        # Com a coleta em outro processo não há perfil local
+        perfil = self.gerenciador.getPerfil()
+        tick = perfil.getUltimo() if perfil is not None else None
+        if perfil is None:
+            self.debug_info.config(text="Perfil indisponível: a coleta roda em outro processo")
+        elif tick is not None and tick.seq != self._seq_debug:
+            self._seq_debug = tick.seq
+            self.debug_info.config(text=f"Tick {tick.seq}: {1000 * tick.duracao:.1f} ms "
+                                        f"(CPU {1000 * tick.cpu:.1f} ms), ocioso {1000 * tick.ocioso:.0f} ms")
+            self.debug_calls.config(text="Chamadas: " + ", ".join(
+                f"{tipo} {quantidade}" for tipo, quantidade in sorted(tick.chamadas.items())))
+            self.debug_sync.sincroniza(
+                (etapa, etapa, (f"{1000 * tempo.parede:.2f}", f"{1000 * tempo.cpu:.2f}", tempo.execucoes))
+                for etapa, tempo in tick.etapas.items())
+            self.debug_pid_sync.sincroniza(
+                (str(pid), str(pid), (f"{1000 * duracao:.3f}",)) for pid, duracao in tick.pidsLentos)
+
+        self.root.after(UI_UPDATE_TIME_MS, self.debug_update)
+
 
 if __name__ == "__main__":    
     app = Interface()
@@ -0,0 +1,306 @@
+import fcntl
+import json
+import math
+import mmap
+import os
+import struct
+from multiprocessing import shared_memory
+from types import MappingProxyType
+from Instantaneo import (Instantaneo, TarefaInstantaneo, DetalhesInstantaneo, CAMPOS_SISTEMA,
+                         INSTANTANEO_VAZIO)
+
+MAGICO = b"DASHSHM\0"
+VERSAO = 2
+NOME_PADRAO = "dashboard-os"
+NUM_SLOTS_PADRAO = 3
+TAMANHO_SLOT_PADRAO = 4 * 1024 * 1024
+MAX_INSCRITOS = 16
+ALINHAMENTO = 64
+TENTATIVAS_LEITURA = 50
+DIRETORIO_SHM = "/dev/shm"
+
+# Cabeçalho do segmento: magico, versao, numero de slots, tamanho do slot,
+# numero de entradas de inscrição, seq do último instantâneo completo
+CABECALHO = struct.Struct("<8sIIIIQ")
+# Inscrições dos leitores: pares (PID do leitor dono da entrada, PID cujos detalhes ele
+# pede ao coletor); 0 = entrada livre. Só são alteradas com o flock do segmento
+ENTRADA_INSCRICAO = struct.Struct("<ii")
+INSCRITOS = struct.Struct("<" + "ii" * MAX_INSCRITOS)
+# Cabeçalho de cada slot: seqlock (ímpar durante a escrita), bytes usados, truncado
+CABECALHO_SLOT = struct.Struct("<QI?")
+# Início do instantâneo: seq, timestamp, CAMPOS_SISTEMA (os dois últimos são contagens),
+# número de linhas de processo e de detalhes
+INICIO = struct.Struct("<Qd" + "d" * (len(CAMPOS_SISTEMA) - 2) + "qqII")
+# Linha de processo ou thread; as threads de um processo vêm logo depois dele.
+# NaN em leitura/escrita representa None (threads)
+LINHA = struct.Struct("<i16s32sdd1siiddI")
+# Detalhes de um PID: pid e tamanho do JSON que segue (estruturas aninhadas e variáveis)
+DETALHE = struct.Struct("<iI")
+
+def _alinha(valor):
+    return (valor + ALINHAMENTO - 1) // ALINHAMENTO * ALINHAMENTO
+
+INICIO_SLOTS = _alinha(CABECALHO.size + INSCRITOS.size)
+
+def _texto(valor, tamanho):
+    return (valor or "").encode("utf-8", errors="replace")[:tamanho]
+
+def _opcional(valor):
+    return math.nan if valor is None else valor
+
+def _processoVivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe, mas pertence a outro usuário
+        pass
+    return True
+
+def _entradasInscricao(buf):
+    # Pares (dono, pid) da tabela de inscrições, na ordem das entradas
+    valores = INSCRITOS.unpack_from(buf, CABECALHO.size)
+    return list(zip(valores[0::2], valores[1::2]))
+
+class EscritorInstantaneos():
+    """
+        Publica instantâneos em um anel de slots de um segmento multiprocessing.shared_memory.
+        Cada slot tem um seqlock: o escritor o torna ímpar, grava o instantâneo em um layout
+        binário fixo (struct, sem pickle), o torna par e só então avança o seq do cabeçalho.
+        Com mais de um slot, um leitor lento ainda lê o anterior enquanto o próximo é escrito
+    """
+    def __init__(self, nome=NOME_PADRAO, numSlots=NUM_SLOTS_PADRAO, tamanhoSlot=TAMANHO_SLOT_PADRAO):
+        self._numSlots = numSlots
+        self._tamanhoSlot = _alinha(tamanhoSlot)
+        tamanho = INICIO_SLOTS + self._numSlots * self._tamanhoSlot
+        try:
+            self._shm = shared_memory.SharedMemory(nome, create=True, size=tamanho)
+        except FileExistsError:
+            # Segmento deixado por um coletor anterior que não terminou limpo
+            antigo = shared_memory.SharedMemory(nome)
+            antigo.close()
+            antigo.unlink()
+            self._shm = shared_memory.SharedMemory(nome, create=True, size=tamanho)
+        self._buf = self._shm.buf
+        CABECALHO.pack_into(self._buf, 0, MAGICO, VERSAO, self._numSlots, self._tamanhoSlot, MAX_INSCRITOS, 0)
+        INSCRITOS.pack_into(self._buf, CABECALHO.size, *([0] * 2 * MAX_INSCRITOS))
+
+    def getNome(self):
+        return self._shm.name
+
+    def getInscritos(self):
+        # PIDs pedidos por leitores vivos: as entradas de um leitor que caiu são ignoradas
+        # até que outro leitor as recupere (ver LeitorInstantaneos.inscreveDetalhes)
+        return {pid for dono, pid in _entradasInscricao(self._buf) if pid > 0 and _processoVivo(dono)}
+
+    def publica(self, instantaneo):
+        inicioSlot = INICIO_SLOTS + (instantaneo.seq % self._numSlots) * self._tamanhoSlot
+        limite = inicioSlot + self._tamanhoSlot
+        struct.pack_into("<Q", self._buf, inicioSlot, 2 * instantaneo.seq - 1)
+
+        offset = inicioSlot + CABECALHO_SLOT.size + INICIO.size
+        truncado = False
+        # Detalhes antes das linhas: são poucos e a tela de detalhes depende deles
+        numDetalhes = 0
+        for pid, detalhes in instantaneo.detalhes.items():
+            dados = json.dumps(detalhes._asdict(), default=str).encode()
+            if offset + DETALHE.size + len(dados) > limite:
+                truncado = True
+                break
+            DETALHE.pack_into(self._buf, offset, pid, len(dados))
+            offset += DETALHE.size
+            self._buf[offset:offset + len(dados)] = dados
+            offset += len(dados)
+            numDetalhes += 1
+
+        # Processos em ordem de CPU: sem espaço, os de menor uso ficam de fora
+        numLinhas = 0
+        for processo in instantaneo.processos:
+            if offset + LINHA.size * (1 + len(processo.threads)) > limite:
+                truncado = True
+                break
+            for linha in (processo,) + processo.threads:
+                LINHA.pack_into(self._buf, offset, linha.id, _texto(linha.nome, 16), _texto(linha.usuario, 32),
+                                linha.cpu or 0.0, linha.mem or 0.0, _texto(linha.estado, 1),
+                                linha.prioB or 0, linha.prioD or 0,
+                                _opcional(linha.leitura), _opcional(linha.escrita),
+                                len(linha.threads))
+                offset += LINHA.size
+            numLinhas += 1
+
+        sistema = [getattr(instantaneo, campo) or 0 for campo in CAMPOS_SISTEMA]
+        INICIO.pack_into(self._buf, inicioSlot + CABECALHO_SLOT.size, instantaneo.seq, instantaneo.timestamp,
+                         *[float(valor) for valor in sistema[:-2]], int(sistema[-2]), int(sistema[-1]),
+                         numLinhas, numDetalhes)
+        CABECALHO_SLOT.pack_into(self._buf, inicioSlot, 2 * instantaneo.seq, offset - inicioSlot, truncado)
+        # O seq do cabeçalho só aponta para o slot depois que ele está completo
+        struct.pack_into("<Q", self._buf, CABECALHO.size - 8, instantaneo.seq)
+
+    def fecha(self):
+        if self._shm is not None:
+            self._buf = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+class LeitorInstantaneos():
+    """
+        Lado de leitura do anel: mapeia o segmento (qualquer número de leitores, em
+        qualquer processo) e remonta o Instantaneo do slot mais recente direto das
+        páginas compartilhadas. Uma leitura que cruzou com a escrita do slot (seqlock
+        diferente antes e depois) é descartada e repetida
+    """
+    def __init__(self, nome=NOME_PADRAO):
+        # Mapeia o arquivo do segmento direto: SharedMemory registraria o segmento no
+        # resource_tracker (até o Python 3.13), que o removeria ao fim deste leitor
+        # O descritor fica aberto para o flock que protege a tabela de inscrições
+        self._fd = os.open(os.path.join(DIRETORIO_SHM, nome.lstrip("/")), os.O_RDWR)
+        try:
+            self._buf = mmap.mmap(self._fd, 0)
+        except OSError:
+            os.close(self._fd)
+            raise
+        magico, versao, self._numSlots, self._tamanhoSlot, numInscritos, _ = CABECALHO.unpack_from(self._buf, 0)
+        if magico != MAGICO or versao != VERSAO or numInscritos != MAX_INSCRITOS:
+            self._inscricoes = {}
+            self.fecha()
+            raise ValueError(f"Segmento {nome} não é um anel de instantâneos compatível")
+        self._instantaneo = INSTANTANEO_VAZIO
+        self._truncado = False
+        self._inscricoes = {}
+
+    def getSeq(self):
+        return struct.unpack_from("<Q", self._buf, CABECALHO.size - 8)[0]
+
+    def isTruncado(self):
+        # Se o último instantâneo lido não coube no slot
+        return self._truncado
+
+    def getInstantaneo(self):
+        """
+            Último instantâneo completo; sem seq novo, devolve o mesmo objeto
+        """
+        for _ in range(TENTATIVAS_LEITURA):
+            seq = self.getSeq()
+            if seq == self._instantaneo.seq:
+                return self._instantaneo
+            lido = self._le(seq)
+            if lido is not None:
+                self._instantaneo = lido
+                return lido
+        # Escritor sempre à frente deste leitor: mantém o último instantâneo lido
+        return self._instantaneo
+
+    def _le(self, seq):
+        inicioSlot = INICIO_SLOTS + (seq % self._numSlots) * self._tamanhoSlot
+        antes, _, truncado = CABECALHO_SLOT.unpack_from(self._buf, inicioSlot)
+        # Slot ainda sendo escrito ou já reaproveitado por um seq mais novo
+        if antes != 2 * seq:
+            return None
+        inicio = INICIO.unpack_from(self._buf, inicioSlot + CABECALHO_SLOT.size)
+        numLinhas, numDetalhes = inicio[-2], inicio[-1]
+        offset = inicioSlot + CABECALHO_SLOT.size + INICIO.size
+        try:
+            detalhes = {}
+            for _ in range(numDetalhes):
+                pid, tamanho = DETALHE.unpack_from(self._buf, offset)
+                offset += DETALHE.size
+                valores = json.loads(self._buf[offset:offset + tamanho])
+                offset += tamanho
+                detalhes[pid] = DetalhesInstantaneo(**valores)
+            processos = []
+            for _ in range(numLinhas):
+                processo = LINHA.unpack_from(self._buf, offset)
+                offset += LINHA.size
+                threads = tuple(self._tarefa(LINHA.unpack_from(self._buf, offset + i * LINHA.size))
+                                for i in range(processo[-1]))
+                offset += LINHA.size * len(threads)
+                processos.append(self._tarefa(processo, threads))
+        except (ValueError, TypeError, struct.error, UnicodeDecodeError):
+            # Conteúdo inconsistente de uma escrita concorrente; o seqlock confirma abaixo
+            return None
+        if struct.unpack_from("<Q", self._buf, inicioSlot)[0] != antes:
+            return None
+        self._truncado = truncado
+        processos = tuple(processos)
+        sistema = dict(zip(CAMPOS_SISTEMA, inicio[2:-2]))
+        return Instantaneo(
+            seq=inicio[0],
+            timestamp=inicio[1],
+            processos=processos,
+            porPid=MappingProxyType({linha.id: linha for linha in processos}),
+            detalhes=MappingProxyType(detalhes),
+            **sistema
+        )
+
+    @staticmethod
+    def _tarefa(campos, threads=()):
+        pid, nome, usuario, cpu, mem, estado, prioB, prioD, leitura, escrita, _ = campos
+        return TarefaInstantaneo(
+            id=pid,
+            nome=nome.rstrip(b"\0").decode("utf-8", errors="replace"),
+            usuario=usuario.rstrip(b"\0").decode("utf-8", errors="replace"),
+            cpu=cpu,
+            mem=mem,
+            estado=estado.rstrip(b"\0").decode() or None,
+            prioB=prioB,
+            prioD=prioD,
+            leitura=None if math.isnan(leitura) else leitura,
+            escrita=None if math.isnan(escrita) else escrita,
+            threads=threads
+        )
+
+    def _travaInscricoes(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def _liberaInscricoes(self):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def inscreveDetalhes(self, pid):
+        """
+            Pede ao coletor os detalhes do PID ocupando uma entrada da tabela de
+            inscrições com o PID deste processo como dono. A tabela é alterada sob o
+            flock do segmento; entradas de leitores que já terminaram são recuperadas.
+            Retorna False se a tabela está cheia
+        """
+        pid = int(pid)
+        if pid in self._inscricoes:
+            return True
+        self._travaInscricoes()
+        try:
+            entradas = _entradasInscricao(self._buf)
+            livre = None
+            for indice, (dono, inscrito) in enumerate(entradas):
+                if inscrito == 0 or not _processoVivo(dono):
+                    livre = indice
+                    break
+            if livre is None:
+                return False
+            offset = CABECALHO.size + livre * ENTRADA_INSCRICAO.size
+            ENTRADA_INSCRICAO.pack_into(self._buf, offset, os.getpid(), pid)
+            self._inscricoes[pid] = offset
+            return True
+        finally:
+            self._liberaInscricoes()
+
+    def desinscreveDetalhes(self, pid):
+        offset = self._inscricoes.pop(int(pid), None)
+        if offset is None:
+            return
+        self._travaInscricoes()
+        try:
+            # A entrada só é liberada se ainda for deste leitor
+            if ENTRADA_INSCRICAO.unpack_from(self._buf, offset) == (os.getpid(), int(pid)):
+                ENTRADA_INSCRICAO.pack_into(self._buf, offset, 0, 0)
+        finally:
+            self._liberaInscricoes()
+
+    def fecha(self):
+        if self._buf is not None:
+            for pid in list(self._inscricoes):
+                self.desinscreveDetalhes(pid)
+            self._instantaneo = INSTANTANEO_VAZIO
+            self._buf.close()
+            self._buf = None
+            os.close(self._fd)
@@ -0,0 +1,98 @@
+import os
+import re
+
+PAGE_KB = os.sysconf(os.sysconf_names['SC_PAGE_SIZE']) // 1024
+
+# Classificadores pré-compilados para o caminho de um mapeamento de /proc/PID/maps
+_RE_BIBLIOTECA = re.compile(r'\.so(?:[.\d]*)$')
+_RE_EXECUTAVEL = re.compile(r'\.so(?:[.\d]*)$|\.py$|bin/')
+
+SEGMENTOS = ['text', 'heap', 'stack', 'libraries', 'anonymous', 'file_mapped']
+
+def classificaMapeamento(perms, inode, caminho):
+    """
+        Classifica um mapeamento de /proc/PID/maps em um dos SEGMENTOS,
+        na mesma ordem de prioridade usada pelo dashboard
+    """
+    if 'x' in perms and caminho.startswith('/') and _RE_EXECUTAVEL.search(caminho):
+        return 'text'
+    if caminho == '[heap]':
+        return 'heap'
+    if caminho.startswith('[stack'):
+        return 'stack'
+    if _RE_BIBLIOTECA.search(caminho):
+        return 'libraries'
+    if inode == '0':
+        return 'anonymous'
+    return 'file_mapped'
+
+def lerRollup(pid, prefixo="/proc"):
+    """
+        Lê os totais de memória do processo em /proc/PID/smaps_rollup (valores em KB)
+    """
+    totais = {}
+    try:
+        with open(f"{prefixo}/{pid}/smaps_rollup") as f:
+            next(f, None)  # Linha de cabeçalho com a faixa de endereços
+            for line in f:
+                partes = line.split()
+                if len(partes) >= 2 and partes[0].endswith(':'):
+                    totais[partes[0][:-1]] = int(partes[1])
+    except (OSError, ValueError):
+        pass
+    return totais
+
+class SegmentosMemoria():
+    """
+        Divisão da memória virtual de um processo por segmento, calculada em uma única
+        passada sobre /proc/PID/maps e mantida em cache enquanto o conjunto de
+        mapeamentos não muda
+    """
+    def __init__(self):
+        self._assinatura = None
+        self._segmentos = {}
+        self._mapeamentos = []
+
+    def atualiza(self, pid, prefixo="/proc"):
+        try:
+            with open(f"{prefixo}/{pid}/maps") as f:
+                conteudo = f.read()
+        except OSError:
+            self._assinatura = None
+            self._segmentos = {}
+            self._mapeamentos = []
+            return self._segmentos
+
+        assinatura = hash(conteudo)
+        if assinatura == self._assinatura:
+            return self._segmentos
+
+        segmentos = {}
+        mapeamentos = []
+        for line in conteudo.splitlines():
+            # endereco perms offset dev inode [caminho]
+            partes = line.split(None, 5)
+            if len(partes) < 5:
+                continue
+            inicio, fim = partes[0].split('-')
+            inicio = int(inicio, 16)
+            fim = int(fim, 16)
+            caminho = partes[5].strip() if len(partes) > 5 else ''
+            segmento = classificaMapeamento(partes[1], partes[4], caminho)
+            size_kb = (fim - inicio) // 1024
+            acumulado = segmentos.setdefault(segmento, {'pages': 0, 'size_kb': 0})
+            acumulado['size_kb'] += size_kb
+            acumulado['pages'] += size_kb // PAGE_KB
+            mapeamentos.append((inicio, fim, segmento))
+
+        self._assinatura = assinatura
+        self._segmentos = segmentos
+        self._mapeamentos = mapeamentos
+        return segmentos
+
+    def getSegmentos(self):
+        return self._segmentos
+
+    def getMapeamentos(self):
+        # Lista (inicio, fim, segmento) ordenada por endereço, como em /proc/PID/maps
+        return self._mapeamentos
@@ -0,0 +1,217 @@
+import sys
+import time
+import heapq
+import threading
+from collections import deque, namedtuple
+
+# Eventos de auditoria contados como chamadas de E/S da coleta (ver sys.addaudithook)
+EVENTOS_AUDITADOS = {
+    "open": "aberturas",
+    "os.listdir": "listagens",
+    "os.scandir": "listagens",
+}
+
+CAPACIDADE_PADRAO = 120
+TOP_PIDS_PADRAO = 10
+
+# Perfil em uso em cada thread: cada GerenciadorDados tem o seu PerfilColeta e o associa
+# às threads da sua coleta (iniciaTick, marcaThread); Processo, DiretorioTarefa e
+# TabelaSockets medem no perfil da thread atual (ver perfilAtual)
+_perfilDaThread = threading.local()
+_hookInstalado = False
+_lockHook = threading.Lock()
+
+def _instalaHook():
+    # Hooks de auditoria não podem ser removidos: um único hook por processo, que conta
+    # as chamadas no perfil associado à thread, só nas threads marcadas como da coleta
+    global _hookInstalado
+    with _lockHook:
+        if _hookInstalado:
+            return
+        _hookInstalado = True
+
+    def hook(evento, argumentos):
+        chave = EVENTOS_AUDITADOS.get(evento)
+        if chave is not None:
+            perfil = getattr(_perfilDaThread, "perfil", None)
+            acumulador = getattr(perfil._local, "acumulador", None) if perfil is not None else None
+            if acumulador is not None and acumulador.ativa:
+                acumulador.chamadas[chave] = acumulador.chamadas.get(chave, 0) + 1
+    sys.addaudithook(hook)
+
+# Tempo de uma etapa no tick: parede e CPU da thread (s) e número de execuções
+TempoEtapa = namedtuple("TempoEtapa", ["parede", "cpu", "execucoes"])
+
+# Um tick da coleta: tempos por etapa (inclusivos: "coleta" contém as etapas de cada
+# processo), contadores de chamadas, os PIDs mais lentos e o tempo ocioso desde o tick anterior
+PerfilTick = namedtuple("PerfilTick", [
+    "seq", "inicio", "duracao", "cpu", "ocioso", "etapas", "chamadas", "pidsLentos"
+])
+
+class _AcumuladorThread():
+    # Medidas de uma thread no tick atual; somadas em finalizaTick
+    __slots__ = ("etapas", "chamadas", "pids", "ativa")
+
+    def __init__(self):
+        self.etapas = {}
+        self.chamadas = {}
+        self.pids = []
+        self.ativa = False
+
+class PerfilColeta():
+    """
+        Perfil por etapa da coleta: tempo de parede e de CPU de cada etapa, chamadas de
+        E/S (aberturas e listagens via hook de auditoria, preads contados pela
+        DiretorioTarefa) e os PIDs mais lentos, guardados por tick em um buffer circular.
+        Cada thread acumula no próprio objeto, sem lock no caminho quente; as medidas
+        das threads da coleta são somadas uma vez por tick
+    """
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, topPids=TOP_PIDS_PADRAO):
+        self._ticks = deque(maxlen=capacidade)
+        self._topPids = topPids
+        self._ativo = True
+        self._local = threading.local()
+        self._acumuladores = []
+        self._lock = threading.Lock()
+        self._inicioTick = None
+        self._cpuTick = None
+        self._fimAnterior = None
+
+    def ativa(self, ativo=True):
+        self._ativo = ativo
+
+    def isAtivo(self):
+        return self._ativo
+
+    def _acumulador(self):
+        acumulador = getattr(self._local, "acumulador", None)
+        if acumulador is None:
+            acumulador = self._local.acumulador = _AcumuladorThread()
+            with self._lock:
+                self._acumuladores.append(acumulador)
+        return acumulador
+
+    def marcaThread(self):
+        """
+            Associa a thread atual (a thread da coleta e as do pool) a este perfil e
+            passa a contar as chamadas dela
+        """
+        _perfilDaThread.perfil = self
+        if self._medindo():
+            _instalaHook()
+            self._acumulador().ativa = True
+
+    def iniciaTick(self):
+        if not self._ativo:
+            return
+        self._inicioTick = time.perf_counter()
+        self._cpuTick = time.thread_time()
+        self.marcaThread()
+        # Descarta o que foi contado fora de um tick
+        with self._lock:
+            for acumulador in self._acumuladores:
+                acumulador.chamadas = {}
+
+    def _medindo(self):
+        # Só há o que medir entre iniciaTick e finalizaTick (processos do pool de
+        # coleta paralela nunca iniciam um tick e não acumulam nada)
+        return self._ativo and self._inicioTick is not None
+
+    def inicio(self):
+        # Marca de início de uma etapa (None fora de um tick ou com o perfil desativado)
+        if not self._medindo():
+            return None
+        return time.perf_counter(), time.thread_time()
+
+    def fim(self, etapa, inicio):
+        if inicio is None:
+            return
+        parede = time.perf_counter() - inicio[0]
+        cpu = time.thread_time() - inicio[1]
+        etapas = self._acumulador().etapas
+        atual = etapas.get(etapa)
+        if atual is None:
+            etapas[etapa] = [parede, cpu, 1]
+        else:
+            atual[0] += parede
+            atual[1] += cpu
+            atual[2] += 1
+
+    def conta(self, chave, quantidade=1):
+        if self._medindo():
+            chamadas = self._acumulador().chamadas
+            chamadas[chave] = chamadas.get(chave, 0) + quantidade
+
+    def registraPid(self, pid, duracao):
+        if self._medindo():
+            self._acumulador().pids.append((duracao, pid))
+
+    def finalizaTick(self, seq=None):
+        """
+            Soma as medidas das threads e guarda o tick no buffer circular
+        """
+        if not self._ativo or self._inicioTick is None:
+            return None
+        agora = time.perf_counter()
+        etapas = {}
+        chamadas = {}
+        pids = []
+        with self._lock:
+            acumuladores = list(self._acumuladores)
+        for acumulador in acumuladores:
+            for etapa, (parede, cpu, execucoes) in acumulador.etapas.items():
+                atual = etapas.get(etapa)
+                etapas[etapa] = [parede, cpu, execucoes] if atual is None else \
+                    [atual[0] + parede, atual[1] + cpu, atual[2] + execucoes]
+            for chave, quantidade in acumulador.chamadas.items():
+                chamadas[chave] = chamadas.get(chave, 0) + quantidade
+            pids.extend(acumulador.pids)
+            acumulador.etapas = {}
+            acumulador.chamadas = {}
+            acumulador.pids = []
+        tick = PerfilTick(
+            seq=seq,
+            inicio=time.time() - (agora - self._inicioTick),
+            duracao=agora - self._inicioTick,
+            cpu=time.thread_time() - self._cpuTick,
+            ocioso=self._inicioTick - self._fimAnterior if self._fimAnterior is not None else 0.0,
+            etapas={etapa: TempoEtapa(*valores) for etapa, valores in etapas.items()},
+            chamadas=chamadas,
+            pidsLentos=[(pid, duracao) for duracao, pid in heapq.nlargest(self._topPids, pids)]
+        )
+        self._fimAnterior = agora
+        self._inicioTick = None
+        self._ticks.append(tick)
+        return tick
+
+    def getTicks(self):
+        return list(self._ticks)
+
+    def getUltimo(self):
+        return self._ticks[-1] if self._ticks else None
+
+# Perfil das threads que não pertencem a nenhuma coleta (nunca mede nada)
+_PERFIL_INATIVO = PerfilColeta(capacidade=1)
+_PERFIL_INATIVO.ativa(False)
+
+def perfilAtual():
+    # PerfilColeta associado à thread atual por marcaThread (um perfil inativo se nenhum)
+    return getattr(_perfilDaThread, "perfil", _PERFIL_INATIVO)
+
+def perfilComoDict(tick):
+    """
+        PerfilTick em tipos simples (JSON)
+    """
+    if tick is None:
+        return None
+    return {
+        "seq": tick.seq,
+        "inicio": tick.inicio,
+        "duracao_s": tick.duracao,
+        "cpu_s": tick.cpu,
+        "ocioso_s": tick.ocioso,
+        "etapas": {etapa: {"parede_s": tempo.parede, "cpu_s": tempo.cpu, "execucoes": tempo.execucoes}
+                   for etapa, tempo in tick.etapas.items()},
+        "chamadas": dict(tick.chamadas),
+        "pids_lentos": [{"pid": pid, "duracao_s": duracao} for pid, duracao in tick.pidsLentos],
+    }
@@ -0,0 +1,232 @@
+import bisect
+import time
+import tkinter as tk
+from tkinter import ttk
+from collections import deque, namedtuple
+
+# Orçamento de um callback da interface (ms): acima disso o quadro é marcado como lento
+ORCAMENTO_PADRAO_MS = 16.0
+# Limites superiores (ms) das faixas do histograma; a última faixa é tudo acima de 266 ms
+LIMITES_HISTOGRAMA_MS = (1, 2, 4, 8, 16, 33, 66, 133, 266)
+# Métodos do Treeview contados como operações (cada um é ao menos uma chamada ao Tcl)
+OPERACOES_TREEVIEW = ("insert", "delete", "item", "set", "move", "detach", "reattach", "see")
+AMOSTRAS_RECENTES = 120
+CAPACIDADE_LENTOS = 50
+ATUALIZACAO_SOBREPOSICAO_MS = 500
+
+# Um quadro acima do orçamento: callback, início (epoch), duração (ms) e o que ele fez no Tk
+QuadroLento = namedtuple("QuadroLento", ["nome", "inicio", "duracao", "operacoesTreeview", "imagens"])
+
+class EstatisticaCallback():
+    """
+        Medidas acumuladas de um callback agendado: histograma das durações, totais de
+        operações no Treeview e de PhotoImages criadas e as durações recentes (percentis)
+    """
+    __slots__ = ("histograma", "execucoes", "total", "maximo", "estouros", "operacoesTreeview", "imagens",
+                 "recentes")
+
+    def __init__(self):
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)
+        self.execucoes = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.estouros = 0
+        self.operacoesTreeview = 0
+        self.imagens = 0
+        self.recentes = deque(maxlen=AMOSTRAS_RECENTES)
+
+    def adiciona(self, duracao, operacoesTreeview, imagens, estouro):
+        self.histograma[bisect.bisect_left(LIMITES_HISTOGRAMA_MS, duracao)] += 1
+        self.execucoes += 1
+        self.total += duracao
+        self.maximo = max(self.maximo, duracao)
+        self.estouros += estouro
+        self.operacoesTreeview += operacoesTreeview
+        self.imagens += imagens
+        self.recentes.append(duracao)
+
+    def getMedia(self):
+        return self.total / self.execucoes if self.execucoes else 0.0
+
+    def getPercentil(self, percentil):
+        # Percentil das últimas AMOSTRAS_RECENTES execuções
+        if not self.recentes:
+            return 0.0
+        ordenadas = sorted(self.recentes)
+        return ordenadas[min(len(ordenadas) - 1, int(percentil / 100 * len(ordenadas)))]
+
+class PerfilQuadros():
+    """
+        Perfil dos callbacks da interface: instala() troca o root.after por uma versão
+        que mede cada callback agendado (duração, operações no Treeview e PhotoImages
+        criadas durante a execução) e marca os que passam do orçamento. Callbacks
+        aninhados (root.update() dentro de um callback) são medidos à parte e também
+        contam no tempo de quem os chamou; as operações contam só para o mais interno
+    """
+    def __init__(self, root, orcamentoMs=ORCAMENTO_PADRAO_MS):
+        self._root = root
+        self._orcamento = orcamentoMs
+        self._estatisticas = {}
+        self._lentos = deque(maxlen=CAPACIDADE_LENTOS)
+        # [operacoesTreeview, imagens] de cada callback em execução, do mais externo ao mais interno
+        self._pilha = []
+        # Operações feitas fora de callbacks agendados (telas desenhadas por botões e eventos)
+        self._fora = [0, 0]
+        self._afterOriginal = None
+        self._originaisTreeview = {}
+        self._photoImageOriginal = None
+
+    def instala(self):
+        if self._afterOriginal is not None:
+            return
+        self._afterOriginal = self._root.after
+        self._root.after = self._after
+        for nome in OPERACOES_TREEVIEW:
+            original = getattr(ttk.Treeview, nome)
+            self._originaisTreeview[nome] = original
+            setattr(ttk.Treeview, nome, self._contaOperacao(original))
+        self._photoImageOriginal = tk.PhotoImage.__init__
+        photoImageOriginal = self._photoImageOriginal
+        perfil = self
+
+        def inicializaPhotoImage(imagem, *args, **kwargs):
+            perfil._contadores()[1] += 1
+            photoImageOriginal(imagem, *args, **kwargs)
+        tk.PhotoImage.__init__ = inicializaPhotoImage
+
+    def remove(self):
+        if self._afterOriginal is None:
+            return
+        del self._root.after
+        self._afterOriginal = None
+        for nome, original in self._originaisTreeview.items():
+            setattr(ttk.Treeview, nome, original)
+        self._originaisTreeview = {}
+        tk.PhotoImage.__init__ = self._photoImageOriginal
+        self._photoImageOriginal = None
+
+    def isInstalado(self):
+        return self._afterOriginal is not None
+
+    def agendaSemMedir(self, ms, func, *args):
+        # after fora do perfil (a própria sobreposição não entra nas medidas)
+        after = self._afterOriginal if self._afterOriginal is not None else self._root.after
+        return after(ms, func, *args)
+
+    def _contadores(self):
+        return self._pilha[-1] if self._pilha else self._fora
+
+    def _contaOperacao(self, original):
+        perfil = self
+
+        def operacao(tree, *args, **kwargs):
+            perfil._contadores()[0] += 1
+            return original(tree, *args, **kwargs)
+        operacao.__name__ = original.__name__
+        operacao.__doc__ = original.__doc__
+        return operacao
+
+    def _after(self, ms, func=None, *args):
+        # Sem func, after só espera: nada a medir
+        if func is None:
+            return self._afterOriginal(ms)
+        return self._afterOriginal(ms, self.envolve(func), *args)
+
+    def envolve(self, func, nome=None):
+        """
+            Versão medida de func, para callbacks registrados fora do root.after
+        """
+        if nome is None:
+            nome = getattr(func, "__name__", repr(func))
+
+        def callback(*args):
+            contadores = [0, 0]
+            self._pilha.append(contadores)
+            inicio = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                duracao = 1000 * (time.perf_counter() - inicio)
+                self._pilha.pop()
+                self._registra(nome, duracao, contadores)
+        return callback
+
+    def _registra(self, nome, duracao, contadores):
+        estatistica = self._estatisticas.get(nome)
+        if estatistica is None:
+            estatistica = self._estatisticas[nome] = EstatisticaCallback()
+        estouro = duracao > self._orcamento
+        estatistica.adiciona(duracao, contadores[0], contadores[1], estouro)
+        if estouro:
+            self._lentos.append(QuadroLento(nome, time.time() - duracao / 1000, duracao, contadores[0],
+                                            contadores[1]))
+
+    def getOrcamento(self):
+        return self._orcamento
+
+    def getEstatisticas(self):
+        return dict(self._estatisticas)
+
+    def getLentos(self):
+        return list(self._lentos)
+
+    def getFora(self):
+        # (operações no Treeview, PhotoImages) feitas fora de callbacks agendados
+        return tuple(self._fora)
+
+    def limpa(self):
+        self._estatisticas = {}
+        self._lentos.clear()
+        self._fora = [0, 0]
+
+    def resumo(self):
+        """
+            Texto com uma linha por callback (do mais lento em média ao mais rápido) e
+            os últimos quadros acima do orçamento
+        """
+        linhas = [f"{'callback':<20}{'n':>6}{'méd':>8}{'p95':>8}{'máx':>8}{'>orç':>6}{'tree/q':>8}{'img':>5}"]
+        for nome, estatistica in sorted(self._estatisticas.items(), key=lambda item: -item[1].getMedia()):
+            linhas.append(f"{nome[:19]:<20}{estatistica.execucoes:>6}{estatistica.getMedia():>8.1f}"
+                          f"{estatistica.getPercentil(95):>8.1f}{estatistica.maximo:>8.1f}"
+                          f"{estatistica.estouros:>6}"
+                          f"{estatistica.operacoesTreeview / estatistica.execucoes:>8.0f}{estatistica.imagens:>5}")
+        linhas.append(f"fora de callbacks: {self._fora[0]} op. Treeview, {self._fora[1]} PhotoImage")
+        linhas.append(f"acima de {self._orcamento:.0f} ms:")
+        for quadro in list(self._lentos)[-5:]:
+            linhas.append(f"  {time.strftime('%H:%M:%S', time.localtime(quadro.inicio))} {quadro.nome[:19]:<20}"
+                          f"{quadro.duracao:>8.1f} ms {quadro.operacoesTreeview:>6} op.")
+        return "\n".join(linhas)
+
+class SobreposicaoPerfil():
+    """
+        Quadro sobre a janela com o resumo do PerfilQuadros, mostrado e escondido por
+        alterna(). A atualização usa o after original, fora do perfil
+    """
+    def __init__(self, root, perfil):
+        self._root = root
+        self._perfil = perfil
+        self._visivel = False
+        self._label = tk.Label(root, justify="left", anchor="nw", font=("Courier", 9), bg="black",
+                               fg="#4fff81", padx=6, pady=4)
+
+    def getWidget(self):
+        return self._label
+
+    def isVisivel(self):
+        return self._visivel
+
+    def alterna(self, event=None):
+        self._visivel = not self._visivel
+        if self._visivel:
+            self._label.place(relx=1.0, rely=1.0, anchor="se", x=-10, y=-10)
+            self._atualiza()
+        else:
+            self._label.place_forget()
+
+    def _atualiza(self):
+        if not self._visivel or not self._label.winfo_exists():
+            return
+        self._label.config(text=self._perfil.resumo())
+        # Telas novas são empilhadas acima do quadro
+        self._label.lift()
+        self._perfil.agendaSemMedir(ATUALIZACAO_SOBREPOSICAO_MS, self._atualiza)
@@ -0,0 +1,167 @@
+import os
+import random
+
+# Tempos de CPU iniciais do /proc/stat falso: user nice system idle iowait irq softirq steal
+CPU_INICIAL = [1000, 0, 500, 10000, 100, 0, 50, 0]
+
+MEMINFO = """MemTotal:       16384000 kB
+MemFree:         8192000 kB
+MemAvailable:   12000000 kB
+Buffers:          256000 kB
+Cached:          2048000 kB
+SReclaimable:     128000 kB
+CommitLimit:    16000000 kB
+Committed_AS:    6000000 kB
+VmallocUsed:       40000 kB
+"""
+
+MOUNTS = """/dev/sda1 / ext4 rw,relatime 0 0
+proc /proc proc rw,nosuid,nodev,noexec,relatime 0 0
+tmpfs /tmp tmpfs rw,nosuid,nodev 0 0
+"""
+
+CABECALHO_INET = ("  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout "
+                  "inode\n")
+CABECALHO_UNIX = "Num       RefCount Protocol Flags    Type St Inode Path\n"
+
+def _escreve(caminho, conteudo):
+    with open(caminho, "w") as f:
+        f.write(conteudo)
+
+def linhaStat(tid, nome, estado="S", utime=0, stime=0, numThreads=1, starttime=100, vsize=0, rss=0,
+              startstack=0, kstkesp=0):
+    """
+        Linha de /proc/[tid]/stat com os 52 campos do man proc(5); só os usados por
+        parseStat têm valores significativos
+    """
+    campos = ["0"] * 50
+    campos[0] = estado
+    campos[11] = str(utime)
+    campos[12] = str(stime)
+    campos[15] = "20"
+    campos[16] = "0"
+    campos[17] = str(numThreads)
+    campos[19] = str(starttime)
+    campos[20] = str(vsize)
+    campos[21] = str(rss)
+    campos[25] = str(startstack)
+    campos[26] = str(kstkesp)
+    return f"{tid} ({nome}) " + " ".join(campos) + "\n"
+
+def _maps(numMapeamentos, base, stacks):
+    # Bibliotecas, heap, mapeamentos anônimos e um stack por thread, em ordem de endereço
+    linhas = []
+    endereco = base
+    for i in range(numMapeamentos):
+        fim = endereco + 0x1000 * (1 + i % 16)
+        if i == 0:
+            caminho = "/usr/bin/falso"
+        elif i == 1:
+            caminho = "[heap]"
+        elif i % 3 == 0:
+            caminho = f"/usr/lib/libfalso{i % 50}.so"
+        else:
+            caminho = ""
+        perms = "r-xp" if caminho.endswith(".so") else "rw-p"
+        inode = "0" if not caminho.startswith("/") else str(1000 + i)
+        linhas.append(f"{endereco:x}-{fim:x} {perms} 00000000 08:01 {inode} {caminho}".rstrip())
+        endereco = fim
+    for inicio, fim in stacks:
+        linhas.append(f"{inicio:x}-{fim:x} rw-p 00000000 00:00 0 [stack]")
+    return "\n".join(linhas) + "\n"
+
+def _smapsRollup(base):
+    return (f"{base:x}-{base + 0x100000:x} ---p 00000000 00:00 0 [rollup]\n"
+            "Rss:                4096 kB\nPss:                2048 kB\nShared_Clean:       1024 kB\n"
+            "Private_Dirty:      1024 kB\nSwap:                  0 kB\n")
+
+def _alvoFd(indice, inodesSocket):
+    tipo = indice % 5
+    if tipo == 0 and inodesSocket:
+        return f"socket:[{inodesSocket[indice % len(inodesSocket)]}]"
+    if tipo == 1:
+        return f"pipe:[{50000 + indice}]"
+    if tipo == 2:
+        return "/dev/null"
+    if tipo == 3:
+        return "anon_inode:[eventfd]"
+    return f"/var/log/falso{indice}.log"
+
+def geraProcFalso(raiz, numProcessos, threadsPorProcesso=4, mapeamentos=64, fds=32, socketsRede=1000,
+                  semente=0):
+    """
+        Gera em `raiz` uma árvore no formato do /proc para os testes de escala da coleta:
+        numProcessos processos com threadsPorProcesso tarefas em task/ (incluindo a
+        principal), maps com `mapeamentos` linhas, `fds` links em fd/, tabelas de
+        /proc/net com socketsRede sockets e stat, meminfo e mounts do sistema.
+        Os arquivos são comuns (não procfs), então a coleta os lê com os mesmos caminhos.
+        Retorna o número de tarefas (processos + threads em task/)
+    """
+    aleatorio = random.Random(semente)
+    os.makedirs(os.path.join(raiz, "net"), exist_ok=True)
+
+    _escreve(os.path.join(raiz, "stat"), "cpu  " + " ".join(map(str, CPU_INICIAL)) + " 0 0\n")
+    _escreve(os.path.join(raiz, "meminfo"), MEMINFO)
+    _escreve(os.path.join(raiz, "mounts"), MOUNTS)
+
+    inodesSocket = [str(200000 + i) for i in range(socketsRede)]
+    protocolos = ("tcp", "tcp6", "udp", "udp6", "raw", "raw6")
+    for k, proto in enumerate(protocolos):
+        linhas = [CABECALHO_INET]
+        seis = proto.endswith("6")
+        for i, inode in enumerate(inodesSocket[k::len(protocolos)]):
+            ip = "0000000000000000FFFF00000100007F" if seis else "0100007F"
+            linhas.append(f"{i:4}: {ip}:{1024 + i % 60000:04X} {ip}:0000 {'0A' if i % 2 else '01'} "
+                          f"00000000:00000000 00:00000000 00000000     0        0 {inode} 1 0000000000000000\n")
+        _escreve(os.path.join(raiz, "net", proto), "".join(linhas))
+    _escreve(os.path.join(raiz, "net", "unix"), CABECALHO_UNIX + "".join(
+        f"0000000000000000: 00000002 00000000 00010000 0001 01 {inode} /run/falso{i}.sock\n"
+        for i, inode in enumerate(inodesSocket[::5])))
+
+    tarefas = 0
+    for pid in range(1000, 1000 + numProcessos):
+        diretorio = os.path.join(raiz, str(pid))
+        os.makedirs(os.path.join(diretorio, "task"))
+        os.makedirs(os.path.join(diretorio, "fd"))
+        nome = f"falso{pid % 97}"
+        base = 0x400000 + pid * 0x10000000
+        stacks = [(base + 0x8000000 + t * 0x100000, base + 0x8000000 + t * 0x100000 + 0x21000)
+                  for t in range(threadsPorProcesso)]
+        utime = aleatorio.randrange(100000)
+        linha = linhaStat(pid, nome, "R" if pid % 10 == 0 else "S", utime, utime // 4, threadsPorProcesso,
+                          100 + pid, 1024 * 1024 * 64, 1024, stacks[0][1] - 0x100, 0)
+        _escreve(os.path.join(diretorio, "stat"), linha)
+        _escreve(os.path.join(diretorio, "statm"), "16384 1024 256 16 0 2048 0\n")
+        _escreve(os.path.join(diretorio, "comm"), nome + "\n")
+        uid = 0 if pid % 5 == 0 else 1000
+        _escreve(os.path.join(diretorio, "status"), f"Name:\t{nome}\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\n")
+        _escreve(os.path.join(diretorio, "cmdline"), f"/usr/bin/{nome}\0--falso\0{pid}\0")
+        _escreve(os.path.join(diretorio, "io"),
+                 f"rchar: {utime * 10}\nwchar: {utime * 5}\nsyscr: 10\nsyscw: 5\n"
+                 f"read_bytes: {utime * 4096}\nwrite_bytes: {utime * 2048}\ncancelled_write_bytes: 0\n")
+        _escreve(os.path.join(diretorio, "maps"), _maps(mapeamentos, base, stacks))
+        _escreve(os.path.join(diretorio, "smaps_rollup"), _smapsRollup(base))
+        os.symlink(f"/usr/bin/{nome}", os.path.join(diretorio, "exe"))
+        for fd in range(fds):
+            os.symlink(_alvoFd(pid + fd, inodesSocket), os.path.join(diretorio, "fd", str(fd)))
+        tarefas += 1
+
+        for t in range(threadsPorProcesso):
+            tid = pid if t == 0 else 1000 + numProcessos + (pid - 1000) * threadsPorProcesso + t
+            diretorioThread = os.path.join(diretorio, "task", str(tid))
+            os.makedirs(diretorioThread)
+            _escreve(os.path.join(diretorioThread, "stat"),
+                     linhaStat(tid, nome, "S", utime // (t + 1), 0, threadsPorProcesso, 100 + pid,
+                               kstkesp=stacks[t][0] + 0x1000))
+            _escreve(os.path.join(diretorioThread, "statm"), "16384 1024 256 16 0 2048 0\n")
+            _escreve(os.path.join(diretorioThread, "comm"), nome + "\n")
+            tarefas += 1
+    return tarefas
+
+def avancaCPU(raiz, tick):
+    """
+        Avança os contadores do /proc/stat falso, para que cada tick tenha um intervalo
+        de CPU não nulo
+    """
+    valores = [valor + tick * (10 if i != 3 else 90) for i, valor in enumerate(CPU_INICIAL)]
+    _escreve(os.path.join(raiz, "stat"), "cpu  " + " ".join(map(str, valores)) + " 0 0\n")
@@ -0,0 +1,27 @@
+import os
+from collections import namedtuple
+
+# Eventos de uma reconciliação da tabela de tarefas com a listagem do /proc
+EventosTabela = namedtuple("EventosTabela", ["adicionados", "removidos", "sobreviventes"])
+
+def listaIDs(diretorio):
+    """
+        Lista os IDs numéricos (PIDs/TIDs) de um diretório do /proc como conjunto de inteiros
+    """
+    try:
+        return {int(name) for name in os.listdir(diretorio) if name.isdigit()}
+    except OSError as e:
+        print(f"Error reading task directory: {e}")
+        return set()
+
+def reconciliaIDs(existentes, listados):
+    """
+        Compara os IDs já rastreados com os IDs listados no tick atual usando
+        diferença de conjuntos, retornando os adicionados, removidos e sobreviventes
+    """
+    existentes = set(existentes)
+    return EventosTabela(
+        adicionados=listados - existentes,
+        removidos=existentes - listados,
+        sobreviventes=existentes & listados
+    )
@@ -0,0 +1,126 @@
+import bisect
+
+def chaveOrdenacao(valor):
+    # Números ordenam numericamente e antes dos textos; textos sem diferenciar caixa
+    try:
+        return (0, float(valor), "")
+    except (TypeError, ValueError):
+        return (1, 0.0, str(valor).lower())
+
+def _subsequenciaCrescente(posicoes):
+    """
+        Índices de uma maior subsequência crescente de posicoes (O(n log n)): os itens
+        que já estão na ordem relativa certa e não precisam de move()
+    """
+    finais = []       # menor posição final de cada tamanho de subsequência
+    indicesFinais = []
+    anterior = [-1] * len(posicoes)
+    for i, posicao in enumerate(posicoes):
+        k = bisect.bisect_left(finais, posicao)
+        if k == len(finais):
+            finais.append(posicao)
+            indicesFinais.append(i)
+        else:
+            finais[k] = posicao
+            indicesFinais[k] = i
+        anterior[i] = indicesFinais[k - 1] if k else -1
+    estaveis = set()
+    i = indicesFinais[-1] if indicesFinais else -1
+    while i >= 0:
+        estaveis.add(i)
+        i = anterior[i]
+    return estaveis
+
+class SincronizadorArvore():
+    """
+        Sincroniza as linhas de primeiro nível de um ttk.Treeview com uma lista de
+        linhas (iid, texto, valores[, tags]) comparando com o que já foi enviado ao Tk:
+        item()/set() só nas células que mudaram, delete() único para as linhas que
+        saíram e move() apenas para os itens fora da maior subsequência já ordenada.
+        Com ordenação por coluna ativa (clique no cabeçalho), as linhas são
+        reordenadas com move() em vez de reinseridas
+    """
+    def __init__(self, tree, ordenavel=True):
+        self._tree = tree
+        self._colunas = tuple(tree["columns"])
+        self._enviados = {}   # iid -> (texto, valores, tags) já presentes no Treeview
+        self._ordem = []      # iids na ordem exibida
+        self._linhas = []
+        self._ordenacao = None
+        if ordenavel:
+            for coluna in ("#0",) + self._colunas:
+                tree.heading(coluna, command=lambda coluna=coluna: self.ordenaPor(coluna))
+
+    def ordenaPor(self, coluna):
+        # Mesmo cabeçalho alterna entre crescente e decrescente
+        if self._ordenacao is not None and self._ordenacao[0] == coluna:
+            self._ordenacao = (coluna, not self._ordenacao[1])
+        else:
+            self._ordenacao = (coluna, False)
+        self.sincroniza(self._linhas)
+
+    def _ordena(self, linhas):
+        coluna, reverso = self._ordenacao
+        if coluna == "#0":
+            chave = lambda linha: chaveOrdenacao(linha[1])
+        else:
+            indice = self._colunas.index(coluna)
+            chave = lambda linha: chaveOrdenacao(linha[2][indice] if indice < len(linha[2]) else "")
+        return sorted(linhas, key=chave, reverse=reverso)
+
+    def sincroniza(self, linhas):
+        if not self._tree.winfo_exists():
+            return
+        linhas = [(linha[0], linha[1], tuple(linha[2]), tuple(linha[3]) if len(linha) > 3 else ())
+                  for linha in linhas]
+        self._linhas = linhas
+        if self._ordenacao is not None:
+            linhas = self._ordena(linhas)
+        # Uma linha por iid (a primeira ocorrência vence)
+        vistos = set()
+        linhas = [linha for linha in linhas if not (linha[0] in vistos or vistos.add(linha[0]))]
+
+        # Remove de uma vez as linhas que saíram
+        removidos = [iid for iid in self._ordem if iid not in vistos]
+        if removidos:
+            self._tree.delete(*removidos)
+            for iid in removidos:
+                del self._enviados[iid]
+            self._ordem = [iid for iid in self._ordem if iid in vistos]
+
+        # Atualiza só as células alteradas das linhas existentes
+        for iid, texto, valores, tags in linhas:
+            enviado = self._enviados.get(iid)
+            if enviado is None or enviado == (texto, valores, tags):
+                continue
+            textoAnt, valoresAnt, tagsAnt = enviado
+            if len(valores) != len(valoresAnt):
+                self._tree.item(iid, values=valores)
+            else:
+                for coluna, valor, valorAnt in zip(self._colunas, valores, valoresAnt):
+                    if valor != valorAnt:
+                        self._tree.set(iid, coluna, valor)
+            if texto != textoAnt:
+                self._tree.item(iid, text=texto)
+            if tags != tagsAnt:
+                self._tree.item(iid, tags=tags)
+            self._enviados[iid] = (texto, valores, tags)
+
+        # Reordena: itens fora da maior subsequência já na ordem certa são movidos
+        # (ou inseridos) logo após o item que os precede na nova ordem
+        posicaoAtual = {iid: i for i, iid in enumerate(self._ordem)}
+        existentes = [i for i, linha in enumerate(linhas) if linha[0] in posicaoAtual]
+        estaveis = {existentes[i] for i in _subsequenciaCrescente(
+            [posicaoAtual[linhas[i][0]] for i in existentes])}
+        # (o Tk posiciona o item movido logo após o irmão que ocupa indice - 1)
+        anterior = None
+        for i, (iid, texto, valores, tags) in enumerate(linhas):
+            if i not in estaveis:
+                indice = self._tree.index(anterior) + 1 if anterior is not None else 0
+                if iid in self._enviados:
+                    self._tree.move(iid, "", indice)
+                else:
+                    self._tree.insert("", indice, iid=iid, text=texto, values=valores, tags=tags)
+                    self._enviados[iid] = (texto, valores, tags)
+            anterior = iid
+        self._ordem = [linha[0] for linha in linhas]
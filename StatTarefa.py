@@ -0,0 +1,34 @@
+from collections import namedtuple
+
+# /proc folder ref: https://man7.org/linux/man-pages/man5/proc.5.html
+
+# Registro compacto com os campos de /proc/[tid]/stat usados pelo dashboard
+StatTarefa = namedtuple("StatTarefa", [
+    "estado", "utime", "stime", "prioridade", "nice", "num_threads", "starttime", "vsize", "rss",
+    "startstack", "kstkesp"
+])
+
+def parseStat(data):
+    """
+        Interpreta o conteúdo de /proc/[tid]/stat em um StatTarefa.
+        O campo comm fica entre o primeiro '(' e o último ')', podendo conter
+        espaços e parênteses, então os demais campos são contados após o último ')'
+    """
+    fim_comm = data.rfind(")")
+    if fim_comm < 0:
+        return None
+    # campos[0] corresponde ao campo 3 (state) do man proc(5)
+    campos = data[fim_comm + 2:].split()
+    return StatTarefa(
+        estado=campos[0],
+        utime=int(campos[11]),
+        stime=int(campos[12]),
+        prioridade=int(campos[15]),
+        nice=int(campos[16]),
+        num_threads=int(campos[17]),
+        starttime=int(campos[19]),
+        vsize=int(campos[20]),
+        rss=int(campos[21]),
+        startstack=int(campos[25]),
+        kstkesp=int(campos[26])
+    )
@@ -0,0 +1,197 @@
+import threading
+import numpy as np
+from array import array
+from StatTarefa import StatTarefa
+
+# Colunas da tabela e seus tipos (módulo array)
+COLUNAS = {
+    "thread": "B",       # 1 para linhas de thread, 0 para processos
+    "utime": "Q",
+    "stime": "Q",
+    "anterior": "q",     # utime + stime do tick anterior (-1 se ainda não amostrado)
+    "cpu": "d",          # Percentual de CPU no último tick
+    "mem": "d",          # Memória em KB (RSS do processo ou estimativa da thread)
+    "memVirt": "d",      # Memória virtual em KB
+    "estado": "B",       # Código ASCII do estado (R, S, D, ...)
+    "prioB": "l",
+    "prioD": "l",
+    "numThreads": "l",
+    "starttime": "Q",
+    "vsize": "Q",
+    "rss": "q",
+    "startstack": "Q",
+    "kstkesp": "Q",
+    "uid": "q",          # UID real lido de status uma vez por identidade (-1 se não lido)
+    "fdDir": "l",        # Descritores de /proc mantidos abertos (-1 se fechado, ver DiretorioTarefa)
+    "fdStat": "l",
+    "fdStatm": "l",
+}
+
+# Colunas que começam em -1 em vez de 0
+COLUNAS_NEGATIVAS = ("anterior", "uid", "fdDir", "fdStat", "fdStatm")
+
+# Colunas escritas pela coleta de cada tarefa e enviadas pelos processos do pool. "anterior"
+# e "cpu" são calculadas sobre a tabela inteira (atualizaCPU); o UID e os descritores só
+# valem no processo que coleta
+COLUNAS_COLETADAS = tuple(nome for nome in COLUNAS
+                          if nome not in ("anterior", "cpu", "uid", "fdDir", "fdStat", "fdStatm"))
+
+class TabelaProcessos():
+    """
+        Tabela colunar de processos e threads: cada métrica é um array com uma linha por
+        tarefa e um índice chave -> linha (chave pid para processos e (pid, tid) para
+        threads). Deltas e percentuais de CPU e ordenações rodam sobre a coluna inteira
+        (NumPy sobre o buffer dos arrays, sem cópia); Processo e Thread apenas leem e
+        escrevem a própria linha, inclusive os descritores de /proc mantidos abertos
+    """
+    def __init__(self):
+        self._colunas = {nome: array(tipo) for nome, tipo in COLUNAS.items()}
+        self._indice = {}
+        self._chaves = []
+        # Protege as escritas quando shards da coleta paralela compartilham a tabela
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def __contains__(self, chave):
+        return chave in self._indice
+
+    def insere(self, chave, ehThread):
+        # Nova linha zerada (ou a linha existente, se a chave já está na tabela)
+        with self._lock:
+            if chave in self._indice:
+                return self._indice[chave]
+            linha = len(self._chaves)
+            for nome, coluna in self._colunas.items():
+                coluna.append(-1 if nome in COLUNAS_NEGATIVAS else 0)
+            self._colunas["thread"][linha] = 1 if ehThread else 0
+            self._indice[chave] = linha
+            self._chaves.append(chave)
+            return linha
+
+    def remove(self, chave):
+        # Remove trocando com a última linha para manter as colunas contíguas
+        with self._lock:
+            linha = self._indice.pop(chave, None)
+            if linha is None:
+                return
+            ultima = len(self._chaves) - 1
+            if linha != ultima:
+                for coluna in self._colunas.values():
+                    coluna[linha] = coluna[ultima]
+                chaveMovida = self._chaves[ultima]
+                self._chaves[linha] = chaveMovida
+                self._indice[chaveMovida] = linha
+            for coluna in self._colunas.values():
+                coluna.pop()
+            self._chaves.pop()
+
+    def chaves(self):
+        return self._indice.keys()
+
+    def linhas(self, colunas=COLUNAS_COLETADAS):
+        # (chave, tupla com os valores das colunas) de cada linha, na ordem da tabela
+        with self._lock:
+            return list(zip(self._chaves, zip(*(self._colunas[nome] for nome in colunas))))
+
+    def escreveLinha(self, chave, valores, colunas=COLUNAS_COLETADAS):
+        """
+            Escreve os valores de uma linha recebida de um processo do pool, inserindo a
+            chave se preciso; a amostra de CPU anterior desta tabela é preservada, a não
+            ser que o starttime mude (PID reutilizado por outra tarefa)
+        """
+        self.insere(chave, isinstance(chave, tuple))
+        with self._lock:
+            linha = self._indice[chave]
+            c = self._colunas
+            starttime = c["starttime"][linha]
+            for nome, valor in zip(colunas, valores):
+                c[nome][linha] = valor
+            if starttime and c["starttime"][linha] != starttime:
+                c["anterior"][linha] = -1
+
+    def valor(self, nome, chave):
+        return self._colunas[nome][self._indice[chave]]
+
+    def define(self, nome, chave, valor):
+        with self._lock:
+            self._colunas[nome][self._indice[chave]] = valor
+
+    def descritor(self, nome, chave):
+        # Lido sob o lock: uma remoção em outro shard pode mover a linha entre a busca no
+        # índice e a leitura, e o descritor de outra tarefa seria lido. -1 sem a linha
+        with self._lock:
+            linha = self._indice.get(chave)
+            return -1 if linha is None else self._colunas[nome][linha]
+
+    def escreveStat(self, chave, stat):
+        c = self._colunas
+        with self._lock:
+            linha = self._indice[chave]
+            c["utime"][linha] = stat.utime
+            c["stime"][linha] = stat.stime
+            c["estado"][linha] = ord(stat.estado[0])
+            c["prioB"][linha] = stat.prioridade
+            c["prioD"][linha] = stat.nice
+            c["numThreads"][linha] = stat.num_threads
+            c["starttime"][linha] = stat.starttime
+            c["vsize"][linha] = stat.vsize
+            c["rss"][linha] = stat.rss
+            c["startstack"][linha] = stat.startstack
+            c["kstkesp"][linha] = stat.kstkesp
+
+    def leStat(self, chave):
+        linha = self._indice[chave]
+        c = self._colunas
+        return StatTarefa(
+            estado=chr(c["estado"][linha]),
+            utime=c["utime"][linha],
+            stime=c["stime"][linha],
+            prioridade=c["prioB"][linha],
+            nice=c["prioD"][linha],
+            num_threads=c["numThreads"][linha],
+            starttime=c["starttime"][linha],
+            vsize=c["vsize"][linha],
+            rss=c["rss"][linha],
+            startstack=c["startstack"][linha],
+            kstkesp=c["kstkesp"][linha]
+        )
+
+    def atualizaCPU(self, deltaTotal):
+        """
+            Calcula o percentual de CPU de todas as linhas em relação ao delta total de
+            /proc/stat do tick e guarda utime + stime como amostra anterior
+        """
+        with self._lock:
+            # Tempos em ticks cabem em int64; uint64 + int64 seria promovido a double
+            total = self._vetor("utime").view(np.int64) + self._vetor("stime").view(np.int64)
+            anterior = self._vetor("anterior")
+            cpu = self._vetor("cpu")
+            if deltaTotal:
+                deltas = total - anterior
+                np.multiply(deltas, 100 / deltaTotal, out=cpu)
+                cpu[(anterior < 0) | (deltas <= 0)] = 0.0
+            else:
+                cpu[:] = 0.0
+            anterior[:] = total
+
+    def ordena(self, nome, reverso=True, apenasProcessos=False):
+        """
+            Retorna as chaves ordenadas pela coluna informada
+        """
+        with self._lock:
+            coluna = self._vetor(nome)
+            # Decrescente estável: ordena o negativo (em double, as colunas sem sinal também)
+            ordem = np.argsort(-coluna.astype(np.float64) if reverso else coluna, kind="stable")
+            if apenasProcessos:
+                ordem = ordem[self._vetor("thread")[ordem] == 0]
+            chaves = self._chaves
+            return [chaves[linha] for linha in ordem.tolist()]
+
+    def _vetor(self, nome):
+        # Vetor NumPy sobre o buffer da coluna (sem cópia; escritas alteram a coluna).
+        # Usado só sob o lock e descartado antes de retornar: enquanto existe, o array
+        # não pode crescer
+        coluna = self._colunas[nome]
+        return np.frombuffer(coluna, dtype=coluna.typecode)
@@ -0,0 +1,148 @@
+import os
+import socket
+import threading
+from PerfilColeta import perfilAtual
+from collections import Counter
+
+# Estados TCP de /proc/net/tcp (include/net/tcp_states.h)
+ESTADOS_TCP = {
+    "01": "ESTABLISHED", "02": "SYN_SENT", "03": "SYN_RECV", "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2", "06": "TIME_WAIT", "07": "CLOSE", "08": "CLOSE_WAIT",
+    "09": "LAST_ACK", "0A": "LISTEN", "0B": "CLOSING", "0C": "NEW_SYN_RECV"
+}
+
+PROTOCOLOS_INET = ["tcp", "tcp6", "udp", "udp6", "raw", "raw6"]
+
+def hex_ip(ip_hex):
+    # Endereços em /proc/net/* são palavras de 32 bits em ordem do host (little endian)
+    dados = bytes.fromhex(ip_hex)
+    dados = b"".join(dados[i:i+4][::-1] for i in range(0, len(dados), 4))
+    familia = socket.AF_INET if len(dados) == 4 else socket.AF_INET6
+    return socket.inet_ntop(familia, dados)
+
+class TabelaSockets():
+    """
+        Tabela de sockets do sistema indexada por inode, montada uma vez por tick de coleta
+        a partir de /proc/net (tcp, tcp6, udp, udp6, raw, raw6 e unix). Cada Processo
+        resolve os inodes dos seus fds de socket nela em O(1)
+    """
+    def __init__(self, prefixo="/proc"):
+        self._prefixo = prefixo
+        self._sockets = {}
+        self._valida = False
+        self._lock = threading.Lock()
+
+    def novoTick(self):
+        # Marca a tabela como desatualizada; ela é remontada no primeiro acesso do tick
+        with self._lock:
+            self._valida = False
+
+    def _garanteAtualizada(self):
+        with self._lock:
+            if self._valida:
+                return
+            perfil = perfilAtual()
+            inicio = perfil.inicio()
+            sockets = {}
+            for proto in PROTOCOLOS_INET:
+                self._parseInet(proto, sockets)
+            self._parseUnix(sockets)
+            perfil.fim("procNet", inicio)
+            self._sockets = sockets
+            self._valida = True
+
+    def _parseInet(self, proto, sockets):
+        try:
+            with open(f"{self._prefixo}/net/{proto}", "r") as f:
+                next(f, None)  # skip header
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 10:
+                        continue
+                    local_ip_hex, local_port_hex = parts[1].split(':')
+                    remote_ip_hex, remote_port_hex = parts[2].split(':')
+                    state = parts[3]
+                    if proto.startswith("tcp"):
+                        state = ESTADOS_TCP.get(state, state)
+                    sockets[parts[9]] = {
+                        "proto": proto,
+                        "path": "(none)",
+                        "local": f"{hex_ip(local_ip_hex)}:{int(local_port_hex, 16)}",
+                        "remote": f"{hex_ip(remote_ip_hex)}:{int(remote_port_hex, 16)}",
+                        "local_port": int(local_port_hex, 16),
+                        "remote_port": int(remote_port_hex, 16),
+                        "state": state
+                    }
+        except OSError:
+            pass
+
+    def _parseUnix(self, sockets):
+        try:
+            with open(f"{self._prefixo}/net/unix", "r") as f:
+                next(f, None)  # skip header
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 7:
+                        continue
+                    sockets[parts[6]] = {
+                        "proto": "unix",
+                        "path": parts[7] if len(parts) > 7 else "(anonymous)",
+                        "local": "(none)",
+                        "remote": "(none)",
+                        "state": "(none)"
+                    }
+        except OSError:
+            pass
+
+    def obtem(self, inode):
+        # Detalhes do socket com o inode informado (ou None)
+        self._garanteAtualizada()
+        return self._sockets.get(inode)
+
+    def _escutando(self):
+        # Inodes dos sockets inet em escuta (TCP em LISTEN, UDP/raw sem par remoto)
+        escutando = {}
+        for inode, s in self._sockets.items():
+            if s["proto"] == "unix":
+                continue
+            if s["state"] == "LISTEN" if s["proto"].startswith("tcp") else s["remote_port"] == 0:
+                escutando[inode] = s
+        return escutando
+
+    def portasEscuta(self, pids):
+        """
+            Mapeia (proto, porta) em escuta para os PIDs donos dentre `pids`. Só os fds
+            desses PIDs são lidos (um readlink por fd), então o custo acompanha os
+            processos pedidos (ex.: os exportados ou os inscritos), não o sistema todo.
+            Portas sem dono entre eles aparecem com um conjunto vazio
+        """
+        self._garanteAtualizada()
+        escutando = self._escutando()
+        portas = {(s["proto"], s["local_port"]): set() for s in escutando.values()}
+        if not escutando:
+            return portas
+        perfil = perfilAtual()
+        inicio = perfil.inicio()
+        for pid in pids:
+            diretorio = f"{self._prefixo}/{pid}/fd"
+            try:
+                nomes = os.listdir(diretorio)
+            except OSError:
+                # Processo encerrado ou fds de outro usuário
+                continue
+            for nome in nomes:
+                try:
+                    alvo = os.readlink(f"{diretorio}/{nome}")
+                except OSError:
+                    continue
+                if alvo.startswith("socket:["):
+                    s = escutando.get(alvo[8:-1])
+                    if s is not None:
+                        portas[(s["proto"], s["local_port"])].add(pid)
+        perfil.fim("donosSockets", inicio)
+        return portas
+
+    def histogramaEstados(self):
+        # Contagem de sockets TCP (IPv4 e IPv6) por estado
+        self._garanteAtualizada()
+        return Counter(s["state"] for s in self._sockets.values() if s["proto"].startswith("tcp"))
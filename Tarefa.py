@@ -1,124 +1,150 @@
-import ctypes
-import os
-import pwd
-import re
-libc = ctypes.CDLL("libc.so.6", use_errno=True)
+import errno
+from StatTarefa import parseStat
+from CacheUsuarios import cacheUsuarios
+from TabelaProcessos import TabelaProcessos
+import DiretorioTarefa
 
 # /proc folder ref: https://man7.org/linux/man-pages/man5/proc.5.html
-PRIO_PROCESS = 0 # <linux/resource.h>
 
 class Tarefa():
-    def __init__(self, id, prefixo="/proc"):
+    """
+        Visão de uma tarefa (processo ou thread) sobre a sua linha na TabelaProcessos.
+        As métricas numéricas e os descritores de /proc mantidos abertos ficam nas
+        colunas da tabela; o objeto guarda apenas identificação, nome e usuário
+    """
+    __slots__ = ("_id", "_prefixo", "_nome", "_usuario", "_tabela", "_chave", "_caminho")
+
+    def __init__(self, id, prefixo="/proc", usuario=None, tabela=None, chave=None):
         self._id = id
         self._prefixo = prefixo
         self._nome = None
-        self._usuario = None
-        self._cpuUso = None
-        self._memUso = None
-        self._estado = None
-        self._prioB = None
-        self._prioD = None
-        self._atualizaNome()
-        self._atualizaUsuario()
-        self.atualizaCPU(0)
+        self._usuario = usuario
+        # Sem tabela compartilhada, a tarefa usa uma tabela propria
+        self._tabela = tabela if tabela is not None else TabelaProcessos()
+        self._chave = chave if chave is not None else id
+        self._tabela.insere(self._chave, isinstance(self._chave, tuple))
+        self._caminho = f"{prefixo}/{id}"
+        # Primeira leitura sem tolerancia: uma tarefa que nao existe (ou que terminou
+        # durante a leitura) levanta OSError e nao deixa linha na tabela
+        try:
+            if not self._escreveStat(DiretorioTarefa.leStat(self._tabela, self._chave, self._caminho)):
+                raise OSError(errno.ESRCH, f"stat ilegível da tarefa com ID {id}")
+            nome = DiretorioTarefa.leTexto(self._tabela, self._chave, self._caminho, "comm")
+            if nome is None:
+                raise FileNotFoundError(errno.ENOENT,
+                                        f"A tarefa com ID {id} não existe ou o arquivo comm não está disponível.")
+        except OSError:
+            self.liberaTabela()
+            raise
+        self._nome = nome
 
     def atualizaDados(self):
-        self._atualizaPrioB()
-        self._atualizaPrioD()
-        self._atualizaEstado()
+        if self._leStat():
+            self._atualizaUsuario()
 
-    def _capturaCPUUso(self):
-    # Captura o uso de CPU dos processos e threads acessando /proc/[pid]/stat
+    def _leStat(self):
+        # Le /proc/[tid]/stat uma unica vez por tick (pread no descritor mantido aberto)
+        # e grava os campos na linha da tabela. False se a leitura falhou
+        try:
+            dados = DiretorioTarefa.leStat(self._tabela, self._chave, self._caminho)
+        except OSError:
+            return False
+        return self._escreveStat(dados)
+
+    def le(self, nome):
+        # Arquivo da tarefa (stat e statm pelos descritores mantidos abertos)
+        return DiretorioTarefa.le(self._tabela, self._chave, self._caminho, nome)
+
+    def _escreveStat(self, dados):
         try:
-            with open(f'{self._prefixo}/{self._id}/stat', 'r') as f:
-                fields = f.read().split()
-                utime = int(fields[13]) # Tempo de CPU em modo de usuario
-                stime = int(fields[14]) # Tempo de CPU em modo de sistema
-                return utime + stime
-        except Exception as e:
-            return None
+            stat = parseStat(dados)
+        except (ValueError, IndexError):
+            return False
+        if stat is None:
+            return False
+        starttime = self._tabela.valor("starttime", self._chave)
+        self._tabela.escreveStat(self._chave, stat)
+        # Mesmo PID com outro starttime: e outra tarefa
+        if starttime and stat.starttime != starttime:
+            self._reiniciaIdentidade()
+        return True
+
+    def _reiniciaIdentidade(self):
+        # PID reutilizado: descarta a amostra de CPU anterior, o UID e o nome da tarefa antiga
+        self._tabela.define("anterior", self._chave, -1)
+        self._tabela.define("uid", self._chave, -1)
+        self._atualizaNome()
+
+    def _capturaCPUUso(self):
+        # Uso de CPU: utime + stime (modo usuario e sistema) do ultimo stat lido
+        return self._tabela.valor("utime", self._chave) + self._tabela.valor("stime", self._chave)
 
     def atualizaCPU(self, cpuUso):
-        self._cpuUso = cpuUso
+        self._tabela.define("cpu", self._chave, cpuUso)
 
     def _atualizaNome(self):
-        # Nome: campo 1 do /proc/[tid]/comm
-        try:
-            with open(f"{self._prefixo}/{self._id}/comm", "r") as f:
-                self._nome = f.read().strip()
-        except FileNotFoundError:
+        # Nome: /proc/[tid]/comm, lido uma vez por identidade da tarefa
+        nome = DiretorioTarefa.leTexto(self._tabela, self._chave, self._caminho, "comm")
+        if nome is None:
             print(f"A tarefa com ID {self._id} não existe ou o arquivo comm não está disponível.")
+        else:
+            self._nome = nome
 
     def _atualizaUsuario(self):
-        # Usuario: campo 1 do /proc/[tid]/status
-        with open(f"/proc/{self._id}/status") as f:
-                        for line in f:
-                            if line.startswith("Uid:"):
-                                self._usuario = pwd.getpwuid(int(line.split()[1])).pw_name  # Real UID
-
-    def _atualizaEstado(self):
-        # Estado: campo 2 do /proc/[tid]/stat
-        try:
-            with open(f"{self._prefixo}/{self._id}/stat", "r") as f:
-                data = f.read()
-
-            match = re.match(r'^\d+ \((.*?)\) ([A-Z])', data)
-            if match:
-                self._estado = match.group(2)
-            else:
-                print(f"Failed to parse state from: {data}")
-        except Exception as e:
-            print(f"Error reading {self._prefixo}/{self._id}/stat: {e}")
-    
-    def _atualizaPrioD(self):
-        # Prioridade dinâmica (NICE do linux), pela syscall getpriority
-        # REF: https://man7.org/linux/man-pages/man2/setpriority.2.html
-        # Configuracao de chamada da funcao getpriority
-        libc.getpriority.argtypes = [ctypes.c_int, ctypes.c_int]
-        libc.getpriority.restype = ctypes.c_int
-        ctypes.set_errno(0)  # limpa errno antes da chamada
-
-        # SysCalls getpriority
-        prio = libc.getpriority(PRIO_PROCESS, int(self._id))
-        if prio == -1:
-            err = ctypes.get_errno()
-            if err != 0:
-                self._prioD = 0
-        else:
-            self._prioD = prio
+        # Usuario: UID real da linha Uid: de /proc/[tid]/status (lido uma vez por
+        # identidade), traduzido pelo cache compartilhado
+        uid = DiretorioTarefa.uidReal(self._tabela, self._chave, self._caminho)
+        if uid is not None:
+            self._usuario = cacheUsuarios.nome(uid)
 
-    def _atualizaPrioB(self):
-        # Prioridade Base: campo 17 do /proc/[tid]/stat
-        try:
-            with open(f'{self._prefixo}/{self._id}/stat', 'r') as f:
-                fields = f.read().split()
-                self._prioB = int(fields[17]) # Prioridade estática do processo
-        except Exception as e:
-            self._prioB = 0
-    
     def atualizaMem(self, mem):
-        self._memUso = mem
+        self._tabela.define("mem", self._chave, mem)
+
+    def liberaTabela(self):
+        # Fecha os descritores mantidos antes de a linha (que os guarda) sair da tabela
+        self.fechaDiretorio()
+        self._tabela.remove(self._chave)
+
+    def fechaDiretorio(self):
+        # Fecha os descritores de /proc mantidos pela tarefa
+        DiretorioTarefa.fecha(self._tabela, self._chave)
+
+    def getTabela(self):
+        return self._tabela
+
+    def getChave(self):
+        return self._chave
+
+    def getStat(self):
+        return self._tabela.leStat(self._chave)
 
     def getID(self):
         return self._id
+
+    def getIdentidade(self):
+        # Identidade estavel da tarefa: o PID sozinho pode ser reutilizado
+        return (self._id, self._tabela.valor("starttime", self._chave))
     
     def getNome(self):
         return self._nome
     
     def getUsuario(self):
         return self._usuario
+
+    def defineUsuario(self, usuario):
+        self._usuario = usuario
     
     def getCPU(self):
-        return round(self._cpuUso, 2)
+        return round(self._tabela.valor("cpu", self._chave), 2)
     
     def getMem(self):    
-        return self._memUso/1000
+        return self._tabela.valor("mem", self._chave)/1000
     
     def getEstado(self):    
-        return self._estado
+        return chr(self._tabela.valor("estado", self._chave)) if self._tabela.valor("estado", self._chave) else None
     
     def getPrioB(self):
-        return self._prioB
+        return self._tabela.valor("prioB", self._chave)
     
     def getPrioD(self):
-        return self._prioD
\ No newline at end of file
+        return self._tabela.valor("prioD", self._chave)
@@ -1,7 +1,13 @@
 from Tarefa import Tarefa
 
 class Thread(Tarefa): 
-    def __init__(self, pid, tid):
-        super().__init__(tid, f"/proc/{pid}/task")
+    __slots__ = ("_pid",)
+
+    def __init__(self, pid, tid, usuario=None, tabela=None, prefixo=None):
+        # O prefixo /proc/PID/task e compartilhado pelas threads do mesmo processo
+        super().__init__(tid, prefixo or f"/proc/{pid}/task", usuario, tabela, (pid, tid))
         self._pid = pid
-        super().atualizaDados()
\ No newline at end of file
+
+    def _atualizaUsuario(self):
+        # O dono da thread e herdado do Processo pai (ver Processo._atualizaThreadDict)
+        pass
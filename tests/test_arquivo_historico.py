@@ -0,0 +1,90 @@
+import pytest
+from ArquivoHistorico import ArquivoHistorico, FRACAO_FOLGA
+from HistoricoSeries import HistoricoSeries
+
+CAMPOS = ["a", "b"]
+# Anel pequeno: a folga (registros nunca lidos como retidos) é de 2 posições
+CAPACIDADE = 2 * FRACAO_FOLGA
+RETIDOS = CAPACIDADE - 2
+
+def _registros(inicio, fim):
+    return [(float(i), (float(i), 2.0 * i)) for i in range(inicio, fim)]
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "serie.hist")
+
+def test_reabre_com_os_registros_sincronizados(caminho):
+    arquivo = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)
+    arquivo.adicionaLote(_registros(0, 10))
+    arquivo.fecha()
+    arquivo = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)
+    assert len(arquivo) == 10
+    assert arquivo.getUltimoTimestamp() == 9.0
+    assert arquivo.registros(3, 5) == [(3.0, 3.0, 6.0), (4.0, 4.0, 8.0), (5.0, 5.0, 10.0)]
+    arquivo.fecha()
+
+def test_sem_sincronia_a_contagem_nao_avanca(caminho):
+    arquivo = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)
+    arquivo.adicionaLote(_registros(0, 1))
+    leitor = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE, somenteLeitura=True)
+    assert len(leitor) == 0
+    arquivo.sincroniza()
+    assert leitor.registros(0, 10) == [(0.0, 0.0, 0.0)]
+    leitor.fecha()
+    arquivo.fecha()
+
+def test_volta_no_anel(caminho):
+    arquivo = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)
+    arquivo.adicionaLote(_registros(0, 3 * CAPACIDADE + 5))
+    ultimo = 3 * CAPACIDADE + 4
+    assert len(arquivo) == RETIDOS
+    registros = arquivo.registros(float("-inf"), float("inf"))
+    assert [r[0] for r in registros] == [float(i) for i in range(ultimo - RETIDOS + 1, ultimo + 1)]
+    # Intervalo que cruza o fim do arquivo (dois trechos contíguos)
+    assert [r[0] for r in arquivo.registros(ultimo - 5, ultimo)] == [float(i) for i in range(ultimo - 5, ultimo + 1)]
+    arquivo.fecha()
+    arquivo = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)
+    assert arquivo.registros(float("-inf"), float("inf")) == registros
+    arquivo.fecha()
+
+def test_queda_com_anel_cheio(caminho):
+    # Registros gravados depois da última sincronia ocupam as posições dos mais antigos;
+    # depois de uma queda eles não podem aparecer como o início da série
+    arquivo = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)
+    arquivo.adicionaLote(_registros(0, 2 * CAPACIDADE))
+    arquivo.sincroniza()
+    arquivo.adicionaLote(_registros(2 * CAPACIDADE, 2 * CAPACIDADE + 2))
+    leitor = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE, somenteLeitura=True)
+    arquivo._mm.close()
+    arquivo._mm = None
+    for reaberto in (leitor, ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)):
+        timestamps = [r[0] for r in reaberto.registros(float("-inf"), float("inf"))]
+        assert timestamps == [float(i) for i in range(2 * CAPACIDADE - RETIDOS, 2 * CAPACIDADE)]
+        assert reaberto.registros(2 * CAPACIDADE - 1, 3 * CAPACIDADE) == [(2.0 * CAPACIDADE - 1,
+                                                                           2.0 * CAPACIDADE - 1,
+                                                                           2.0 * (2 * CAPACIDADE - 1))]
+        reaberto.fecha()
+
+def test_timestamp_que_volta_e_limitado(caminho):
+    arquivo = ArquivoHistorico(caminho, CAMPOS, CAPACIDADE)
+    arquivo.adicionaLote([(10.0, (1, 1)), (5.0, (2, 2)), (11.0, (3, 3))])
+    assert [r[0] for r in arquivo.registros(0, 20)] == [10.0, 10.0, 11.0]
+    arquivo.fecha()
+
+def test_formato_diferente_preserva_o_antigo(caminho, tmp_path):
+    ArquivoHistorico(caminho, CAMPOS, CAPACIDADE).fecha()
+    arquivo = ArquivoHistorico(caminho, ["outro"], CAPACIDADE)
+    assert (tmp_path / "serie.hist.antigo").exists()
+    assert len(arquivo) == 0
+    arquivo.fecha()
+    with pytest.raises(ValueError):
+        ArquivoHistorico(caminho, CAMPOS, CAPACIDADE, somenteLeitura=True)
+
+def test_carrega_por_chave(caminho):
+    arquivo = ArquivoHistorico(caminho, ["pid", "cpu"], CAPACIDADE)
+    arquivo.adicionaLote([(1.0, (10, 5.0)), (1.0, (20, 7.0)), (2.0, (10, 6.0))])
+    historico = HistoricoSeries(1)
+    arquivo.carregaEm(historico, chave=("pid", 10))
+    assert [(p.timestamp, p.medias) for p in historico.getPontos("bruto")] == [(1.0, (5.0,)), (2.0, (6.0,))]
+    arquivo.fecha()
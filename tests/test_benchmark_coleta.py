@@ -0,0 +1,59 @@
+import pytest
+from GerenciadorDados import GerenciadorDados, ETAPAS_COLETA
+from ProcFalso import geraProcFalso, avancaCPU
+
+# Fora da execução padrão (minutos na escala de 100 mil): python -m pytest -m benchmark
+pytestmark = pytest.mark.benchmark
+
+# Tarefas (processos + threads em task/) de cada árvore gerada por ProcFalso
+ESCALAS = [1000, 10000, 100000]
+THREADS_POR_PROCESSO = 4
+
+class Coleta():
+    """
+        Uma árvore falsa do /proc e o GerenciadorDados que a coleta, compartilhados por
+        todos os benchmarks da mesma escala (a geração da árvore domina o tempo)
+    """
+    def __init__(self, raiz, tarefas, gerenciador):
+        self.raiz = raiz
+        self.tarefas = tarefas
+        self.gerenciador = gerenciador
+        self.tick = 0
+
+    def avancaCPU(self):
+        # Sem avanço o delta de CPU do tick é zero e cpuInfo não calcula nada
+        self.tick += 1
+        avancaCPU(self.raiz, self.tick)
+
+@pytest.fixture(scope="module", params=ESCALAS, ids=lambda escala: f"{escala}-tarefas")
+def coleta(request, tmp_path_factory):
+    raiz = str(tmp_path_factory.mktemp(f"proc-{request.param}"))
+    tarefas = geraProcFalso(raiz, request.param // (THREADS_POR_PROCESSO + 1), THREADS_POR_PROCESSO, mapeamentos=32,
+                            fds=16, socketsRede=2000)
+    gerenciador = GerenciadorDados(prefixoProc=raiz)
+    yield Coleta(raiz, tarefas, gerenciador)
+    gerenciador.encerra()
+    for processo in gerenciador.getProcDict().values():
+        processo.fechaDiretorio()
+
+def test_tick_completo(benchmark, coleta):
+    def tick():
+        coleta.avancaCPU()
+        coleta.gerenciador.atualizaDados()
+    benchmark(tick)
+    gerenciador = coleta.gerenciador
+    benchmark.extra_info["tarefas"] = coleta.tarefas
+    assert gerenciador.getNumProcessos() + gerenciador.getNumThreads() == coleta.tarefas
+
+@pytest.mark.parametrize("etapa", ETAPAS_COLETA)
+def test_etapa(benchmark, coleta, etapa):
+    def executa():
+        if etapa == "cpuInfo":
+            coleta.avancaCPU()
+        coleta.gerenciador.executaEtapa(etapa)
+    benchmark(executa)
+    benchmark.extra_info["tarefas"] = coleta.tarefas
+
+def test_etapa_desconhecida(coleta):
+    with pytest.raises(ValueError):
+        coleta.gerenciador.executaEtapa("inexistente")
@@ -0,0 +1,82 @@
+import struct
+from ConectorProc import (ConectorProc, NLMSGHDR, CN_MSG, PROC_EVENT, FORK_EVENT, EXEC_EVENT, EXIT_EVENT, ACK_EVENT,
+                          NLMSG_DONE, CN_IDX_PROC, CN_VAL_PROC, PROC_EVENT_NONE, PROC_EVENT_FORK, PROC_EVENT_EXEC,
+                          PROC_EVENT_EXIT)
+from ProcFalso import linhaStat
+
+def _mensagem(what, evento):
+    # nlmsghdr + cn_msg + proc_event, com o alinhamento de 4 bytes entre mensagens
+    payload = PROC_EVENT.pack(what, 0, 123456789) + evento
+    cn = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0)
+    tamanho = NLMSGHDR.size + len(cn) + len(payload)
+    return NLMSGHDR.pack(tamanho, NLMSG_DONE, 0, 0, 0) + cn + payload + b"\0" * (-tamanho % 4)
+
+def _fork(pai, filho, tgidFilho=None):
+    return _mensagem(PROC_EVENT_FORK, FORK_EVENT.pack(pai, pai, filho, filho if tgidFilho is None else tgidFilho))
+
+def _exit(pid, tgid, codigo):
+    return _mensagem(PROC_EVENT_EXIT, EXIT_EVENT.pack(pid, tgid, codigo, 17))
+
+def _conector(tmp_path, ultimaAmostra=None):
+    conector = ConectorProc(str(tmp_path), ultimaAmostra)
+    conector._precisaResync = False
+    conector._ultimoResync = float("inf")
+    return conector
+
+def _processo(raiz, pid, nome, **stat):
+    diretorio = raiz / str(pid)
+    diretorio.mkdir()
+    (diretorio / "comm").write_text(nome + "\n")
+    (diretorio / "stat").write_text(linhaStat(pid, nome, **stat))
+
+def test_confirmacao(tmp_path):
+    conector = _conector(tmp_path)
+    conector._trataDatagrama(_mensagem(PROC_EVENT_NONE, ACK_EVENT.pack(0)))
+    assert conector._confirmado is True
+    recusado = _conector(tmp_path)
+    recusado._trataDatagrama(_mensagem(PROC_EVENT_NONE, ACK_EVENT.pack(1)))
+    assert recusado._confirmado is False
+
+def test_fork_exec_e_exit_em_um_datagrama(tmp_path):
+    _processo(tmp_path, 200, "filho")
+    _processo(tmp_path, 300, "zumbi", estado="Z", utime=40, stime=2)
+    conector = _conector(tmp_path)
+    conector._pids = {1, 300}
+    conector._trataDatagrama(_fork(1, 200) + _fork(200, 201, tgidFilho=200)
+                             + _mensagem(PROC_EVENT_EXEC, EXEC_EVENT.pack(300, 300))
+                             + _exit(300, 300, 3 << 8) + _exit(202, 200, 0))
+    # O fork de uma thread (pid != tgid) e a saída de uma thread não mudam os processos
+    assert conector.getPids() == {1, 200}
+    assert conector._nomes == {200: "filho"}
+    encerrado, = conector.getEncerrados()
+    assert encerrado["pid"] == 300
+    assert encerrado["nome"] == "zumbi"
+    assert (encerrado["utime"], encerrado["stime"], encerrado["origem"]) == (40, 2, "stat")
+    assert encerrado["exit_code"] == 3
+
+def test_exit_sem_stat_usa_a_ultima_amostra(tmp_path):
+    conector = _conector(tmp_path, lambda pid: ("servico", 10, 5) if pid == 400 else None)
+    conector._pids = {400}
+    conector._trataDatagrama(_exit(400, 400, 9))
+    encerrado, = conector.getEncerrados()
+    assert (encerrado["nome"], encerrado["utime"], encerrado["stime"]) == ("servico", 10, 5)
+    assert encerrado["origem"] == "amostra"
+    assert encerrado["sinal"] == 9
+    assert conector.getPids() == set()
+
+def test_mensagem_truncada(tmp_path):
+    conector = _conector(tmp_path)
+    completa = _fork(1, 500)
+    # Cabeçalho com tamanho menor que o próprio cabeçalho: o resto do datagrama é ignorado
+    invalida = struct.pack("=IHHII", 4, NLMSG_DONE, 0, 0, 0)
+    conector._trataDatagrama(completa + invalida + _fork(1, 501))
+    assert conector.getPids() == {500}
+    # Evento cortado no meio do proc_event: não é interpretado
+    conector._trataDatagrama(completa[:NLMSGHDR.size + CN_MSG.size + 4])
+    assert conector.getPids() == {500}
+
+def test_dados_do_evento_incompletos(tmp_path):
+    conector = _conector(tmp_path)
+    # Fork sem os campos do evento dentro do tamanho declarado
+    conector._trataDatagrama(_mensagem(PROC_EVENT_FORK, b"") + _fork(1, 600))
+    assert conector.getPids() == {600}
@@ -0,0 +1,96 @@
+import os
+import struct
+from types import MappingProxyType
+import pytest
+from MemoriaCompartilhada import EscritorInstantaneos, LeitorInstantaneos, CABECALHO, INICIO_SLOTS, TENTATIVAS_LEITURA
+from Instantaneo import Instantaneo, TarefaInstantaneo, CAMPOS_SISTEMA
+
+NUM_SLOTS = 3
+TAMANHO_SLOT = 64 * 1024
+
+def _instantaneo(seq, cpu=1.0):
+    thread = TarefaInstantaneo(11, "trabalho", "root", cpu / 2, 0.5, "S", 20, 0, None, None, ())
+    processo = TarefaInstantaneo(10, "servico", "root", cpu, 2.0, "R", 20, 0, 1.5, 0.25, (thread,))
+    sistema = dict.fromkeys(CAMPOS_SISTEMA, 0)
+    sistema["cpuUso"] = cpu
+    return Instantaneo(seq=seq, timestamp=1000.0 + seq, processos=(processo,), porPid=MappingProxyType({10: processo}),
+                       detalhes=MappingProxyType({}), **sistema)
+
+@pytest.fixture
+def anel():
+    nome = f"dashboard-os-teste-{os.getpid()}"
+    escritor = EscritorInstantaneos(nome, NUM_SLOTS, TAMANHO_SLOT)
+    leitor = LeitorInstantaneos(nome)
+    yield escritor, leitor
+    leitor.fecha()
+    escritor.fecha()
+
+def _inicioSlot(seq):
+    return INICIO_SLOTS + (seq % NUM_SLOTS) * TAMANHO_SLOT
+
+def test_le_o_ultimo_publicado(anel):
+    escritor, leitor = anel
+    escritor.publica(_instantaneo(1, 3.0))
+    escritor.publica(_instantaneo(2, 4.0))
+    instantaneo = leitor.getInstantaneo()
+    assert instantaneo.seq == 2
+    assert instantaneo.cpuUso == 4.0
+    processo = instantaneo.getProcesso(10)
+    assert (processo.nome, processo.leitura, processo.escrita) == ("servico", 1.5, 0.25)
+    assert processo.threads[0].id == 11 and processo.threads[0].leitura is None
+    # Sem seq novo, o mesmo objeto
+    assert leitor.getInstantaneo() is instantaneo
+
+def test_slot_em_escrita_nao_e_lido(anel):
+    escritor, leitor = anel
+    escritor.publica(_instantaneo(1))
+    assert leitor.getInstantaneo().seq == 1
+    # Escritor parado no meio do slot 2: seqlock ímpar, com o cabeçalho já apontando para ele
+    escritor.publica(_instantaneo(2))
+    struct.pack_into("<Q", escritor._buf, _inicioSlot(2), 2 * 2 - 1)
+    assert leitor.getInstantaneo().seq == 1
+
+def test_leitura_rasgada_e_repetida(anel, monkeypatch):
+    escritor, leitor = anel
+    escritor.publica(_instantaneo(1, 1.0))
+    tarefaOriginal = LeitorInstantaneos._tarefa
+    chamadas = []
+
+    def tarefaDuranteEscrita(campos, threads=()):
+        # Na primeira leitura, o escritor dá a volta no anel e reescreve o mesmo slot
+        # (seq 4 usa o slot do seq 1) enquanto o leitor ainda o percorre
+        if not chamadas:
+            escritor.publica(_instantaneo(1 + NUM_SLOTS, 9.0))
+        chamadas.append(campos)
+        return tarefaOriginal(campos, threads)
+
+    monkeypatch.setattr(LeitorInstantaneos, "_tarefa", staticmethod(tarefaDuranteEscrita))
+    instantaneo = leitor.getInstantaneo()
+    # O seqlock do slot mudou durante a leitura: ela é descartada e a repetida lê o seq 4
+    assert instantaneo.seq == 1 + NUM_SLOTS
+    assert instantaneo.cpuUso == 9.0
+    assert instantaneo.getProcesso(10).cpu == 9.0
+
+def test_escritor_sempre_a_frente(anel, monkeypatch):
+    escritor, leitor = anel
+    escritor.publica(_instantaneo(1))
+    anterior = leitor.getInstantaneo()
+    escritor.publica(_instantaneo(2))
+    tentativas = []
+    monkeypatch.setattr(leitor, "_le", lambda seq: tentativas.append(seq))
+    # Todas as tentativas falham: mantém o último instantâneo lido
+    assert leitor.getInstantaneo() is anterior
+    assert len(tentativas) == TENTATIVAS_LEITURA
+
+def test_inscricoes(anel):
+    escritor, leitor = anel
+    assert leitor.inscreveDetalhes(1234)
+    assert escritor.getInscritos() == {1234}
+    leitor.desinscreveDetalhes(1234)
+    assert escritor.getInscritos() == set()
+
+def test_segmento_incompativel(anel):
+    escritor, _ = anel
+    CABECALHO.pack_into(escritor._buf, 0, b"OUTRO\0\0\0", 1, NUM_SLOTS, TAMANHO_SLOT, 16, 0)
+    with pytest.raises(ValueError):
+        LeitorInstantaneos(escritor.getNome())
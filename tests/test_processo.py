@@ -0,0 +1,20 @@
+import pytest
+from Processo import Processo
+from ProcFalso import geraProcFalso
+from TabelaProcessos import TabelaProcessos
+
+def test_processo_coletado(tmp_path):
+    geraProcFalso(str(tmp_path), 2, threadsPorProcesso=3, mapeamentos=4, fds=4, socketsRede=10)
+    tabela = TabelaProcessos()
+    processo = Processo(1000, tabela=tabela, prefixo=str(tmp_path))
+    assert processo.getNumThreads() == 3
+    processo.liberaTabela()
+    assert len(tabela) == 0
+
+def test_processo_ilegivel_nao_deixa_linha(tmp_path):
+    # Diretório listado, mas sem stat (processo encerrado durante a listagem)
+    (tmp_path / "1000").mkdir()
+    tabela = TabelaProcessos()
+    with pytest.raises(OSError):
+        Processo(1000, tabela=tabela, prefixo=str(tmp_path))
+    assert len(tabela) == 0
@@ -0,0 +1,20 @@
+from Reconciliacao import listaIDs, reconciliaIDs
+
+def test_reconcilia_ids():
+    # Existentes costumam ser as chaves do dicionário de processos
+    eventos = reconciliaIDs({1: "a", 2: "b", 3: "c"}.keys(), {2, 3, 4, 5})
+    assert eventos.adicionados == {4, 5}
+    assert eventos.removidos == {1}
+    assert eventos.sobreviventes == {2, 3}
+
+def test_reconcilia_ids_vazios():
+    eventos = reconciliaIDs([], set())
+    assert eventos.adicionados == eventos.removidos == eventos.sobreviventes == set()
+
+def test_lista_ids(tmp_path):
+    for nome in ("1", "20", "self", "net", "300"):
+        (tmp_path / nome).mkdir()
+    assert listaIDs(str(tmp_path)) == {1, 20, 300}
+
+def test_lista_ids_diretorio_ausente(tmp_path):
+    assert listaIDs(str(tmp_path / "ausente")) == set()
@@ -0,0 +1,19 @@
+from StatTarefa import parseStat
+from ProcFalso import linhaStat
+
+def test_comm_com_espacos_e_parenteses():
+    # O comm termina no último ')': espaços e parênteses dentro dele não deslocam os campos
+    stat = parseStat(linhaStat(42, "a (b) c) d", estado="R", utime=7, stime=3, numThreads=5, starttime=900,
+                               vsize=4096, rss=12, startstack=0x7ffd, kstkesp=0x7ffe))
+    assert stat.estado == "R"
+    assert (stat.utime, stat.stime) == (7, 3)
+    assert stat.num_threads == 5
+    assert stat.starttime == 900
+    assert (stat.vsize, stat.rss) == (4096, 12)
+    assert (stat.startstack, stat.kstkesp) == (0x7ffd, 0x7ffe)
+
+def test_comm_vazio():
+    assert parseStat(linhaStat(1, "", utime=1)).utime == 1
+
+def test_sem_comm():
+    assert parseStat("42 sem parenteses S 0 0") is None
@@ -0,0 +1,60 @@
+import os
+from TabelaSockets import TabelaSockets, hex_ip
+
+CABECALHO_INET = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+
+def _linhaInet(local, remoto, estado, inode):
+    return f"   0: {local} {remoto} {estado} 00000000:00000000 00:00000000 00000000     0        0 {inode} 1\n"
+
+def test_hex_ip_ipv4():
+    assert hex_ip("0100007F") == "127.0.0.1"
+
+def test_hex_ip_ipv6():
+    # Quatro palavras de 32 bits, cada uma em ordem do host (little endian)
+    assert hex_ip("00000000000000000000000001000000") == "::1"
+    assert hex_ip("B80D0120000000000000000001000000") == "2001:db8::1"
+    assert hex_ip("0000000000000000FFFF00000100007F") == "::ffff:127.0.0.1"
+
+def _procNet(raiz):
+    net = raiz / "net"
+    net.mkdir()
+    (net / "tcp").write_text(CABECALHO_INET + _linhaInet("0100007F:0016", "00000000:0000", "0A", "100")
+                             + _linhaInet("0100007F:0016", "0200007F:D431", "01", "101"))
+    (net / "tcp6").write_text(CABECALHO_INET + _linhaInet("B80D0120000000000000000001000000:01BB",
+                                                          "00000000000000000000000000000000:0000", "0A", "200"))
+    (net / "udp6").write_text(CABECALHO_INET + _linhaInet("00000000000000000000000001000000:0035",
+                                                          "00000000000000000000000000000000:0000", "07", "300"))
+    (net / "unix").write_text("Num       RefCount Protocol Flags    Type St Inode Path\n"
+                              "0000000000000000: 00000002 00000000 00010000 0001 01 400 /run/teste.sock\n")
+
+def test_tabela_ipv6(tmp_path):
+    _procNet(tmp_path)
+    tabela = TabelaSockets(str(tmp_path))
+    tcp6 = tabela.obtem("200")
+    assert tcp6["proto"] == "tcp6"
+    assert tcp6["local"] == "2001:db8::1:443"
+    assert tcp6["state"] == "LISTEN"
+    assert tabela.obtem("300")["local"] == "::1:53"
+    assert tabela.obtem("400")["path"] == "/run/teste.sock"
+    assert tabela.obtem("999") is None
+    assert tabela.histogramaEstados() == {"LISTEN": 2, "ESTABLISHED": 1}
+
+def test_portas_escuta_so_dos_pids_pedidos(tmp_path):
+    _procNet(tmp_path)
+    for pid, inodes in ((10, ["100", "101"]), (20, ["200"])):
+        fd = tmp_path / str(pid) / "fd"
+        fd.mkdir(parents=True)
+        for numero, inode in enumerate(inodes):
+            os.symlink(f"socket:[{inode}]", fd / str(numero))
+    tabela = TabelaSockets(str(tmp_path))
+    assert tabela.portasEscuta([10]) == {("tcp", 22): {10}, ("tcp6", 443): set(), ("udp6", 53): set()}
+    assert tabela.portasEscuta([10, 20, 30])[("tcp6", 443)] == {20}
+
+def test_novo_tick_relê_proc_net(tmp_path):
+    _procNet(tmp_path)
+    tabela = TabelaSockets(str(tmp_path))
+    assert tabela.obtem("100") is not None
+    (tmp_path / "net" / "tcp").write_text(CABECALHO_INET)
+    assert tabela.obtem("100") is not None
+    tabela.novoTick()
+    assert tabela.obtem("100") is None